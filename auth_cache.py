@@ -0,0 +1,372 @@
+"""
+Auto Type - Authentication Cache
+Keeps a salted hash of the access code on disk so logins are verified
+offline. The access code source is swappable (HTTPS URL, local HTTP
+stand-in, or a plain file for air-gapped machines) and is re-checked in the
+background with ETag / If-None-Match so a changed code is still picked up.
+"""
+import binascii
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+# Where the access code lives unless AUTOTYPE_AUTH_SOURCE says otherwise
+DEFAULT_SOURCE = "https://raw.githubusercontent.com/bilalmirzatrader/AutoTyper/refs/heads/main/pass.json"
+
+# How long a cached access code is trusted without asking the source again
+DEFAULT_TTL = 24 * 60 * 60
+
+# PBKDF2 work factor for the cached hash
+HASH_ITERATIONS = 50000
+
+
+class AuthSourceError(Exception):
+    """The access code could not be fetched; the message is shown to the user"""
+
+
+class AuthCancelled(AuthSourceError):
+    """The fetch was abandoned by cancel(); nothing needs to be shown"""
+
+
+@dataclass
+class FetchResult:
+    """Response from an access code source"""
+    access_code: Optional[str]  # None when the source reported "not modified"
+    etag: Optional[str] = None
+
+
+def parse_access_code(text: str) -> str:
+    """Extract the access code from the pass.json document"""
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        # If the response is not valid JSON
+        print("Error: Invalid JSON in password data")
+        raise AuthSourceError(
+            "The password verification data is corrupted. Please contact the administrator."
+        ) from None
+    correct_password = data.get("access_code", "") if isinstance(data, dict) else ""
+    if not correct_password:
+        # If the access_code key is missing or empty
+        print("Error: Missing 'access_code' in the password data")
+        raise AuthSourceError(
+            "The password verification data is invalid. Please contact the administrator."
+        )
+    return str(correct_password)
+
+
+class HttpAccessCodeSource:
+    """
+    Fetches pass.json over HTTP(S), using If-None-Match when an ETag is known.
+
+    Requests go through one pooled requests.Session, so repeated checks reuse
+    the open connection instead of paying for a new TLS handshake each time.
+    Each request runs on a helper thread while fetch() waits for it, so
+    cancel() ends the wait at once instead of when the timeout expires.
+    """
+
+    def __init__(self, url: str, timeout: float = 5.0):
+        self.url = url
+        self.timeout = timeout
+        self._session = None
+        # Bumped by cancel(); fetches started before that are abandoned
+        self._generation = 0
+        self._changed = threading.Condition()
+
+    def cancel(self) -> None:
+        """
+        Abandon the fetches in flight: they raise AuthCancelled at once, and
+        responses that still arrive for them are discarded. The pooled
+        connections are closed and the next fetch starts a fresh session.
+        """
+        with self._changed:
+            self._generation += 1
+            session, self._session = self._session, None
+            self._changed.notify_all()
+        if session is not None:
+            session.close()
+
+    def _get(self, requests, headers: dict):
+        """session.get on a helper thread; raises AuthCancelled once cancel() is called"""
+        with self._changed:
+            generation = self._generation
+            if self._session is None:
+                self._session = requests.Session()
+            session = self._session
+        outcome = {}
+
+        def request():
+            try:
+                outcome["response"] = session.get(self.url, headers=headers, timeout=self.timeout)
+            except Exception as e:
+                outcome["error"] = e
+            with self._changed:
+                self._changed.notify_all()
+
+        threading.Thread(target=request, name="auth-fetch", daemon=True).start()
+        with self._changed:
+            self._changed.wait_for(lambda: outcome or self._generation != generation)
+            if self._generation != generation:
+                raise AuthCancelled("The verification was cancelled.")
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome["response"]
+
+    def fetch(self, etag: Optional[str] = None) -> FetchResult:
+        # Only needed here, so keep it off the startup path
+        try:
+            import requests
+        except ImportError:
+            raise AuthSourceError(
+                "Missing dependency 'requests'. Install with: pip install requests"
+            ) from None
+
+        headers = {"If-None-Match": etag} if etag else {}
+        try:
+            response = self._get(requests, headers)
+        except requests.exceptions.Timeout:
+            # If the request timed out
+            print("Error: Request timed out")
+            raise AuthSourceError(
+                "Connection to the authentication server timed out.\n"
+                "Please check your internet connection and try again."
+            ) from None
+        except requests.exceptions.ConnectionError:
+            # If there was a connection error
+            print("Error: Connection error")
+            raise AuthSourceError(
+                "Could not connect to the authentication server.\n"
+                "Please check your internet connection and try again."
+            ) from None
+        except requests.exceptions.RequestException as e:
+            print(f"Error: Request failed: {str(e)}")
+            raise AuthSourceError(
+                "The request to the authentication server failed.\n"
+                "Please try again."
+            ) from None
+
+        if response.status_code == 304:
+            return FetchResult(access_code=None, etag=etag)
+        if response.status_code != 200:
+            # If the server returned an error code
+            print(f"Server error: HTTP {response.status_code}")
+            raise AuthSourceError(
+                f"Could not connect to the authentication server (HTTP {response.status_code}).\n"
+                "Please check your internet connection and try again."
+            )
+        return FetchResult(
+            access_code=parse_access_code(response.text),
+            etag=response.headers.get("ETag"),
+        )
+
+
+class FileAccessCodeSource:
+    """Reads pass.json from a local file; the ETag is derived from its mtime and size"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def fetch(self, etag: Optional[str] = None) -> FetchResult:
+        try:
+            stat = os.stat(self.path)
+            current = f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+            if etag and etag == current:
+                return FetchResult(access_code=None, etag=etag)
+            with open(self.path, encoding="utf-8-sig") as f:
+                text = f.read()
+        except OSError as e:
+            print(f"Error: Cannot read password file: {e}")
+            raise AuthSourceError(
+                f"Could not read the password file {self.path}.\n"
+                "Please contact the administrator."
+            ) from None
+        return FetchResult(access_code=parse_access_code(text), etag=current)
+
+
+def source_from_location(location: str):
+    """Build an access code source from a URL or file path"""
+    if location.startswith(("http://", "https://")):
+        return HttpAccessCodeSource(location)
+    if location.startswith("file://"):
+        location = location[len("file://"):]
+    return FileAccessCodeSource(location)
+
+
+def default_cache_path() -> str:
+    """Per-user location of the cache file"""
+    base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".autotype")
+    return os.path.join(base, "AutoType", "auth_cache.json")
+
+
+def _hash_code(code: str, salt: bytes, iterations: int) -> bytes:
+    return hashlib.pbkdf2_hmac("sha256", code.encode("utf-8"), salt, iterations)
+
+
+class AuthCache:
+    """
+    Offline password verification backed by a salted hash on disk.
+
+    verify() never touches the network. refresh() asks the source for the
+    current access code (conditionally, with the stored ETag) and rewrites
+    the cache; refresh_in_background() does the same on a daemon thread.
+    """
+
+    def __init__(self, source, path: Optional[str] = None, ttl: float = DEFAULT_TTL):
+        self.source = source
+        self.path = path or default_cache_path()
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def _load(self) -> Optional[dict]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                entry = json.load(f)
+            # Entries made for a different source must not be trusted
+            if entry.get("source") != self._source_id():
+                return None
+            return entry
+        except (OSError, ValueError):
+            return None
+
+    def _store(self, entry: dict) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(temp_path, self.path)
+
+    def _source_id(self) -> str:
+        return getattr(self.source, "url", None) or getattr(self.source, "path", "")
+
+    def is_fresh(self) -> bool:
+        """Whether the cache holds an access code younger than the TTL"""
+        entry = self._load()
+        return entry is not None and time.time() - entry.get("fetched_at", 0) < self.ttl
+
+    def verify(self, password: str, allow_stale: bool = False) -> Optional[bool]:
+        """
+        Check a password against the cached hash.
+
+        Returns None when there is no usable cache entry (missing, or older
+        than the TTL unless allow_stale is set), otherwise True or False.
+        """
+        entry = self._load()
+        if entry is None:
+            return None
+        if not allow_stale and time.time() - entry.get("fetched_at", 0) >= self.ttl:
+            return None
+        try:
+            salt = binascii.unhexlify(entry["salt"])
+            expected = binascii.unhexlify(entry["hash"])
+            iterations = int(entry.get("iterations", HASH_ITERATIONS))
+        except (KeyError, ValueError, binascii.Error):
+            return None
+        return hmac.compare_digest(_hash_code(password, salt, iterations), expected)
+
+    def refresh(self) -> None:
+        """Fetch the access code from the source and update the cache (raises AuthSourceError)"""
+        with self._lock:
+            entry = self._load()
+            etag = entry.get("etag") if entry else None
+            result = self.source.fetch(etag)
+            if result.access_code is None and entry is not None:
+                # Not modified - the cached hash is still valid
+                entry["fetched_at"] = time.time()
+            else:
+                if result.access_code is None:
+                    # Source said "not modified" but we have nothing cached
+                    result = self.source.fetch(None)
+                salt = os.urandom(16)
+                entry = {
+                    "source": self._source_id(),
+                    "salt": binascii.hexlify(salt).decode("ascii"),
+                    "hash": binascii.hexlify(
+                        _hash_code(result.access_code, salt, HASH_ITERATIONS)
+                    ).decode("ascii"),
+                    "iterations": HASH_ITERATIONS,
+                    "etag": result.etag,
+                    "fetched_at": time.time(),
+                }
+            try:
+                self._store(entry)
+            except OSError as e:
+                print(f"Warning: Could not write authentication cache: {e}")
+
+    def check(self, password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verify a password, offline when the cache allows it.
+
+        Safe to call from a worker thread: nothing here touches the UI.
+        Returns (authenticated, error message to show or None).
+        """
+        # Fast path: compare against the cached salted hash, no network needed
+        if self.verify(password):
+            # Pick up a changed access code for next time without blocking
+            self.refresh_in_background()
+            return True, None
+
+        try:
+            # Cache missing, expired or not matching (the code may have changed)
+            self.refresh()
+        except AuthCancelled:
+            return False, None
+        except AuthSourceError as e:
+            # Offline or air-gapped: fall back to an expired cache entry if there is one
+            verdict = self.verify(password, allow_stale=True)
+            if verdict is not None:
+                print("Warning: Authentication source unreachable, using cached access code")
+                return verdict, None
+            return False, str(e)
+        except Exception as e:
+            # Any other unexpected errors
+            print(f"Unexpected error: {str(e)}")
+            return False, (
+                f"An unexpected error occurred: {str(e)}\n"
+                "Please contact the administrator."
+            )
+
+        return bool(self.verify(password)), None
+
+    def cancel(self) -> None:
+        """Abandon any request the source has in flight; check() then returns (False, None)"""
+        cancel = getattr(self.source, "cancel", None)
+        if cancel is not None:
+            cancel()
+
+    def refresh_in_background(self) -> None:
+        """Refresh the cache on a daemon thread; failures are only logged"""
+        if self._refreshing:
+            return
+        self._refreshing = True
+
+        def worker():
+            try:
+                self.refresh()
+            except AuthCancelled:
+                pass
+            except AuthSourceError as e:
+                print(f"Background authentication refresh failed: {e}")
+            except Exception as e:
+                print(f"Unexpected error refreshing authentication cache: {str(e)}")
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=worker, daemon=True).start()
+
+
+_default_cache = None
+
+
+def get_auth_cache() -> AuthCache:
+    """Shared cache for the configured source (AUTOTYPE_AUTH_SOURCE, default: GitHub)"""
+    global _default_cache
+    if _default_cache is None:
+        location = os.environ.get("AUTOTYPE_AUTH_SOURCE", DEFAULT_SOURCE)
+        _default_cache = AuthCache(source_from_location(location))
+    return _default_cache
@@ -0,0 +1,173 @@
+"""
+Auto Type - Auto Indent
+Compensates for code editors that indent new lines by themselves. After
+Enter such an editor starts the new line with whitespace of its own, and
+typing the source's leading spaces and tabs on top of it doubles the
+indentation, besides sending thousands of needless keys on a big file.
+
+The keys to send are planned once, before typing starts, for one of two
+kinds of editor:
+
+    INDENT_OFF    type every character as it is (the default)
+    INDENT_KEEP   the editor starts a new line with the indentation of the
+                  line before it (Notepad++, Sublime Text, VS Code and most
+                  IDEs); only the difference is typed, and a line indented
+                  less than the one before is fixed with Shift+Home
+    INDENT_CLEAR  what the editor inserts cannot be predicted (e.g. smart
+                  indent after ":" or "{"); every line starts with
+                  Shift+Home, so the first key typed replaces the insertion
+
+In the planned keys, SELECT_LINE_START stands for Shift+Home, which selects
+the whitespace from the cursor back to the start of the line. Lines that
+end up empty are cleared, so the text in the editor is exactly the source.
+"""
+import re
+from array import array
+from itertools import chain
+from typing import Iterable, Iterator, Optional
+
+from typo_model import BACKSPACE, EditPlan
+
+INDENT_OFF = "off"
+INDENT_KEEP = "keep"
+INDENT_CLEAR = "clear"
+INDENT_MODES = (INDENT_OFF, INDENT_KEEP, INDENT_CLEAR)
+
+# Typed for each Shift+Home in a plan
+SELECT_LINE_START = "\x01"
+
+_LINE_BREAKS = re.compile("\r\n|[\r\n]")
+_INDENT = re.compile("[ \t]*")
+
+
+def iter_indent_segments(segments: Iterable[str]) -> Iterator[str]:
+    """
+    Move the leading whitespace at the end of a segment to the next one.
+
+    An IndentPlanner can only compare a line's indentation with the
+    editor's once it has all of it, so no segment (but the last) may end
+    inside the leading whitespace of a line.
+    """
+    carry = ""
+    for segment in segments:
+        segment = carry + segment
+        line_start = max(segment.rfind("\n"), segment.rfind("\r")) + 1
+        tail = segment[line_start:]
+        carry = tail if _INDENT.fullmatch(tail) else ""
+        segment = segment[:len(segment) - len(carry)]
+        if segment:
+            yield segment
+    if carry:
+        yield carry
+
+
+class IndentPlanner:
+    """
+    Plans the keys for consecutive pieces of one text, e.g. the segments of
+    typing_engine.iter_schedules, keeping track of the editor's
+    indentation from one piece to the next.
+
+    at_line_start tells whether the cursor starts at the beginning of a
+    line, with inserted already on it: nothing when typing starts, unknown
+    (None) when it resumes right after a line break the editor has indented.
+    When typing resumes in the middle of a line, the indentation of that
+    line is not known. Call finish() before
+    planning the final piece of a text, or the piece before a paste, so the
+    indentation the editor puts after its final line break is cleared as
+    well.
+    """
+
+    def __init__(self, mode: str, at_line_start: bool = True,
+                 inserted: Optional[str] = ""):
+        if mode not in (INDENT_KEEP, INDENT_CLEAR):
+            raise ValueError(f"unknown auto indent mode '{mode}'")
+        self.mode = mode
+        # Nothing has been typed on the current line yet
+        self._fresh = at_line_start
+        # Whitespace at the start of the current line (None: unknown)
+        self._screen = inserted if at_line_start else None
+        self._last = False  # The next piece ends the text (see finish)
+
+    @property
+    def pending(self) -> bool:
+        """Whether the editor's indentation after the last line break may still need clearing"""
+        return self._fresh and self._screen != ""
+
+    def finish(self) -> None:
+        """Make the next plan() clear the indentation after its final line break"""
+        self._last = True
+
+    def _line_break(self) -> None:
+        """The editor's part of an Enter: a new line, with its indentation"""
+        self._fresh = True
+        if self.mode == INDENT_CLEAR:
+            self._screen = None
+
+    def plan(self, text: str) -> EditPlan:
+        """
+        The keys that leave exactly text in the editor.
+
+        The plan's confirmed counts count indentation the editor inserts as
+        typed once a key after it is sent.
+        """
+        last, self._last = self._last, False
+        keys = []
+        confirmed = array("q", [0])
+        position = 0
+        for match in chain(_LINE_BREAKS.finditer(text), (None,)):
+            end = match.start() if match is not None else len(text)
+            if position < end or match is not None or (last and self.pending):
+                if self._fresh:
+                    self._plan_line(text, position, end, keys, confirmed)
+                else:
+                    keys.append(text[position:end])
+                    confirmed.extend(range(position + 1, end + 1))
+            if match is None:
+                break
+            keys.append(match.group())
+            position = match.end()
+            confirmed.extend(range(match.start() + 1, position + 1))
+            self._line_break()
+        return EditPlan("".join(keys), confirmed, 0)
+
+    def _plan_line(self, text: str, start: int, end: int, keys, confirmed: array) -> None:
+        """Keys for the line text[start:end], sent while the cursor is after the editor's indentation"""
+        line = text[start:end]
+        indent = _INDENT.match(line).group()
+        inserted = self._screen
+        if inserted is not None and indent.startswith(inserted):
+            # The editor's indentation is right as far as it goes
+            if len(confirmed) > 1 and confirmed[-1] == start:
+                confirmed[-1] += len(inserted)  # Inserted with the Enter
+            start += len(inserted)
+            keys.append(text[start:end])
+            confirmed.extend(range(start + 1, end + 1))
+        else:
+            # Select the editor's indentation; the first key typed replaces
+            # it, and an empty line types a space to erase the selection with
+            # (the selection itself may be empty)
+            keys.append(SELECT_LINE_START)
+            confirmed.append(start)
+            if not line:
+                erase = BACKSPACE if inserted else " " + BACKSPACE
+                keys.append(erase)
+                confirmed.extend([start] * len(erase))
+            else:
+                keys.append(line)
+                confirmed.extend(range(start + 1, end + 1))
+        self._screen = indent
+        self._fresh = False
+
+    def skip(self, text: str) -> None:
+        """Follow text that reached the editor without auto indent (a paste)"""
+        if not text:
+            return
+        line_start = max(text.rfind("\n"), text.rfind("\r")) + 1
+        if line_start:
+            last = text[line_start:]
+            self._fresh = not last
+            self._screen = _INDENT.match(last).group()
+        else:
+            if self._fresh:
+                self._screen = None
+            self._fresh = False
@@ -1,29 +1,16 @@
+import dataclasses
 import threading
-import time
-import random
 import platform
 import os
 import ctypes
-import json
-from dataclasses import dataclass
-from typing import Optional, Tuple, Callable
+from typing import Optional, Tuple
 
-# Try to import requests for password validation
-try:
-    import requests
-except ImportError as e:
-    raise ImportError(
-        "Missing dependency 'requests'. Install with: pip install requests"
-    ) from e
-
-# Make sure we're running on Windows
-if platform.system() != "Windows":
-    raise RuntimeError("This application is designed to run only on Windows systems.")
+# Heavy or optional dependencies (requests, pyautogui) are imported
+# on first use so the login dialog appears as quickly as possible
 
 # Modern UI toolkit
 try:
     import customtkinter as ctk
-    from customtkinter import ThemeManager
 except ImportError as e:
     raise ImportError(
         "Missing dependency 'customtkinter'. Install with: pip install customtkinter"
@@ -32,53 +19,67 @@ except ImportError as e:
 # Standard Tkinter for some components
 try:
     import tkinter as tk
-    from tkinter import messagebox
+    from tkinter import messagebox, filedialog
 except Exception as e:
     raise RuntimeError("Tkinter is required but not available.")
 
-# PyAutoGUI for keyboard and mouse control
-try:
-    import pyautogui
-    
-    # Prevent accidental edge triggering
-    pyautogui.FAILSAFE = False
-    
-    # Make PyAutoGUI operations faster with minimal pauses
-    pyautogui.PAUSE = 0.01
-    
-except ImportError as e:
-    raise ImportError(
-        "Missing dependency 'pyautogui'. Install with: pip install pyautogui"
-    ) from e
+from typing_engine import (
+    TypingConfig,
+    StopEvent,
+    ProgressChannel,
+    create_batching,
+    compile_schedule,
+    estimate_duration,
+    execute_schedule,
+    format_duration,
+    iter_schedules,
+)
+from text_sources import iter_file_text
+from auto_indent import INDENT_MODES, INDENT_OFF
+from keystroke_backends import available_backends, create_backend
+from paste_plan import PASTE_MODES, PASTE_OFF, choose_paste_mode
+from auth_cache import get_auth_cache
+from stop_hotkey import GlobalStopHotkey
+from backpressure import monitor_window
+from window_target import (
+    ReadinessWaits,
+    WindowTarget,
+    focus_window,
+    foreground_window,
+    has_input_focus,
+    is_minimized,
+    root_window,
+    window_class,
+    window_from_point,
+)
+from checkpoint import CheckpointStore, CheckpointWriter, hash_config, hash_file, hash_text
+from job_queue import JobQueue, JobScheduler, TypingJob
+from telemetry import span, start_tracing, stop_tracing, trace_path_from_env
 
-# Import PIL for image handling
-try:
-    from PIL import Image, ImageTk
-except ImportError:
-    raise ImportError(
-        "Missing dependency 'pillow'. Install with: pip install pillow"
-    )
 
-# Windows-specific imports
-try:
-    import win32api
-    import win32con
-    import win32gui
-    HAVE_WIN32API = True
-except ImportError:
-    print("Warning: pywin32 not found. Some Windows-specific features will be disabled.")
-    print("Install with: pip install pywin32")
-    HAVE_WIN32API = False
+_pyautogui = None
+
+
+def get_pyautogui():
+    """Import and configure pyautogui the first time it is needed"""
+    global _pyautogui
+    if _pyautogui is None:
+        try:
+            import pyautogui
+        except ImportError as e:
+            raise ImportError(
+                "Missing dependency 'pyautogui'. Install with: pip install pyautogui"
+            ) from e
+        
+        # Prevent accidental edge triggering
+        pyautogui.FAILSAFE = False
+        
+        # Make PyAutoGUI operations faster with minimal pauses
+        pyautogui.PAUSE = 0.01
+        _pyautogui = pyautogui
+    return _pyautogui
+
 
-@dataclass
-class TypingConfig:
-    """Configuration for typing behavior"""
-    wpm: float = 40.0           # words per minute (5 chars per word convention)
-    humanize: bool = True       # Add human-like randomness to typing
-    countdown_sec: int = 5      # Countdown before starting to type
-    windows_focus: bool = True  # Use Windows-specific focus methods
-    
-    
 class AppColors:
     """Color scheme for the application"""
     BG_COLOR = "#1E1E2E"  # Dark background
@@ -100,184 +101,24 @@ def is_admin():
         
         
 def validate_password(password):
-    """Validates the password against the one stored in the pastebin URL"""
-    url = "https://raw.githubusercontent.com/bilalmirzatrader/AutoTyper/refs/heads/main/pass.json"
-    
-    try:
-        # Try to fetch the password from Pastebin with a timeout
-        response = requests.get(url, timeout=5)
-        
-        if response.status_code == 200:
-            try:
-                # Try to parse the JSON response
-                data = json.loads(response.text)
-                correct_password = data.get("access_code", "")
-                if not correct_password:
-                    # If the access_code key is missing or empty
-                    print("Error: Missing 'access_code' in the password data")
-                    messagebox.showerror(
-                        "Authentication Error",
-                        "The password verification data is invalid. Please contact the administrator."
-                    )
-                    return False
-                    
-                # Compare the passwords
-                return password == correct_password
-            except json.JSONDecodeError:
-                # If the response is not valid JSON
-                print("Error: Invalid JSON in password data")
-                messagebox.showerror(
-                    "Authentication Error",
-                    "The password verification data is corrupted. Please contact the administrator."
-                )
-                return False
-        else:
-            # If the server returned an error code
-            print(f"Server error: HTTP {response.status_code}")
-            messagebox.showerror(
-                "Authentication Error",
-                f"Could not connect to the authentication server (HTTP {response.status_code}).\n"
-                "Please check your internet connection and try again."
-            )
-            return False
-    except requests.exceptions.Timeout:
-        # If the request timed out
-        print("Error: Request timed out")
-        messagebox.showerror(
-            "Authentication Error",
-            "Connection to the authentication server timed out.\n"
-            "Please check your internet connection and try again."
-        )
-        return False
-    except requests.exceptions.ConnectionError:
-        # If there was a connection error
-        print("Error: Connection error")
-        messagebox.showerror(
-            "Authentication Error",
-            "Could not connect to the authentication server.\n"
-            "Please check your internet connection and try again."
-        )
-        return False
-    except Exception as e:
-        # Any other unexpected errors
-        print(f"Unexpected error: {str(e)}")
-        messagebox.showerror(
-            "Authentication Error",
-            f"An unexpected error occurred: {str(e)}\n"
-            "Please contact the administrator."
-        )
-        return False
+    """Validates the password against the access code, offline when the cache allows it"""
+    authenticated, error = get_auth_cache().check(password)
+    if error:
+        messagebox.showerror("Authentication Error", error)
+    return authenticated
 
 
-def human_typing(text: str, wpm: float, callback: Callable[[str], None] = None, 
-             stop_event: threading.Event = None) -> None:
-    """
-    Type text with human-like timing variations, optimized for Windows.
+class AutoTyperApp(ctk.CTk):
+    """Modern UI for auto typing application using CustomTkinter"""
     
-    Args:
-        text: Text to type
-        wpm: Words per minute (based on 5 chars = 1 word)
-        callback: Optional callback for status updates
-        stop_event: Event to check for stop requests
-    """
-    if not text:
-        return
-        
-    # Check for stop request
-    if stop_event and stop_event.is_set():
-        if callback:
-            callback("Typing stopped")
-        return
-        
-    # Base timing calculation - with speed boost
-    chars_per_second = (wpm * 6.0) / 60.0  # Increased from 5.0 to 6.0 for speed boost
-    base_delay = 1.0 / chars_per_second
+    # How often the status bar picks up updates from the typing thread
+    STATUS_REFRESH_MS = 50
     
-    # Batch size for faster typing (Windows optimization)
-    batch_size = 3  # Process more characters at once for faster typing
+    # Longest wait for the app to minimize and the target to become ready
+    READY_TIMEOUT = 0.5
     
-    # Type character by character
-    i = 0
-    while i < len(text):
-        # Check for stop request
-        if stop_event and stop_event.is_set():
-            if callback:
-                callback("Typing stopped")
-            return
-            
-        # Update status periodically
-        if callback and i % 10 == 0:
-            callback(f"Typing character {i+1}/{len(text)}")
-        
-        try:
-            # Get current character
-            char = text[i]
-            
-            # Check for stop request again
-            if stop_event and stop_event.is_set():
-                if callback:
-                    callback("Typing stopped")
-                return
-                
-            # Handle special characters separately
-            if char in ["\n", "\t", "\r"]:
-                if char == "\n" or char == "\r":
-                    pyautogui.press("enter")
-                elif char == "\t":
-                    pyautogui.press("tab")
-                
-                # Apply longer delay after special characters
-                delay = calculate_human_delay(base_delay * 2, char)
-                time.sleep(delay)
-                i += 1
-            else:
-                # Determine how many regular characters to batch together
-                end_idx = min(i + batch_size, len(text))
-                while end_idx > i and text[end_idx-1] in ["\n", "\t", "\r"]:
-                    end_idx -= 1  # Don't include special chars in batch
-                    
-                if end_idx > i:
-                    # Type the batch of characters
-                    chunk = text[i:end_idx]
-                    pyautogui.write(chunk, interval=0.01)  # Small interval between keys
-                    
-                    # Apply human-like delays between batches
-                    delay = calculate_human_delay(base_delay, ".")
-                    time.sleep(delay)
-                    
-                    i = end_idx
-                else:
-                    i += 1  # Shouldn't happen but prevents infinite loop
-            
-        except Exception as e:
-            if callback:
-                callback(f"Error typing at position {i}: {str(e)}")
-            i += 1  # Move on despite error
-            time.sleep(0.5)  # Pause after error
-    
-    if callback:
-        callback("Typing complete")
-
-
-def calculate_human_delay(base_delay: float, char: str) -> float:
-    """Calculate a human-like delay for the given character"""
-    # Add reduced randomness (70-120% of base speed) for faster typing
-    jitter = random.uniform(0.7, 1.2)
-    delay = base_delay * jitter
-    
-    # Add reduced extra pauses for punctuation and spaces
-    if char in {" ", "\t"}:
-        delay += random.uniform(0.01, 0.05)  # Reduced delay
-    elif char in {",", ".", ";", ":", "-", "—", "?", "!", ")"}:
-        delay += random.uniform(0.03, 0.12)  # Reduced delay
-    elif char in {"\n"}:
-        delay += random.uniform(0.05, 0.15)  # Reduced delay
-        
-    return max(0.005, delay)  # Lower minimum delay for faster typing
-
-
-class AutoTyperApp(ctk.CTk):
-    """Modern UI for auto typing application using CustomTkinter"""
+    # Typo rates offered in the options (see typo_model)
+    TYPO_RATES = {"None": 0.0, "1%": 0.01, "2%": 0.02, "5%": 0.05}
     
     def __init__(self):
         super().__init__()
@@ -299,8 +140,27 @@ class AutoTyperApp(ctk.CTk):
         
         # App state
         self.cursor_position = None
-        self.stop_event = threading.Event()
+        self.stop_event = StopEvent()
         self.typing_thread = None
+        self.target_hwnd = None  # Window found under the cursor position
+        self.window_target = None  # Window picked with Set Position (Windows only)
+        self._own_hwnd = None  # Our own top-level window, looked up once
+        
+        # Latest-value channels from the typing thread, drained once per UI frame
+        self.progress = ProgressChannel()
+        self.status_updates = ProgressChannel()
+        
+        # How far earlier jobs got, so a stopped job can be resumed
+        self.checkpoints = CheckpointStore()
+        
+        # Jobs typed back to back by "Run Queue", kept across restarts
+        self.job_queue = JobQueue()
+        
+        # Global hotkey that stops typing even while the app is minimized
+        self.stop_hotkey = GlobalStopHotkey(
+            self.stop_event,
+            on_trigger=lambda: self.after(0, self.on_stop)
+        )
         
         # Windows-specific flags
         self.admin_mode = is_admin()
@@ -333,7 +193,8 @@ class AutoTyperApp(ctk.CTk):
         instructions = (
             "1. Click 'Set Position' and then click anywhere on screen to select typing position\n"
             "2. Enter text and set typing speed (WPM)\n"
-            "3. Click 'Start Typing' to begin"
+            "3. Click 'Start Typing' to begin, or 'Add to Queue' to collect several\n"
+            "   texts and positions and type them all with 'Run Queue'"
         )
         
         instr_frame = ctk.CTkFrame(self)
@@ -386,6 +247,16 @@ class AutoTyperApp(ctk.CTk):
         text_label = ctk.CTkLabel(content_frame, text="Text to type:", anchor="w")
         text_label.grid(row=1, column=0, padx=15, pady=(10, 0), sticky="nw")
         
+        # Optional file source - streamed while typing instead of loaded here
+        self.source_path = None
+        self.file_btn = ctk.CTkButton(
+            content_frame,
+            text="Type from File...",
+            command=self.on_choose_file,
+            width=140,
+        )
+        self.file_btn.grid(row=1, column=0, padx=15, pady=(10, 0), sticky="ne")
+        
         self.text_box = ctk.CTkTextbox(
             content_frame, 
             wrap="word",
@@ -435,6 +306,67 @@ class AutoTyperApp(ctk.CTk):
         )
         win_focus_check.grid(row=0, column=0, padx=15, pady=10, sticky="w")
         
+        # Clicking places the caret at the picked position, as before window
+        # focus existed; with window focus it can be turned off to keep the
+        # mouse still and type wherever the caret was left
+        self.click_var = tk.BooleanVar(value=True)
+        ctk.CTkCheckBox(
+            win_frame,
+            text="Click the position to place the caret",
+            variable=self.click_var,
+            onvalue=True,
+            offvalue=False
+        ).grid(row=1, column=0, padx=15, pady=(0, 10), sticky="w")
+        
+        # Keystroke injection method
+        ctk.CTkLabel(win_frame, text="Input method:", anchor="e").grid(
+            row=0, column=1, padx=(15, 5), pady=10, sticky="e"
+        )
+        self.backend_var = tk.StringVar(value="auto")
+        backend_menu = ctk.CTkOptionMenu(
+            win_frame,
+            values=["auto"] + [name for name in available_backends() if name != "recording"],
+            variable=self.backend_var,
+            width=130
+        )
+        backend_menu.grid(row=0, column=2, padx=(5, 15), pady=10, sticky="e")
+        
+        # Typos that are corrected with backspace, like a human would
+        ctk.CTkLabel(win_frame, text="Typos:", anchor="e").grid(
+            row=1, column=1, padx=(15, 5), pady=(0, 10), sticky="e"
+        )
+        self.typo_var = tk.StringVar(value="None")
+        ctk.CTkOptionMenu(
+            win_frame,
+            values=list(self.TYPO_RATES),
+            variable=self.typo_var,
+            width=130
+        ).grid(row=1, column=2, padx=(5, 15), pady=(0, 10), sticky="e")
+        
+        # Paste through the clipboard instead of typing (all, or code blocks)
+        ctk.CTkLabel(win_frame, text="Paste:", anchor="e").grid(
+            row=2, column=1, padx=(15, 5), pady=(0, 10), sticky="e"
+        )
+        self.paste_var = tk.StringVar(value=PASTE_OFF)
+        ctk.CTkOptionMenu(
+            win_frame,
+            values=list(PASTE_MODES),
+            variable=self.paste_var,
+            width=130
+        ).grid(row=2, column=2, padx=(5, 15), pady=(0, 10), sticky="e")
+        
+        # Leave indentation to code editors that indent new lines themselves
+        ctk.CTkLabel(win_frame, text="Auto indent:", anchor="e").grid(
+            row=3, column=1, padx=(15, 5), pady=(0, 10), sticky="e"
+        )
+        self.indent_var = tk.StringVar(value=INDENT_OFF)
+        ctk.CTkOptionMenu(
+            win_frame,
+            values=list(INDENT_MODES),
+            variable=self.indent_var,
+            width=130
+        ).grid(row=3, column=2, padx=(5, 15), pady=(0, 10), sticky="e")
+        
         # Status area
         self.status_var = tk.StringVar(value="Ready")
         status_frame = ctk.CTkFrame(self, height=30, corner_radius=0)
@@ -485,6 +417,30 @@ class AutoTyperApp(ctk.CTk):
         )
         self.quit_btn.grid(row=0, column=2, padx=10, pady=10, sticky="ew")
         
+        # Job queue: collect several texts and positions, then type them all
+        ctk.CTkButton(
+            btn_frame,
+            text="Add to Queue",
+            command=self.on_add_to_queue,
+            height=30
+        ).grid(row=1, column=0, padx=10, pady=(0, 10), sticky="ew")
+        
+        self.run_queue_btn = ctk.CTkButton(
+            btn_frame,
+            text="Run Queue",
+            command=self.on_run_queue,
+            height=30
+        )
+        self.run_queue_btn.grid(row=1, column=1, padx=10, pady=(0, 10), sticky="ew")
+        
+        ctk.CTkButton(
+            btn_frame,
+            text="Clear Finished",
+            command=self.on_clear_queue,
+            height=30
+        ).grid(row=1, column=2, padx=10, pady=(0, 10), sticky="ew")
+        self._refresh_queue_button()
+        
         # Show admin status warning if needed
         if not self.admin_mode:
             self.after(1000, lambda: messagebox.showinfo(
@@ -514,7 +470,7 @@ class AutoTyperApp(ctk.CTk):
 
         # Save the current mouse position before opening overlay
         try:
-            self.pre_overlay_position = pyautogui.position()
+            self.pre_overlay_position = self.winfo_pointerxy()
         except:
             self.pre_overlay_position = None
         
@@ -539,11 +495,18 @@ class AutoTyperApp(ctk.CTk):
             # Get the exact screen coordinates
             x, y = event.x_root, event.y_root
             self.cursor_position = (x, y)
-            self.position_var.set(f"({x}, {y})")
-            self.status_var.set(f"Position set successfully at ({x}, {y})")
             self.overlay.destroy()
             self.set_pos_btn.configure(text="Set Position")
             
+            # Remember the window under the position, so typing can focus it
+            # by handle later instead of moving the mouse there
+            self.window_target = WindowTarget.from_point(x, y, exclude=self._own_window())
+            if self.window_target is not None:
+                self.position_var.set(f"({x}, {y}) - {self.window_target.describe()}")
+            else:
+                self.position_var.set(f"({x}, {y})")
+            self.status_var.set(f"Position set successfully at ({x}, {y})")
+            
             # Double-check if position was set correctly
             if self.cursor_position:
                 messagebox.showinfo(
@@ -561,7 +524,7 @@ class AutoTyperApp(ctk.CTk):
             # Restore original mouse position if possible
             if self.pre_overlay_position:
                 try:
-                    pyautogui.moveTo(self.pre_overlay_position[0], self.pre_overlay_position[1], duration=0.2)
+                    get_pyautogui().moveTo(self.pre_overlay_position[0], self.pre_overlay_position[1], duration=0.2)
                 except:
                     pass
             
@@ -569,39 +532,81 @@ class AutoTyperApp(ctk.CTk):
         self.overlay.bind("<Escape>", on_escape)
         self.overlay.focus_force()
         
+    def _own_window(self) -> Optional[int]:
+        """Handle of the app's own top-level window (Windows only)"""
+        if self._own_hwnd is None:
+            self._own_hwnd = root_window(self.winfo_id())
+        return self._own_hwnd
+        
     def windows_set_foreground_window(self, x, y):
         """Windows-specific method to set focus to the window under the given coordinates"""
-        if not HAVE_WIN32API:
-            return False
-            
         try:
-            # Get window handle at the position
-            hwnd = win32gui.WindowFromPoint((x, y))
-            if hwnd:
-                # Make sure it's not our own window
-                if hwnd != win32gui.FindWindow(None, self.title()):
-                    # Try multiple focus methods for better reliability
-                    win32gui.SetForegroundWindow(hwnd)
-                    win32gui.SetActiveWindow(hwnd)
-                    win32gui.BringWindowToTop(hwnd)
-                    return True
+            # Top-level window at the position, unless it is our own
+            hwnd = root_window(window_from_point(x, y))
+            if hwnd and hwnd != self._own_hwnd:
+                self.target_hwnd = hwnd
+                return focus_window(hwnd)
         except Exception as e:
             print(f"Windows focus error: {str(e)}")
             
         return False
         
-    def on_start(self):
-        """Start typing process"""
+    def _minimize_for_typing(self, waits: ReadinessWaits):
+        """Minimize the app from the typing thread and wait until it is"""
+        if not self.winfo_exists():
+            return
+        iconified = threading.Event()
+        
+        def iconify():
+            self.iconify()
+            iconified.set()
+            
+        self.after(0, iconify)
+        own = self._own_hwnd
+        waits.wait("minimize",
+                   lambda: iconified.is_set() and (own is None or is_minimized(own)),
+                   self.READY_TIMEOUT)
+        
+    def on_choose_file(self):
+        """Pick a text file to type, or clear the current one"""
+        if self.source_path:
+            self.source_path = None
+            self.file_btn.configure(text="Type from File...")
+            self.text_box.configure(state="normal")
+            self.status_var.set("Typing from text box")
+            return
+            
+        path = filedialog.askopenfilename(
+            title="Choose a text file to type",
+            filetypes=[("Text files", "*.txt"), ("All files", "*.*")]
+        )
+        if not path:
+            return
+            
+        # The file is streamed while typing, so it is never loaded into the text box
+        self.source_path = path
+        self.file_btn.configure(text="Clear File")
+        self.text_box.configure(state="disabled")
+        size_kb = os.path.getsize(path) / 1024
+        self.status_var.set(f"Typing from file: {os.path.basename(path)} ({size_kb:,.0f} KB)")
+        
+    def _collect_input(self) -> Optional[Tuple[Optional[str], float]]:
+        """Validated (text, wpm) from the form, or None after showing an error"""
         # Check if position is set
         if not self.cursor_position:
             self.show_error("No position set", "Please set a cursor position first.")
-            return
+            return None
             
-        # Get the text
-        text = self.text_box.get("0.0", "end").strip()
-        if not text:
-            self.show_error("No text", "Please enter some text to type.")
-            return
+        # Get the text (a chosen file is read while typing instead)
+        text = None
+        if not self.source_path:
+            text = self.text_box.get("0.0", "end").strip()
+            if not text:
+                self.show_error("No text", "Please enter some text to type.")
+                return None
+        elif not os.path.isfile(self.source_path):
+            self.show_error("File not found", f"Cannot find {self.source_path}.")
+            return None
             
         # Get typing speed
         try:
@@ -610,7 +615,15 @@ class AutoTyperApp(ctk.CTk):
                 raise ValueError("WPM must be positive")
         except ValueError:
             self.show_error("Invalid speed", "Please set a valid typing speed.")
+            return None
+        return text, wpm
+        
+    def on_start(self):
+        """Start typing process"""
+        collected = self._collect_input()
+        if collected is None:
             return
+        text, wpm = collected
             
         # Check if already typing
         if self.typing_thread and self.typing_thread.is_alive():
@@ -622,28 +635,67 @@ class AutoTyperApp(ctk.CTk):
             wpm=wpm, 
             humanize=True, 
             countdown_sec=5,
-            windows_focus=self.win_focus_var.get()
+            windows_focus=self.win_focus_var.get(),
+            typo_rate=self.TYPO_RATES[self.typo_var.get()],
+            paste_mode=self.paste_var.get(),
+            auto_indent=self.indent_var.get(),
+            backend=self.backend_var.get()
         )
         
-        # Start typing
-        self.start_typing(text, config)
+        # Offer to continue a job that was stopped partway
+        try:
+            text_hash = hash_file(self.source_path) if self.source_path else hash_text(text)
+        except OSError as e:
+            self.show_error("Cannot read file", f"Cannot read {self.source_path}: {e}")
+            return
+        start = 0
+        checkpoint = self.checkpoints.load(text_hash, hash_config(config))
+        if checkpoint is not None:
+            answer = messagebox.askyesnocancel(
+                "Resume Typing?",
+                f"This text was stopped after {checkpoint.describe()}.\n\n"
+                "Yes: continue from there\n"
+                "No: start over from the beginning"
+            )
+            if answer is None:
+                return
+            if answer:
+                start = checkpoint.offset
         
-    def start_typing(self, text: str, config: TypingConfig):
-        """Start the typing process in a separate thread"""
+        # Start typing
+        self.start_typing(text, config, self.source_path, start, text_hash, self.click_var.get())
+        
+    def start_typing(self, text: Optional[str], config: TypingConfig,
+                     source_path: Optional[str] = None, start: int = 0,
+                     text_hash: Optional[str] = None, click: bool = True):
+        """
+        Start the typing process in a separate thread (from text, or streamed
+        from source_path), skipping the first start characters. With a
+        text_hash, progress is checkpointed so the job can be resumed. When
+        the target window is focused by handle, click decides whether the
+        position is still clicked to place the caret.
+        """
         # Reset stop event
         self.stop_event.clear()
+        self._own_window()  # Looked up here, on the UI thread
         
         # Update UI
         self.start_btn.configure(state="disabled")
         self.stop_btn.configure(state="normal")
         self.status_var.set("Preparing to type...")
         
+        # Register the global stop hotkey for the duration of the run
+        hotkey_hint = ""
+        if self.stop_hotkey.start():
+            hotkey_hint = f"Press {self.stop_hotkey.label} at any time to stop.\n"
+        
         # Show info dialog
         self.withdraw()  # Hide main window temporarily
         messagebox.showinfo(
             "Ready to Type",
             "The app will minimize while typing.\n"
-            f"Typing will begin after a {config.countdown_sec} second countdown.\n\n"
+            f"Typing will begin after a {config.countdown_sec} second countdown.\n"
+            f"{hotkey_hint}\n"
             "DO NOT close the app until typing is complete."
         )
         self.deiconify()  # Show main window again
@@ -651,10 +703,100 @@ class AutoTyperApp(ctk.CTk):
         # Start typing thread
         self.typing_thread = threading.Thread(
             target=self._typing_worker,
-            args=(text, config),
+            args=(text, config, source_path, start, text_hash, click),
             daemon=True
         )
         self.typing_thread.start()
+        self.after(self.STATUS_REFRESH_MS, self._poll_updates)
+        
+    def _refresh_queue_button(self):
+        """Show the number of waiting jobs on the Run Queue button"""
+        self.run_queue_btn.configure(text=f"Run Queue ({self.job_queue.pending_count()})")
+        
+    def on_add_to_queue(self):
+        """Add the current text (or file), position and speed to the job queue"""
+        collected = self._collect_input()
+        if collected is None:
+            return
+        text, wpm = collected
+        # A known window is focused by handle; the position is then only
+        # clicked if the caret must be placed
+        target = self.window_target if self.win_focus_var.get() else None
+        job = self.job_queue.add(TypingJob(
+            text=text,
+            source_path=self.source_path,
+            position=self.cursor_position if target is None or self.click_var.get() else None,
+            window=target.title if target is not None else None,
+            window_class=target.class_name if target is not None else None,
+            wpm=wpm
+        ))
+        self._refresh_queue_button()
+        self.status_var.set(f"Queued '{job.name}' - {self.job_queue.pending_count()} jobs waiting")
+        
+    def on_clear_queue(self):
+        """Remove the jobs that are done or failed from the queue"""
+        self.job_queue.clear_finished()
+        self._refresh_queue_button()
+        self.status_var.set(f"{self.job_queue.pending_count()} jobs waiting")
+        
+    def on_run_queue(self):
+        """Type every waiting job back to back, without a dialog per job"""
+        if self.typing_thread and self.typing_thread.is_alive():
+            self.show_error("Already typing", "Typing is already in progress.")
+            return
+        if not self.job_queue.pending_count():
+            self.show_error("Queue empty", "Add jobs with 'Add to Queue' first.")
+            return
+            
+        self.stop_event.clear()
+        self._own_window()  # Looked up here, on the UI thread
+        self._toggle_buttons(True)
+        if self.stop_hotkey.start():
+            self.status_var.set(f"Running queue - press {self.stop_hotkey.label} to stop")
+            
+        config = TypingConfig(
+            windows_focus=self.win_focus_var.get(),
+            typo_rate=self.TYPO_RATES[self.typo_var.get()],
+            paste_mode=self.paste_var.get(),
+            auto_indent=self.indent_var.get(),
+            backend=self.backend_var.get()
+        )
+        scheduler = JobScheduler(
+            self.job_queue,
+            config,
+            stop_event=self.stop_event,
+            progress=self.progress,
+            checkpoints=self.checkpoints,
+            callback=self._update_status
+        )
+        self.typing_thread = threading.Thread(
+            target=self._queue_worker,
+            args=(scheduler,),
+            daemon=True
+        )
+        self.typing_thread.start()
+        self.after(self.STATUS_REFRESH_MS, self._poll_updates)
+        
+    def _queue_worker(self, scheduler: JobScheduler):
+        """Worker thread that runs the job queue"""
+        self._start_trace()
+        try:
+            # Minimize so the first job's target can take focus
+            self._minimize_for_typing(ReadinessWaits(self.stop_event))
+            
+            completed = scheduler.run()
+            left = self.job_queue.pending_count()
+            self._update_status(f"Queue finished: {completed} jobs typed, "
+                                f"{scheduler.chars_typed:,} characters, {left} left")
+        except Exception as e:
+            self._update_status(f"Error: {str(e)}")
+        finally:
+            self.stop_hotkey.stop()
+            self._write_trace()
+            if self.winfo_exists():
+                self.after(0, self.deiconify)
+                self.after(0, self._refresh_queue_button)
+            self._toggle_buttons(False)
         
     def on_stop(self):
         """Stop the typing process"""
@@ -668,10 +810,8 @@ class AutoTyperApp(ctk.CTk):
             self.lift()  # Bring window to front
             self.focus_force()  # Force focus
         
-        # Forcefully terminate the typing thread if it doesn't respond quickly
-        if self.typing_thread and self.typing_thread.is_alive():
-            # First try to stop gracefully
-            self.after(100, self._force_stop_typing)
+        # Every wait in the typing thread is interruptible, so it exits on
+        # its own within milliseconds of the stop event being set
             
         # Update UI immediately
         self._toggle_buttons(False)
@@ -690,9 +830,23 @@ class AutoTyperApp(ctk.CTk):
         messagebox.showerror(title, message)
         
     def _update_status(self, status: str):
-        """Thread-safe status update"""
-        if self.winfo_exists():
-            self.after(0, self.status_var.set, status)
+        """Thread-safe status update (shown on the next UI frame)"""
+        self.status_updates.publish(status)
+        
+    def _poll_updates(self):
+        """Show the latest progress and status from the typing thread, once per frame"""
+        alive = self.typing_thread is not None and self.typing_thread.is_alive()
+        
+        progress = self.progress.take()
+        if progress is not None:
+            self.status_var.set(progress.describe())
+        status = self.status_updates.take()
+        if status is not None:
+            self.status_var.set(status)
+            
+        # Keep polling until the thread has finished and its last update is shown
+        if alive:
+            self.after(self.STATUS_REFRESH_MS, self._poll_updates)
             
     def _toggle_buttons(self, typing_active: bool):
         """Thread-safe button state update"""
@@ -707,132 +861,172 @@ class AutoTyperApp(ctk.CTk):
         if self.winfo_exists():
             self.after(0, update)
             
-    def _check_stop_status(self):
-        """Check if typing has stopped and update UI accordingly"""
-        if not self.typing_thread or not self.typing_thread.is_alive():
-            self._toggle_buttons(False)
-            self.status_var.set("Typing stopped")
-        elif self.stop_event.is_set():
-            # If thread is still alive but stop was requested, check again in a moment
-            self.after(500, self._check_stop_status)
-            
-    def _force_stop_typing(self):
-        """Forcefully terminate typing if stop event doesn't work"""
-        if self.typing_thread and self.typing_thread.is_alive() and self.stop_event.is_set():
-            # Try to interrupt any pyautogui operations
-            try:
-                # Move mouse to corner to trigger failsafe
-                if not pyautogui.FAILSAFE:
-                    pyautogui.FAILSAFE = True
-                    
-                # Reset pyautogui state
-                pyautogui.mouseUp()
-                pyautogui.keyUp()
-                
-                # Move mouse to a corner (trigger failsafe)
-                screen_width, screen_height = pyautogui.size()
-                pyautogui.moveTo(screen_width - 1, 0, duration=0.1)
-            except:
-                pass
-                
-            self.status_var.set("Typing stopped")
-            self._toggle_buttons(False)
+    def _plan_typing(self, text: Optional[str], config: TypingConfig,
+                     source_path: Optional[str], start: int):
+        """
+        Plan the keystrokes: a text all at once, a file (or a text with a
+        paste or auto indent mode) segment by segment while it is typed.
+
+        Returns:
+            (schedule or schedules, characters to type if known, ETA text)
+        """
+        if source_path:
+            schedules = iter_schedules(iter_file_text(source_path), config, start=start)
+            # The file size stands in for its length; a resumed job has only the rest to type
+            remaining = max(os.path.getsize(source_path) - start, 0)
+            eta = estimate_duration(remaining, config.wpm)
+            return schedules, None, format_duration(eta)
+        chars = len(text) - start
+        if config.paste_mode != PASTE_OFF or config.auto_indent != INDENT_OFF:
+            # These follow the target across segments and resume at a line start
+            schedules = iter_schedules(text, config, start=start)
+            return schedules, chars, format_duration(estimate_duration(chars, config.wpm))
+        with span("plan", chars):
+            schedule = compile_schedule(text[start:], config)
+        return schedule, chars, format_duration(schedule.duration)
             
-    def _typing_worker(self, text: str, config: TypingConfig):
+    def _typing_worker(self, text: Optional[str], config: TypingConfig,
+                       source_path: Optional[str] = None, start: int = 0,
+                       text_hash: Optional[str] = None, click: bool = True):
         """Worker thread for typing process"""
+        self._start_trace()
         try:
             # Check if stop requested immediately
             if self.stop_event.is_set():
                 self._update_status("Stopped")
-                self._toggle_buttons(False)
                 return
                 
-            # Countdown - with more frequent stop checks
-            for remaining in range(config.countdown_sec, 0, -1):
-                if self.stop_event.is_set():
-                    self._update_status("Stopped before typing")
-                    self._toggle_buttons(False)
-                    return
-                    
-                self._update_status(f"Starting in {remaining} seconds...")
+            # Checkpoints go by the requested settings, which the target may override
+            config_hash = hash_config(config)
+            schedule, total_chars, eta = self._plan_typing(text, config, source_path, start)
                 
-                # Check for stop event more frequently (4 times per second)
-                for _ in range(4):
-                    if self.stop_event.is_set():
+            # Countdown - waiting on the stop event returns as soon as it is set
+            with span("countdown", config.countdown_sec):
+                for remaining in range(config.countdown_sec, 0, -1):
+                    self._update_status(f"Starting in {remaining} seconds... (typing takes ~{eta})")
+                    if self.stop_event.wait(1.0):
                         self._update_status("Stopped before typing")
-                        self._toggle_buttons(False)
                         return
-                    time.sleep(0.25)
-                
-            # Minimize application during typing
-            if self.winfo_exists():
-                self.after(0, self.iconify)
                 
-            # Give time for window to minimize
-            time.sleep(0.5)
+            # Every wait below ends as soon as its condition holds
+            waits = ReadinessWaits(self.stop_event)
+            with span("positioning"):
+                # Minimize application during typing
+                self._minimize_for_typing(waits)
             
-            # Move to the target position and click
-            if self.cursor_position:
-                self._update_status("Moving cursor to position...")
-                
-                # Move mouse smoothly
-                x, y = self.cursor_position
-                
-                # Try multiple approaches for better reliability
-                try:
-                    # First approach: Direct move
-                    pyautogui.moveTo(x, y, duration=0.1)
-                    
-                    # Windows-specific focus if enabled
-                    if config.windows_focus:
-                        focus_success = self.windows_set_foreground_window(x, y)
-                        # Give time for window to come to foreground
-                        time.sleep(0.5)
+                # Focus the target window by handle: no mouse movement
+                self.target_hwnd = None
+                if config.windows_focus and self.window_target is not None and self.window_target.focus():
+                    self.target_hwnd = self.window_target.hwnd
+                    if click:
+                        # Place the caret where the position was set
+                        get_pyautogui().click(*self.cursor_position)
+                        waits.wait("caret", lambda: has_input_focus(self.target_hwnd), self.READY_TIMEOUT)
                     
-                    # Double-check position and click
-                    pyautogui.moveTo(x, y, duration=0.1)  # Move again to ensure position
-                    
-                    # First click - to set focus
-                    pyautogui.click()
-                    time.sleep(0.3)
-                    
-                    # Second click - to ensure cursor position
-                    pyautogui.click()
+                # Otherwise click the target position
+                elif self.cursor_position:
+                    self._update_status("Moving cursor to position...")
+                    x, y = self.cursor_position
+                    pyautogui = get_pyautogui()
+                
+                    try:
+                        # Windows-specific focus if enabled
+                        if config.windows_focus:
+                            self.windows_set_foreground_window(x, y)
                     
-                    # Small delay to ensure focus and cursor position
-                    time.sleep(0.5)
+                        # Click to focus the window and place the caret, then wait
+                        # until the window is in front and ready for input
+                        pyautogui.click(x, y)
+                        self.target_hwnd = self.target_hwnd or root_window(window_from_point(x, y))
+                        if self.target_hwnd:
+                            waits.wait("foreground", lambda: foreground_window() == self.target_hwnd,
+                                       self.READY_TIMEOUT)
+                            waits.wait("caret", lambda: has_input_focus(self.target_hwnd),
+                                       self.READY_TIMEOUT)
                     
-                except Exception as e:
-                    self._update_status(f"Error positioning cursor: {str(e)}")
-                    # Continue anyway, some errors are expected
+                    except Exception as e:
+                        self._update_status(f"Error positioning cursor: {str(e)}")
+                        # Continue anyway, some errors are expected
             
+            # Targets that cannot take pastes (see paste_plan) are typed
+            paste_mode = choose_paste_mode(config.paste_mode,
+                                           window_class(self.target_hwnd or foreground_window()))
+            if paste_mode != config.paste_mode:
+                config = dataclasses.replace(config, paste_mode=paste_mode)
+                schedule, total_chars, _ = self._plan_typing(text, config, source_path, start)
+            
+            # Watch the target window so typing slows down if it falls behind
+            monitor = None
+            if config.backpressure and self.cursor_position:
+                monitor = monitor_window(self.target_hwnd or window_from_point(*self.cursor_position))
+                
             # Type the text with human-like timing
-            self._update_status("Typing started...")
+            self._update_status(f"Typing started (target ready after {waits.total * 1000:.0f} ms)...")
             
             # Check if stop requested before typing
             if self.stop_event.is_set():
                 self._update_status("Typing stopped")
                 return
                 
-            # Start typing with stop_event passed to the typing function
-            human_typing(text, config.wpm, self._update_status, self.stop_event)
+            # Replay the precompiled schedule with stop_event passed through
+            backend = create_backend(config.backend, self.stop_event)
+            writer = result = None
+            if text_hash:
+                writer = CheckpointWriter(
+                    self.checkpoints, text_hash, config_hash, self.progress,
+                    start=start, total_chars=len(text) if text is not None else None,
+                    source=os.path.basename(source_path) if source_path else "text"
+                )
+            try:
+                result = execute_schedule(
+                    schedule,
+                    backend,
+                    callback=self._update_status,
+                    stop_event=self.stop_event,
+                    total_chars=total_chars,
+                    progress=self.progress,
+                    batching=create_batching(config, monitor)
+                )
+            finally:
+                backend.close()
+                if monitor is not None:
+                    monitor.stop()
+                if writer is not None:
+                    writer.close(result.chars_typed if result else None,
+                                 completed=bool(result and result.completed))
             
             # Done
-            if not self.stop_event.is_set():
-                self._update_status("Typing completed successfully")
-            
-            # Restore window
-            if self.winfo_exists():
-                self.after(0, self.deiconify)
-                
-            # Reset button states
-            self._toggle_buttons(False)
+            if result.completed:
+                self._update_status(f"Typing completed successfully - {result.summary()}")
+            elif writer is not None:
+                self._update_status(f"Stopped after {start + result.chars_typed:,} characters - "
+                                    "press Start to resume")
             
         except Exception as e:
             self._update_status(f"Error: {str(e)}")
+        finally:
+            # However the run ended, restore the window and reset button states
             if self.winfo_exists():
                 self.after(0, self.deiconify)
             self._toggle_buttons(False)
+            self.stop_hotkey.stop()
+            self._write_trace()
+            
+    def _start_trace(self):
+        """Record telemetry for this run if AUTOTYPE_TRACE names a trace file"""
+        if trace_path_from_env():
+            start_tracing()
+            
+    def _write_trace(self):
+        """Export the telemetry of the run that just ended, if it was recorded"""
+        tracer = stop_tracing()
+        path = trace_path_from_env()
+        if tracer is None or not path:
+            return
+        try:
+            tracer.export(path)
+        except OSError as e:
+            print(f"Warning: Could not write trace: {e}")
 
 
 def show_password_dialog():
@@ -895,36 +1089,72 @@ def show_password_dialog():
     button_frame.grid(row=3, column=0, padx=20, pady=(10, 20), sticky="ew")
     button_frame.grid_columnconfigure((0, 1), weight=1)
     
+    # Verification runs on a worker thread so the dialog stays responsive.
+    # Every attempt is numbered so results of cancelled attempts are dropped.
+    pending = {"attempt": 0, "busy": False}
+    
     def on_cancel():
+        if pending["busy"]:
+            # Abandon the request in flight; its result will be ignored
+            get_auth_cache().cancel()
+        pending["attempt"] += 1
+        pending["busy"] = False
         result["authenticated"] = False
         dialog.destroy()
         root.destroy()
     
-    def on_login():
-        password = password_var.get()
-        status_var.set("Verifying password...")
-        dialog.update()
+    def on_verified(attempt, authenticated, error):
+        if attempt != pending["attempt"]:
+            return  # Cancelled while verifying
+        pending["busy"] = False
         
-        if validate_password(password):
+        if authenticated:
             result["authenticated"] = True
             dialog.destroy()
             root.destroy()
+            return
+            
+        login_btn.configure(state="normal")
+        if error:
+            status_var.set("Could not verify password.")
+            messagebox.showerror("Authentication Error", error, parent=dialog)
         else:
             status_var.set("Invalid password. Please try again.")
-            password_entry.delete(0, tk.END)
-            password_entry.focus_set()
+        password_entry.delete(0, tk.END)
+        password_entry.focus_set()
+    
+    def on_login():
+        # Ignore repeated submissions (e.g. Enter pressed again) while verifying
+        if pending["busy"]:
+            return
+        pending["busy"] = True
+        pending["attempt"] += 1
+        attempt = pending["attempt"]
+        password = password_var.get()
+        status_var.set("Verifying password...")
+        login_btn.configure(state="disabled")
+        
+        def worker():
+            authenticated, error = get_auth_cache().check(password)
+            try:
+                dialog.after(0, on_verified, attempt, authenticated, error)
+            except (RuntimeError, tk.TclError):
+                pass  # Dialog already closed
+                
+        threading.Thread(target=worker, daemon=True).start()
     
     # Handle enter key
     dialog.bind("<Return>", lambda event: on_login())
     dialog.bind("<Escape>", lambda event: on_cancel())
     
-    ctk.CTkButton(
+    login_btn = ctk.CTkButton(
         button_frame,
         text="Login",
         command=on_login,
         fg_color=AppColors.SUCCESS,
         text_color="#212121"
-    ).grid(row=0, column=0, padx=(0, 5), pady=0, sticky="ew")
+    )
+    login_btn.grid(row=0, column=0, padx=(0, 5), pady=0, sticky="ew")
     
     ctk.CTkButton(
         button_frame,
@@ -958,9 +1188,6 @@ def main():
             windll.shcore.SetProcessDpiAwareness(1)
         except:
             pass  # If it fails, continue anyway
-            
-        # Fix for Windows key sending lag
-        pyautogui.PAUSE = 0.01  # Faster key operations on Windows
         
         # Initialize CTk before showing the password dialog
         ctk.set_appearance_mode("dark")
@@ -0,0 +1,428 @@
+"""
+Auto Type - Command Line Interface
+Runs the typing engine without any UI, for scripted and batch use:
+
+    python -m autotype_cli notes.txt --wpm 90 --countdown 3 --position 640,480
+    python -m autotype_cli notes.txt --wpm 90 --dry-run
+    python -m autotype_cli notes.txt --wpm 90 --resume
+    python -m autotype_cli notes.txt --wpm 90 --position 640,480 --enqueue
+    python -m autotype_cli --run-queue
+    python -m autotype_cli notes.txt --wpm 90 --trace run.json
+
+Only the engine modules are imported, so startup takes milliseconds and
+works on any OS (dry runs need no keystroke backend at all).
+"""
+import argparse
+import dataclasses
+import os
+import sys
+import time
+from array import array
+from typing import Iterable, List, Optional, Tuple
+
+from auto_indent import INDENT_MODES, INDENT_OFF
+from backpressure import monitor_window
+from checkpoint import CheckpointStore, CheckpointWriter, hash_config, hash_file
+from keystroke_backends import BACKENDS, create_backend
+from paste_plan import PASTE_MODES, PASTE_OFF, choose_paste_mode
+from stop_hotkey import GlobalStopHotkey
+from telemetry import span, start_tracing, stop_tracing
+from text_sources import iter_file_text, iter_text
+from typing_engine import (
+    EVENT_KEY,
+    EVENT_PASTE,
+    TIMING_DIGRAPH,
+    TIMING_UNIFORM,
+    KeystrokeSchedule,
+    ProgressChannel,
+    StopEvent,
+    TypingConfig,
+    calculate_wpm,
+    create_batching,
+    execute_schedule,
+    format_duration,
+    iter_schedules,
+)
+from window_target import (
+    ReadinessWaits,
+    WindowTarget,
+    foreground_window,
+    has_input_focus,
+    root_window,
+    window_class,
+    window_from_point,
+)
+
+# Longest wait for the clicked window to be in front and ready for input
+READY_TIMEOUT = 0.5
+
+
+def parse_position(value: str) -> Tuple[int, int]:
+    """Parse an "X,Y" screen position"""
+    try:
+        x, y = (int(part) for part in value.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected X,Y but got '{value}'") from None
+    return x, y
+
+
+def parse_rate(value: str) -> float:
+    """Parse a probability between 0 and 1"""
+    try:
+        rate = float(value)
+    except ValueError:
+        rate = -1.0
+    if not 0.0 <= rate <= 1.0:
+        raise argparse.ArgumentTypeError(f"expected a number between 0 and 1 but got '{value}'")
+    return rate
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m autotype_cli",
+        description="Type a text file with human-like timing, without the UI.",
+    )
+    parser.add_argument("file", nargs="?",
+                        help="Text file to type ('-' reads standard input)")
+    parser.add_argument("--wpm", type=float, default=80.0,
+                        help="Typing speed in words per minute (default: 80)")
+    parser.add_argument("--countdown", type=int,
+                        help="Seconds to wait before typing (default: 5, queued jobs: 0)")
+    parser.add_argument("--position", type=parse_position, metavar="X,Y",
+                        help="Click this screen position before typing")
+    parser.add_argument("--backend", default="auto", choices=["auto"] + list(BACKENDS),
+                        help="Keystroke backend (default: fastest available)")
+    parser.add_argument("--no-humanize", action="store_true",
+                        help="Type at a perfectly even rate")
+    parser.add_argument("--timing", default=TIMING_DIGRAPH, choices=[TIMING_DIGRAPH, TIMING_UNIFORM],
+                        help="Rhythm of humanized typing: digraph intervals fitted to real "
+                             "typing, or the older uniform jitter (default: digraph)")
+    parser.add_argument("--typo-rate", type=parse_rate, default=0.0, metavar="RATE",
+                        help="Chance per character of hitting a neighbouring key first and "
+                             "correcting it with backspace, e.g. 0.02 (default: 0)")
+    parser.add_argument("--paste", default=PASTE_OFF, choices=PASTE_MODES,
+                        help="Paste through the clipboard instead of typing: everything, or "
+                             "only code blocks in hybrid mode; targets that cannot take "
+                             "pastes are still typed (default: off)")
+    parser.add_argument("--auto-indent", default=INDENT_OFF, choices=INDENT_MODES,
+                        help="Leave indentation to a code editor that indents new lines: "
+                             "'keep' for editors that repeat the previous line's indentation, "
+                             "'clear' to replace whatever the editor inserts (default: off)")
+    parser.add_argument("--batch-size", type=int, metavar="N",
+                        help="Send N characters per keystroke call "
+                             "(default: adapt to the target application)")
+    parser.add_argument("--no-backpressure", action="store_true",
+                        help="Do not slow down when the target window falls behind")
+    parser.add_argument("--seed", type=int,
+                        help="Seed the random delays, for a reproducible rhythm")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue where typing this file last stopped")
+    parser.add_argument("--window", metavar="TITLE",
+                        help="Focus the window whose title contains TITLE before typing "
+                             "(without moving the mouse)")
+    parser.add_argument("--enqueue", action="store_true",
+                        help="Add the file to the job queue instead of typing it now")
+    parser.add_argument("--run-queue", action="store_true",
+                        help="Type every job in the queue, back to back")
+    parser.add_argument("--show-queue", action="store_true",
+                        help="List the queued jobs and their statistics")
+    parser.add_argument("--encoding", default="utf-8-sig",
+                        help="File encoding (default: utf-8 with optional BOM)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Print the timing plan and statistics without typing")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="Record where the time goes and write it to FILE "
+                             "(Chrome trace JSON, or CSV for a .csv name)")
+    parser.add_argument("--quiet", action="store_true",
+                        help="Only print the final result")
+    return parser
+
+
+def open_source(path: str, encoding: str) -> Iterable[str]:
+    """Stream the text of a file, or of standard input for '-'"""
+    if path == "-":
+        return iter_text(sys.stdin.buffer, encoding=encoding)
+    return iter_file_text(path, encoding=encoding)
+
+
+def percentile(sorted_values: array, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize_plan(schedules: Iterable[KeystrokeSchedule]) -> List[str]:
+    """Describe a timing plan: sizes, duration and inter-event gap statistics"""
+    chars = events = keys = pastes = keystrokes = typos = 0
+    duration = 0.0
+    wpm = 0.0
+    gaps = array("d")
+    for schedule in schedules:
+        deadlines = schedule.deadlines
+        for idx in range(1, len(deadlines)):
+            gaps.append(deadlines[idx] - deadlines[idx - 1])
+        if len(deadlines):
+            gaps.append(schedule.duration - deadlines[-1])
+        chars += schedule.char_count
+        events += len(schedule)
+        keys += schedule.kinds.count(EVENT_KEY)
+        pastes += schedule.kinds.count(EVENT_PASTE)
+        keystrokes += schedule.keystroke_count
+        typos += schedule.typos
+        duration += schedule.duration
+        wpm = schedule.wpm
+
+    gaps = array("d", sorted(gaps))
+    ms = 1000.0
+    return [
+        f"Characters:      {chars:,}",
+        f"Events:          {events:,} ({keys:,} key presses, {pastes:,} pastes, "
+        f"{events - keys - pastes:,} text chunks)",
+        f"Keystrokes:      {keystrokes:,} ({typos:,} typos corrected)",
+        f"Requested speed: {wpm:.0f} WPM",
+        f"Planned speed:   {calculate_wpm(chars, duration):.1f} WPM",
+        f"Planned time:    {format_duration(duration)} ({duration:.2f}s)",
+        "Event gaps (ms): "
+        f"min {percentile(gaps, 0.0) * ms:.1f}, p50 {percentile(gaps, 0.5) * ms:.1f}, "
+        f"p95 {percentile(gaps, 0.95) * ms:.1f}, max {percentile(gaps, 1.0) * ms:.1f}",
+    ]
+
+
+def click_position(position: Tuple[int, int]) -> None:
+    """Click the target position so keystrokes go to the right place"""
+    import pyautogui
+    pyautogui.FAILSAFE = False
+    pyautogui.click(*position)
+
+
+def prepare_target(args: argparse.Namespace, stop_event: StopEvent, log) -> Optional[int]:
+    """Focus the --window and click the --position; returns the target window, if known"""
+    hwnd = None
+    if args.window:
+        target = WindowTarget(title=args.window)
+        if not target.focus():
+            raise RuntimeError(f"cannot focus a window titled '{args.window}'")
+        hwnd = target.hwnd
+    if args.position:
+        click_position(args.position)
+        hwnd = hwnd or root_window(window_from_point(*args.position))
+        if hwnd:
+            # Start as soon as the click took effect instead of after a fixed pause
+            waits = ReadinessWaits(stop_event)
+            waits.wait("foreground", lambda: foreground_window() == hwnd, READY_TIMEOUT)
+            waits.wait("caret", lambda: has_input_focus(hwnd), READY_TIMEOUT)
+            log(f"Target ready: {waits.describe()}")
+    return hwnd
+
+
+def run(args: argparse.Namespace) -> int:
+    config = TypingConfig(
+        wpm=args.wpm,
+        humanize=not args.no_humanize,
+        timing=args.timing,
+        typo_rate=args.typo_rate,
+        paste_mode=args.paste,
+        auto_indent=args.auto_indent,
+        seed=args.seed,
+        batch_size=args.batch_size,
+        backpressure=not args.no_backpressure,
+        countdown_sec=5 if args.countdown is None else args.countdown,
+        backend=args.backend,
+    )
+    log = (lambda message: None) if args.quiet else (
+        lambda message: print(message, file=sys.stderr))
+
+    # Standard input cannot be read twice, so only files get checkpoints
+    store = text_hash = None
+    start = 0
+    # Checkpoints go by the requested settings, which a target may override
+    config_hash = hash_config(config)
+    if args.file != "-":
+        store = CheckpointStore()
+        text_hash = hash_file(args.file)
+        checkpoint = store.load(text_hash, config_hash) if args.resume else None
+        if checkpoint is not None:
+            start = checkpoint.offset
+            log(f"Resuming after {checkpoint.describe()}")
+        elif args.resume:
+            log("No checkpoint for this file and settings, starting from the beginning")
+    source = open_source(args.file, args.encoding)
+
+    if args.dry_run:
+        for line in summarize_plan(iter_schedules(source, config, start=start)):
+            print(line)
+        return 0
+
+    stop_event = StopEvent()
+    backend = create_backend(config.backend, stop_event)
+
+    hotkey = GlobalStopHotkey(stop_event)
+    monitor = writer = result = None
+    if hotkey.start():
+        log(f"Press {hotkey.label} to stop typing.")
+    try:
+        with span("countdown", config.countdown_sec):
+            for remaining in range(config.countdown_sec, 0, -1):
+                log(f"Starting in {remaining} seconds...")
+                if stop_event.wait(1.0):
+                    log("Stopped before typing")
+                    return 1
+        with span("positioning"):
+            hwnd = prepare_target(args, stop_event, log)
+        # Targets that cannot take pastes (see paste_plan) are typed
+        config = dataclasses.replace(config, paste_mode=choose_paste_mode(
+            config.paste_mode, window_class(hwnd or foreground_window())))
+        schedules = iter_schedules(source, config, start=start)
+        if config.backpressure:
+            # Watch the window that receives the keys, to slow down if it falls behind
+            monitor = monitor_window(hwnd or foreground_window())
+
+        progress = ProgressChannel()
+        if store is not None:
+            writer = CheckpointWriter(store, text_hash, config_hash, progress,
+                                      start=start, source=args.file)
+        result = execute_schedule(schedules, backend, stop_event=stop_event, progress=progress,
+                                  batching=create_batching(config, monitor))
+    except KeyboardInterrupt:
+        stop_event.set()
+        log("Typing stopped")
+        return 130
+    finally:
+        hotkey.stop()
+        backend.close()
+        if monitor is not None:
+            monitor.stop()
+        if writer is not None:
+            # Without a result (error, Ctrl+C) the last sampled offset is kept
+            writer.close(result.chars_typed if result else None,
+                         completed=bool(result and result.completed))
+
+    print(f"Typed {result.chars_typed:,} characters in {format_duration(result.elapsed)}: "
+          f"{result.summary()}, max lateness {result.max_lateness * 1000:.1f} ms")
+    if result.cancel_latency is not None:
+        print(f"Stopped early; stop request handled in {result.cancel_latency * 1000:.2f} ms")
+    if writer is not None and not result.completed:
+        print(f"Stopped at character {start + result.chars_typed:,}; "
+              "run again with --resume to continue")
+    if result.batch is not None and not args.quiet:
+        print(f"Batching: {result.batch.describe()}, "
+              f"{result.batch.injection_ms:.2f} ms per keystroke call")
+    return 0 if result.completed else 1
+
+
+def enqueue(args: argparse.Namespace) -> int:
+    from job_queue import JobQueue, TypingJob  # Only the queue commands need it
+    if args.file == "-":
+        print("error: standard input cannot be queued", file=sys.stderr)
+        return 2
+    job = JobQueue().add(TypingJob(
+        source_path=os.path.abspath(args.file),
+        position=args.position,
+        window=args.window,
+        wpm=args.wpm,
+        countdown_sec=args.countdown or 0,
+        humanize=not args.no_humanize,
+    ))
+    print(f"Queued job {job.job_id}: {job.name}")
+    return 0
+
+
+def show_queue() -> int:
+    from job_queue import JobQueue
+    jobs = JobQueue().jobs
+    if not jobs:
+        print("The job queue is empty")
+    for job in jobs:
+        line = f"{job.job_id}  {job.status:<8} {job.wpm:>5.0f} WPM  {job.name}"
+        if job.stats is not None:
+            line += f"  - {job.stats.describe()}"
+        if job.error:
+            line += f"  - {job.error}"
+        print(line)
+    return 0
+
+
+def run_queue(args: argparse.Namespace) -> int:
+    """Type all runnable jobs; the speed and countdown come from each job"""
+    from job_queue import JobQueue, JobScheduler
+    config = TypingConfig(
+        timing=args.timing,
+        typo_rate=args.typo_rate,
+        paste_mode=args.paste,
+        auto_indent=args.auto_indent,
+        seed=args.seed,
+        batch_size=args.batch_size,
+        backpressure=not args.no_backpressure,
+        backend=args.backend,
+    )
+    queue = JobQueue()
+    stop_event = StopEvent()
+    log = (lambda message: None) if args.quiet else (
+        lambda message: print(message, file=sys.stderr))
+    hotkey = GlobalStopHotkey(stop_event)
+    if hotkey.start():
+        log(f"Press {hotkey.label} to stop typing.")
+    scheduler = JobScheduler(queue, config, stop_event=stop_event, callback=log)
+    began = time.perf_counter()
+    try:
+        completed = scheduler.run()
+    except KeyboardInterrupt:
+        stop_event.set()
+        log("Typing stopped")
+        return 130
+    finally:
+        hotkey.stop()
+
+    elapsed = time.perf_counter() - began
+    chars = scheduler.chars_typed
+    print(f"Completed {completed} jobs, {chars:,} characters in {format_duration(elapsed)} "
+          f"({calculate_wpm(chars, elapsed):.1f} WPM overall); {queue.pending_count()} left")
+    return 0 if queue.pending_count() == 0 else 1
+
+
+def write_trace(path: str, quiet: bool) -> None:
+    """Stop tracing and export what was recorded"""
+    tracer = stop_tracing()
+    try:
+        tracer.export(path)
+    except OSError as e:
+        print(f"error: cannot write trace: {e}", file=sys.stderr)
+        return
+    if not quiet:
+        print(f"Trace written to {path} ({tracer.recorded:,} records, "
+              f"{tracer.dropped:,} overwritten)", file=sys.stderr)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.show_queue:
+        return show_queue()
+    if args.file is None and not args.run_queue:
+        print("error: a file is required (or --run-queue / --show-queue)", file=sys.stderr)
+        return 2
+    if args.wpm <= 0:
+        print("error: --wpm must be positive", file=sys.stderr)
+        return 2
+    if args.batch_size is not None and args.batch_size <= 0:
+        print("error: --batch-size must be positive", file=sys.stderr)
+        return 2
+    if args.trace:
+        start_tracing()
+    try:
+        if args.enqueue:
+            return enqueue(args)
+        if args.run_queue:
+            return run_queue(args)
+        return run(args)
+    except (OSError, RuntimeError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if args.trace:
+            write_trace(args.trace, args.quiet)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+"""
+Auto Type - Backpressure
+Detects when the target application falls behind the keystrokes it is sent
+(Electron editors, remote desktop sessions) so typing can slow down before
+characters are dropped or reordered.
+
+A probe measures how long the target takes to respond; a monitor polls it
+on a background thread; a throttle turns the readings into a pace factor
+for the executor. The throttle is plain logic and SimulatedTarget stands in
+for a slow application, so the control loop can be exercised anywhere.
+"""
+import ctypes
+import platform
+import threading
+import time
+from typing import Optional
+
+# How often the monitor asks the target for a response
+PROBE_INTERVAL = 0.05
+
+# Longest wait for a response; a target that takes longer counts as this late
+PROBE_TIMEOUT = 0.25
+
+# Response times above HIGH slow typing down, below LOW let it recover
+HIGH_LATENCY = 0.05
+LOW_LATENCY = 0.015
+
+# Pace change per throttle decision while slowing down / recovering
+SLOW_STEP = 1.25
+RECOVER_STEP = 1.05
+
+# Backing off never slows typing below 1/MAX_PACE of the requested rate
+MAX_PACE = 4.0
+
+WM_NULL = 0x0000
+SMTO_ABORTIFHUNG = 0x0002
+
+
+class WindowResponsivenessProbe:
+    """
+    Round trip of a no-op message (WM_NULL) to the target window.
+
+    SendMessageTimeout only returns once the window's thread pumps messages
+    again, so while the application is still busy with earlier keystrokes
+    the round trip grows. (GetQueueStatus only reports the calling thread's
+    own queue, so it cannot see the target's backlog.)
+    """
+
+    def __init__(self, hwnd: int, timeout: float = PROBE_TIMEOUT):
+        self.hwnd = hwnd
+        self.timeout = timeout
+        user32 = ctypes.WinDLL("user32")
+        self._send = user32.SendMessageTimeoutW
+        self._send.argtypes = [
+            ctypes.c_void_p, ctypes.c_uint, ctypes.c_size_t, ctypes.c_ssize_t,
+            ctypes.c_uint, ctypes.c_uint, ctypes.POINTER(ctypes.c_size_t),
+        ]
+        self._send.restype = ctypes.c_ssize_t
+        self._is_window = user32.IsWindow
+        self._is_window.argtypes = [ctypes.c_void_p]
+
+    @staticmethod
+    def is_available() -> bool:
+        return platform.system() == "Windows"
+
+    def measure(self) -> Optional[float]:
+        """Seconds the target took to respond, or None if the window is gone"""
+        result = ctypes.c_size_t()
+        started = time.perf_counter()
+        ok = self._send(self.hwnd, WM_NULL, 0, 0, SMTO_ABORTIFHUNG,
+                        int(self.timeout * 1000), ctypes.byref(result))
+        elapsed = time.perf_counter() - started
+        if ok:
+            return elapsed
+        if not self._is_window(self.hwnd):
+            return None
+        return max(elapsed, self.timeout)  # Timed out or hung
+
+
+class BackpressureMonitor:
+    """
+    Polls a probe on a daemon thread.
+
+    Probing can block for up to the probe's timeout, so it never runs on the
+    typing thread; the latest reading is published by a single reference
+    assignment and can be read from any thread.
+    """
+
+    def __init__(self, probe, interval: float = PROBE_INTERVAL):
+        self.probe = probe
+        self.interval = interval
+        self.latency: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="backpressure", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.latency = self.probe.measure()
+            except Exception as e:
+                print(f"Warning: Backpressure probe failed: {e}")
+                self.latency = None
+                return
+            self._stop.wait(self.interval)
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(1.0)
+        self._thread = None
+
+
+def monitor_window(hwnd: Optional[int]) -> Optional[BackpressureMonitor]:
+    """Start monitoring a target window; None if there is none or not on Windows"""
+    if not hwnd or not WindowResponsivenessProbe.is_available():
+        return None
+    monitor = BackpressureMonitor(WindowResponsivenessProbe(hwnd))
+    monitor.start()
+    return monitor
+
+
+class BackpressureThrottle:
+    """Turns target response times into a pace factor (1.0 = requested speed)"""
+
+    def __init__(self, high: float = HIGH_LATENCY, low: float = LOW_LATENCY,
+                 max_pace: float = MAX_PACE):
+        self.high = high
+        self.low = low
+        self.max_pace = max_pace
+        self.pace = 1.0
+
+    def update(self, latency: Optional[float]) -> float:
+        """Adjust to the latest reading (None: unknown, keep the pace)"""
+        if latency is None:
+            return self.pace
+        if latency >= self.high:
+            self.pace = min(self.max_pace, self.pace * SLOW_STEP)
+        elif latency <= self.low:
+            self.pace = max(1.0, self.pace / RECOVER_STEP)
+        return self.pace
+
+
+class SimulatedTarget:
+    """
+    A slow application for exercising backpressure without Windows.
+
+    Characters are processed at a fixed rate; anything that would wait in
+    the backlog longer than drop_after seconds is dropped, like an
+    overrun input queue. Also works as the probe: measure() reports how
+    long a message would wait behind the backlog.
+
+    It has the methods of a keystroke_backends.KeystrokeBackend, so the
+    executor can type into it; keystroke_backends is only imported when a
+    simulator is made, to keep it out of the startup of the typing engine.
+    """
+
+    name = "simulated"
+
+    def __init__(self, chars_per_second: float, drop_after: float = 1.0,
+                 stop_event: threading.Event = None):
+        from keystroke_backends import KEY_TEXT
+        self._key_text = KEY_TEXT
+        self.stop_event = stop_event
+        self.chars_per_second = chars_per_second
+        self.drop_after = drop_after
+        self.received = []
+        self.dropped = 0
+        self._busy_until = 0.0
+        self._lock = threading.Lock()
+
+    def _deliver(self, text: str) -> None:
+        with self._lock:
+            now = time.perf_counter()
+            busy_until = max(now, self._busy_until)
+            if busy_until - now > self.drop_after:
+                self.dropped += len(text)
+                return
+            self._busy_until = busy_until + len(text) / self.chars_per_second
+            self.received.append(text)
+
+    def write(self, text: str) -> None:
+        self._deliver(text)
+
+    def press(self, key: str) -> None:
+        self._deliver(self._key_text.get(key, ""))
+
+    def paste(self, text: str) -> None:
+        self._deliver(text)
+
+    def close(self) -> None:
+        pass
+
+    def measure(self) -> Optional[float]:
+        with self._lock:
+            return max(0.0, self._busy_until - time.perf_counter())
+
+    def typed_text(self) -> str:
+        from keystroke_backends import shown_text
+        return shown_text("".join(self.received))
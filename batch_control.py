@@ -0,0 +1,191 @@
+"""
+Auto Type - Adaptive Batching
+Decides at runtime how many characters go into each injection call. The
+executor reports how long every call really took: while the target keeps
+up, characters are sent one per call (the most natural rhythm); when the
+per-call overhead threatens the requested rate they are grouped; and when
+even the largest groups cannot keep up, the pace is slowed down instead of
+flooding the target application. With a backpressure monitor, the pace
+also slows down while the target reports that it is falling behind.
+"""
+from dataclasses import dataclass
+from operator import mul
+from typing import Optional
+
+from backpressure import MAX_PACE, BackpressureMonitor, BackpressureThrottle
+
+# Largest number of characters sent in one injection call
+MAX_BATCH = 16
+
+# Share of each character's time slot that injection should take; the rest
+# is left for the target application and timing jitter
+TARGET_LOAD = 0.5
+
+# Share above which the target counts as saturated and the pace slows down
+MAX_LOAD = 0.8
+
+# Observations between two decisions, so the averages can settle (and the
+# per-call cost of the controller stays small)
+SETTLE_EVENTS = 16
+
+# Decisions in a row that must agree before a batch shrinks or the pace
+# recovers (growing and backing off happen at once)
+RECOVER_DECISIONS = 4
+
+# Weight of the newest observation in the moving averages
+SMOOTHING = 0.1
+
+
+@dataclass(frozen=True)
+class BatchTelemetry:
+    """Snapshot of an AdaptiveBatchController"""
+    batch_size: int      # Characters per injection call
+    pace: float          # Plan stretch factor, 1.0 = requested rate
+    target_wpm: float    # Rate typing currently aims for (requested / pace)
+    injection_ms: float  # Average duration of one injection call
+    lateness_ms: float   # Average delay of calls behind their deadlines
+    load: float          # Estimated share of each time slot spent injecting
+    backoffs: int        # Times the pace was slowed down
+    target_latency_ms: Optional[float] = None  # Target response time, if probed
+
+    def describe(self) -> str:
+        """Short status text, e.g. "batch 3" or "batch 16, slowed to 412 WPM" """
+        text = f"batch {self.batch_size}"
+        if self.pace > 1.0:
+            text += f", slowed to {self.target_wpm:.0f} WPM"
+            if self.target_latency_ms is not None:
+                text += f", target lagging {self.target_latency_ms:.0f} ms"
+        return text
+
+
+class AdaptiveBatchController:
+    """
+    Sizes text batches from measured injection latency.
+
+    The executor calls begin() with the requested speed, reads batch_size
+    and pace before each event, and reports every injection to observe().
+    Only the executor thread may call begin() and observe(); telemetry()
+    can be read from any thread.
+    """
+
+    def __init__(self, min_batch: int = 1, max_batch: int = MAX_BATCH,
+                 backpressure: BackpressureMonitor = None):
+        self.min_batch = min_batch
+        self.max_batch = max_batch
+        self.batch_size = min_batch
+        self.pace = 1.0
+        self.backoffs = 0
+        self._wpm = 0.0
+        self._char_seconds = 0.0
+        # Moving averages of characters per call (x), seconds per call (y),
+        # x*x and x*y, for a least squares fit of seconds = call + char * x
+        self._x = self._y = self._xx = self._xy = 0.0
+        self._observed = 0
+        self._pending = []
+        self._lateness = 0.0
+        self._load = 0.0
+        self._relax = 0
+        self.backpressure = backpressure
+        self._throttle = BackpressureThrottle() if backpressure is not None else None
+
+    def begin(self, wpm: float, char_seconds: float) -> None:
+        """Set the requested speed and the time one character may take"""
+        self._wpm = wpm
+        self._char_seconds = char_seconds
+
+    def observe(self, chars: int, seconds: float, lateness: float) -> None:
+        """
+        Record one injection; every SETTLE_EVENTS calls the controller adapts.
+
+        Args:
+            chars: Source characters the call covered
+            seconds: How long the call took
+            lateness: How late the call started relative to its deadline
+        """
+        pending = self._pending
+        pending.append((chars, seconds, lateness))
+        if len(pending) >= SETTLE_EVENTS:
+            self._fold(pending)
+            pending.clear()
+            self._decide()
+
+    def _fold(self, observations) -> None:
+        """Add a window of observations to the moving averages"""
+        count = len(observations)
+        xs, ys, lateness = zip(*observations)
+        # The window counts as `count` observations of its mean
+        weight = 1.0 - (1.0 - SMOOTHING) ** count if self._observed else 1.0
+        self._observed += count
+        self._x += weight * (sum(xs) / count - self._x)
+        self._y += weight * (sum(ys) / count - self._y)
+        self._xx += weight * (sum(map(mul, xs, xs)) / count - self._xx)
+        self._xy += weight * (sum(map(mul, xs, ys)) / count - self._xy)
+        self._lateness += weight * (sum(lateness) / count - self._lateness)
+
+    def _decide(self) -> None:
+        """Grow or back off at once; shrink or speed up only when it lasts"""
+        batch_size, pace = self._plan()
+        if self._throttle is not None:
+            # The target itself reports falling behind
+            pace = max(pace, self._throttle.update(self.backpressure.latency))
+        if batch_size > self.batch_size or pace > self.pace:
+            self._relax = 0
+        elif batch_size < self.batch_size or pace < self.pace:
+            self._relax += 1
+            if self._relax < RECOVER_DECISIONS:
+                return
+            self._relax = 0
+        else:
+            self._relax = 0
+            return
+        if pace > self.pace:
+            self.backoffs += 1
+        self.batch_size = batch_size
+        self.pace = pace
+
+    def _costs(self):
+        """Estimated (seconds per call, seconds per character) of injection"""
+        variance = self._xx - self._x * self._x
+        if variance > 1e-6:
+            per_char = max(0.0, (self._xy - self._x * self._y) / variance)
+            per_call = max(0.0, self._y - per_char * self._x)
+        else:
+            # Every call had the same size: assume it is all per-call
+            # overhead until larger calls show otherwise
+            per_char = 0.0
+            per_call = self._y
+        return per_call, per_char
+
+    def _plan(self):
+        """Smallest batch (then slowest pace needed) that keeps load on target"""
+        per_call, per_char = self._costs()
+        budget = TARGET_LOAD * self._char_seconds
+        if budget <= 0:
+            return self.batch_size, self.pace
+        if per_char < budget:
+            # Fewer, larger calls amortize the per-call overhead
+            needed = per_call / (budget - per_char)
+        else:
+            # Each character alone is too slow; batch only until the per-call
+            # share is small, larger batches would not help
+            needed = 4.0 * per_call / per_char
+        batch_size = min(self.max_batch, max(self.min_batch, int(needed) + 1))
+        # If even that batch is too slow, the target is saturated: slow down
+        cost = per_call / batch_size + per_char
+        pace = min(MAX_PACE, max(1.0, cost / (MAX_LOAD * self._char_seconds)))
+        self._load = cost / (self._char_seconds * pace)
+        return batch_size, pace
+
+    def telemetry(self) -> BatchTelemetry:
+        """Current batch size, rate and measured injection cost"""
+        latency = self.backpressure.latency if self.backpressure is not None else None
+        return BatchTelemetry(
+            batch_size=self.batch_size,
+            pace=self.pace,
+            target_wpm=self._wpm / self.pace,
+            injection_ms=self._y * 1000.0,
+            lateness_ms=self._lateness * 1000.0,
+            load=self._load,
+            backoffs=self.backoffs,
+            target_latency_ms=latency * 1000.0 if latency is not None else None,
+        )
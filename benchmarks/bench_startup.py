@@ -0,0 +1,127 @@
+"""
+Auto Type - Startup Benchmark
+Measures how long each module takes to import using ``python -X importtime``
+and fails when a module gets slower than its recorded baseline, or starts
+eagerly importing a dependency that must only be loaded on first use.
+
+    python benchmarks/bench_startup.py            # check against baselines
+    python benchmarks/bench_startup.py --update   # record new baselines
+
+Modules whose dependencies are not installed (e.g. the UI on a build
+server without customtkinter) are reported as skipped.
+"""
+import argparse
+import compileall
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, Optional, Set, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "startup_baseline.json")
+
+
+def measure_import(module: str) -> Tuple[Optional[float], Set[str], str]:
+    """
+    Import a module in a fresh interpreter.
+
+    Returns the cumulative import time in milliseconds (None if the import
+    failed), the top-level names of every module it imported, and the
+    error output of a failed import.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    )
+    imported = set()
+    cumulative_us = None
+    errors = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            errors.append(line)
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue  # Header line
+        name = parts[2].strip()
+        imported.add(name.split(".")[0])
+        if name == module:
+            cumulative_us = int(parts[1])
+    if proc.returncode != 0 or cumulative_us is None:
+        return None, imported, "\n".join(errors)
+    return cumulative_us / 1000.0, imported, ""
+
+
+def best_of(module: str, runs: int) -> Tuple[Optional[float], Set[str], str]:
+    """Fastest of several imports, to keep OS noise out of the comparison"""
+    best = None
+    imported = set()
+    for _ in range(runs):
+        elapsed, imported, error = measure_import(module)
+        if elapsed is None:
+            return None, imported, error
+        best = elapsed if best is None else min(best, elapsed)
+    return best, imported, ""
+
+
+def load_baseline() -> Dict:
+    with open(BASELINE_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check module import times against baselines.")
+    parser.add_argument("--runs", type=int, default=5, help="Imports per module (best is kept)")
+    parser.add_argument("--update", action="store_true", help="Store the measured times as the new baselines")
+    args = parser.parse_args()
+
+    baseline = load_baseline()
+    # Measure imports, not compiling: after an edit the bytecode is stale, and
+    # with PYTHONDONTWRITEBYTECODE set every import would compile it again
+    compileall.compile_dir(ROOT, maxlevels=0, quiet=1)
+    tolerance = baseline.get("tolerance", 1.5)
+    failures = 0
+
+    for module, spec in baseline["modules"].items():
+        elapsed, imported, error = best_of(module, args.runs)
+        if elapsed is None:
+            last_line = error.strip().splitlines()[-1] if error.strip() else "import failed"
+            missing = ("ModuleNotFoundError" in last_line and f"'{module}'" not in last_line
+                       or "Missing dependency" in last_line)
+            if missing:
+                print(f"{module:20s} skipped ({last_line})")
+                continue
+            print(f"{module:20s} FAILED to import: {last_line}")
+            failures += 1
+            continue
+
+        eager = sorted(set(spec.get("forbidden", [])) & imported)
+        budget = spec.get("import_ms")
+        status = "ok"
+        if eager:
+            status = f"FAIL: imports {', '.join(eager)} at startup"
+            failures += 1
+        elif budget is not None and not args.update and elapsed > budget * tolerance:
+            status = f"FAIL: slower than {budget * tolerance:.1f} ms budget"
+            failures += 1
+        budget_text = f"{budget:.1f} ms" if budget is not None else "none"
+        print(f"{module:20s} {elapsed:8.1f} ms  (baseline {budget_text})  {status}")
+
+        if args.update:
+            spec["import_ms"] = round(elapsed, 1)
+
+    if args.update:
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2)
+            f.write("\n")
+        print(f"Baselines written to {BASELINE_PATH}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
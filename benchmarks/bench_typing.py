@@ -0,0 +1,407 @@
+"""
+Auto Type - Typing Engine Benchmark
+Measures the planner and the executor against a fake keystroke sink, so it
+runs anywhere (no display, no Windows) and fails when a change makes typing
+slower, less accurate or more memory hungry than the recorded baselines.
+
+    python benchmarks/bench_typing.py             # check against baselines
+    python benchmarks/bench_typing.py --update    # record new baselines
+    python benchmarks/bench_typing.py --wpm 80 1000 --seconds 0.5
+
+Two kinds of runs are made over synthetic corpora (prose, indented source
+code, Unicode, and a 1 MB mix):
+
+* Throughput: the whole corpus is streamed through iter_schedules and then
+  replayed with every deadline set to zero. Reports planning and executor
+  overhead per character, peak traced memory, and the shape of the plan
+  (events per character, spread of the gaps) so changes to the delay
+  models or the batching are noticed.
+* Real time: a sample of each corpus is typed at every WPM in the sweep.
+  Reports the achieved speed and how late keys were delivered relative to
+  their planned deadlines (jitter percentiles).
+
+Times depend on the machine, so record baselines on the machine that runs
+the check. Random delays are seeded, so plans are reproducible on one
+installation; whether NumPy is used is printed, as it changes planning speed.
+"""
+import argparse
+import dataclasses
+import gc
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from array import array
+from typing import Dict, Iterable, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "typing_baseline.json")
+sys.path.insert(0, ROOT)
+
+from autotype_cli import percentile  # noqa: E402
+from delay_model import get_numpy  # noqa: E402
+from keystroke_backends import KeystrokeBackend  # noqa: E402
+from typing_engine import (  # noqa: E402
+    KeystrokeSchedule,
+    TypingConfig,
+    compile_schedule,
+    create_batching,
+    execute_schedule,
+    iter_schedules,
+)
+
+SEED = 1234
+DEFAULT_WPMS = [20, 60, 120, 300, 1000, 2500]
+
+# Real-time samples are at least this long, so slow speeds still have a rhythm
+MIN_SAMPLE_CHARS = 10
+
+# Corpora typed in real time (the 1 MB corpus is only used for throughput)
+REALTIME_CORPORA = ["prose", "code", "unicode"]
+
+WORDS = (
+    "the quick brown fox jumps over a lazy dog while typing notes about "
+    "performance latency schedule keyboard window focus engine measure "
+    "every character with care and report results"
+).split()
+
+
+# ---------------------------------------------------------------------------
+# Synthetic corpora
+# ---------------------------------------------------------------------------
+
+def make_prose(chars: int, rng: random.Random) -> str:
+    """Sentences and paragraphs with regular punctuation"""
+    parts = []
+    size = 0
+    while size < chars:
+        sentence = " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 16)))
+        if rng.random() < 0.3:
+            cut = sentence.find(" ", len(sentence) // 2)
+            if cut > 0:
+                sentence = sentence[:cut] + "," + sentence[cut:]
+        sentence = sentence[0].upper() + sentence[1:] + rng.choice(".....?!")
+        sentence += "\n\n" if rng.random() < 0.15 else " "
+        parts.append(sentence)
+        size += len(sentence)
+    return "".join(parts)[:chars]
+
+
+def make_code(chars: int, rng: random.Random) -> str:
+    """Deeply indented source code: many newlines, tabs and leading spaces"""
+    lines = []
+    size = 0
+    depth = 0
+    while size < chars:
+        indent = "    " * depth if rng.random() < 0.8 else "\t" * depth
+        name = rng.choice(WORDS)
+        if depth < 6 and rng.random() < 0.3:
+            line = f"{indent}if {name}_{rng.randint(0, 99)} in ({rng.randint(0, 9)}, {name!r}):"
+            depth += 1
+        elif rng.random() < 0.2:
+            line = ""
+        else:
+            line = f"{indent}{name} = compute({name}, {rng.random():.3f})  # {rng.choice(WORDS)}"
+            if depth and rng.random() < 0.3:
+                depth -= rng.randint(1, depth)
+        lines.append(line)
+        size += len(line) + 1
+    return "\n".join(lines)[:chars]
+
+
+def make_unicode(chars: int, rng: random.Random) -> str:
+    """Accented Latin, Cyrillic, Greek, CJK and emoji (surrogate pairs on Windows)"""
+    words = [
+        "café", "naïve", "façade", "Straße", "jalapeño", "привет", "мир",
+        "αβγ", "λόγος", "日本語", "中文", "한국어", "😀", "🚀", "👍🏽", "→", "€5",
+    ]
+    parts = []
+    size = 0
+    while size < chars:
+        word = rng.choice(words)
+        sep = "\n" if rng.random() < 0.08 else " "
+        parts.append(word + sep)
+        size += len(word) + 1
+    return "".join(parts)[:chars]
+
+
+def make_mixed(chars: int, rng: random.Random) -> str:
+    """Large input mixing all of the above in 16 KB blocks"""
+    makers = [make_prose, make_code, make_unicode]
+    parts = []
+    size = 0
+    while size < chars:
+        block = rng.choice(makers)(16 * 1024, rng)
+        parts.append(block)
+        size += len(block)
+    return "".join(parts)[:chars]
+
+
+CORPORA = {
+    "prose": (make_prose, 64 * 1024),
+    "code": (make_code, 64 * 1024),
+    "unicode": (make_unicode, 64 * 1024),
+    "1mb": (make_mixed, 1024 * 1024),
+}
+
+
+def build_corpus(name: str) -> str:
+    maker, chars = CORPORA[name]
+    return maker(chars, random.Random(f"{SEED}-{name}"))
+
+
+# ---------------------------------------------------------------------------
+# Fake keystroke sink
+# ---------------------------------------------------------------------------
+
+class SinkBackend(KeystrokeBackend):
+    """Counts injection calls and, optionally, when they were made and their size"""
+
+    name = "sink"
+
+    def __init__(self, record_times: bool = False):
+        super().__init__()
+        self.count = 0
+        self.times = array("d") if record_times else None
+        self.sizes = array("q") if record_times else None  # Characters, 0 for a key
+        self._clock = time.perf_counter
+
+    def write(self, text: str) -> None:
+        self.count += 1
+        if self.times is not None:
+            self.times.append(self._clock())
+            self.sizes.append(len(text))
+
+    def press(self, key: str) -> None:
+        self.count += 1
+        if self.times is not None:
+            self.times.append(self._clock())
+            self.sizes.append(0)
+
+
+def call_deadlines(schedule: KeystrokeSchedule, sizes: Iterable[int]) -> array:
+    """Planned time of each recorded call; a batched call is due with its first event"""
+    deadlines = array("d")
+    idx = 0
+    for size in sizes:
+        deadlines.append(schedule.deadlines[idx])
+        if size == 0:
+            idx += 1
+            continue
+        while size > 0:
+            size -= len(schedule.events[idx])
+            idx += 1
+    return deadlines
+
+
+def zero_deadlines(schedule: KeystrokeSchedule) -> KeystrokeSchedule:
+    """The same events with no waiting, to time the executor on its own"""
+    return dataclasses.replace(
+        schedule, deadlines=array("d", bytes(8 * len(schedule))), duration=0.0
+    )
+
+
+# ---------------------------------------------------------------------------
+# Measurements
+# ---------------------------------------------------------------------------
+
+def plan_shape(text: str, config: TypingConfig) -> Dict[str, float]:
+    """Events per character and relative spread of the planned gaps"""
+    events = 0
+    gaps = array("d")
+    for schedule in iter_schedules(text, config):
+        events += len(schedule)
+        deadlines = schedule.deadlines
+        for idx in range(1, len(deadlines)):
+            gaps.append(deadlines[idx] - deadlines[idx - 1])
+    mean = statistics.mean(gaps) if gaps else 0.0
+    spread = statistics.pstdev(gaps) / mean if mean else 0.0
+    return {"events_per_char": events / len(text), "gap_cv": spread}
+
+
+def measure_throughput(text: str, runs: int) -> Dict[str, float]:
+    """Planning and executor overhead per character, plus peak memory"""
+    config = TypingConfig(wpm=1000.0, seed=SEED)
+    plan_best = exec_best = None
+    for _ in range(runs):
+        gc.collect()
+        started = time.perf_counter()
+        schedules = list(iter_schedules(text, config))
+        plan = time.perf_counter() - started
+
+        flat = [zero_deadlines(schedule) for schedule in schedules]
+        sink = SinkBackend()
+        started = time.perf_counter()
+        execute_schedule(flat, sink, batching=create_batching(config))
+        run = time.perf_counter() - started
+        del schedules, flat
+
+        plan_best = plan if plan_best is None else min(plan_best, plan)
+        exec_best = run if exec_best is None else min(exec_best, run)
+
+    # Memory of streaming the text: plan one segment at a time and replay it
+    gc.collect()
+    tracemalloc.start()
+    execute_schedule((zero_deadlines(s) for s in iter_schedules(text, config)), SinkBackend(),
+                     batching=create_batching(config))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    metrics = {
+        "plan_us_per_char": plan_best / len(text) * 1e6,
+        "exec_us_per_char": exec_best / len(text) * 1e6,
+        "peak_kb": peak / 1024.0,
+    }
+    metrics.update(plan_shape(text, config))
+    return metrics
+
+
+def measure_realtime(text: str, wpm: float, seconds: float) -> Dict[str, float]:
+    """Type a sample in real time; achieved speed and deadline jitter"""
+    chars = max(MIN_SAMPLE_CHARS, int(wpm * 5.0 / 60.0 * seconds))
+    config = TypingConfig(wpm=wpm, seed=SEED)
+    schedule = compile_schedule(text[:chars], config)
+    sink = SinkBackend(record_times=True)
+
+    gc.collect()
+    started = time.perf_counter()
+    result = execute_schedule(schedule, sink, batching=create_batching(config))
+    deadlines = call_deadlines(schedule, sink.sizes)
+    lateness = array("d", sorted(
+        (sink.times[idx] - started - deadlines[idx]) * 1000.0
+        for idx in range(len(sink.times))
+    ))
+    return {
+        "chars": float(result.chars_typed),
+        "achieved_wpm": result.achieved_wpm,
+        "wpm_error": abs(result.achieved_wpm / wpm - 1.0),
+        "jitter_p50_ms": percentile(lateness, 0.5),
+        "jitter_p95_ms": percentile(lateness, 0.95),
+        "jitter_p99_ms": percentile(lateness, 0.99),
+        "jitter_max_ms": percentile(lateness, 1.0),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Baseline comparison
+# ---------------------------------------------------------------------------
+
+# Metrics that may only grow by the timing tolerance, plus an absolute slack.
+# Real-time samples are short and OS scheduling noise dominates their tails,
+# so only the median and p95 jitter are checked; the p95 slack of one Windows
+# timer tick catches waits that systematically overshoot, not single
+# preempted keys.
+COST_METRICS = {
+    "plan_us_per_char": 0.0,
+    "exec_us_per_char": 0.0,
+    "peak_kb": 16.0,
+    "jitter_p50_ms": 1.0,
+    "jitter_p95_ms": 16.0,
+}
+
+# Metrics describing the shape of the plan; they must stay close to the baseline
+SHAPE_METRICS = ["events_per_char", "gap_cv"]
+
+
+def check_metrics(measured: Dict[str, float], baseline: Optional[Dict[str, float]],
+                  settings: Dict) -> List[str]:
+    """Describe every way the measured values regress from the baseline"""
+    problems = []
+    max_error = settings.get("max_wpm_error", 0.02)
+    if measured.get("wpm_error", 0.0) > max_error:
+        problems.append(f"speed off by {measured['wpm_error'] * 100:.1f}% "
+                        f"(limit {max_error * 100:.1f}%)")
+    if not baseline:
+        return problems
+
+    tolerance = settings.get("tolerance", 2.0)
+    for metric, slack in COST_METRICS.items():
+        if metric in measured and baseline.get(metric) is not None:
+            limit = baseline[metric] * tolerance + slack
+            if measured[metric] > limit:
+                problems.append(f"{metric} {measured[metric]:.2f} > {limit:.2f}")
+
+    shape_tolerance = settings.get("shape_tolerance", 0.1)
+    for metric in SHAPE_METRICS:
+        if metric in measured and baseline.get(metric):
+            drift = abs(measured[metric] / baseline[metric] - 1.0)
+            if drift > shape_tolerance:
+                problems.append(f"{metric} changed by {drift * 100:.0f}% "
+                                f"({baseline[metric]:.3f} -> {measured[metric]:.3f})")
+    return problems
+
+
+def load_baseline() -> Dict:
+    try:
+        with open(BASELINE_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"tolerance": 2.0, "shape_tolerance": 0.1, "max_wpm_error": 0.02,
+                "throughput": {}, "realtime": {}}
+
+
+def report(label: str, measured: Dict[str, float], columns: Iterable[str],
+           problems: List[str]) -> None:
+    values = "  ".join(f"{column} {measured[column]:.3f}" for column in columns)
+    status = "FAIL: " + "; ".join(problems) if problems else "ok"
+    print(f"{label:16s} {values}  {status}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the typing engine against baselines.")
+    parser.add_argument("--runs", type=int, default=5, help="Throughput runs per corpus (best is kept)")
+    parser.add_argument("--wpm", type=float, nargs="+", default=DEFAULT_WPMS,
+                        help="Speeds to type at in real time")
+    parser.add_argument("--seconds", type=float, default=1.0,
+                        help="Approximate length of each real-time run")
+    parser.add_argument("--corpus", nargs="+", choices=list(CORPORA), default=list(CORPORA),
+                        help="Corpora to run")
+    parser.add_argument("--update", action="store_true", help="Store the measured values as the new baselines")
+    args = parser.parse_args()
+
+    baseline = load_baseline()
+    failures = 0
+
+    generator = "numpy" if get_numpy() is not None else "standard library"
+    print(f"Throughput (all deadlines zero, {generator} delay generator)")
+    for name in args.corpus:
+        text = build_corpus(name)
+        measured = measure_throughput(text, args.runs)
+        stored = baseline["throughput"].get(name)
+        problems = [] if args.update else check_metrics(measured, stored, baseline)
+        failures += bool(problems)
+        report(name, measured, ["plan_us_per_char", "exec_us_per_char", "peak_kb",
+                                "events_per_char", "gap_cv"], problems)
+        if args.update:
+            baseline["throughput"][name] = {k: round(v, 4) for k, v in measured.items()}
+
+    print("Real time")
+    for name in args.corpus:
+        if name not in REALTIME_CORPORA:
+            continue
+        text = build_corpus(name)
+        for wpm in args.wpm:
+            key = f"{name}@{wpm:g}"
+            measured = measure_realtime(text, wpm, args.seconds)
+            stored = baseline["realtime"].get(key)
+            problems = check_metrics(measured, None if args.update else stored, baseline)
+            failures += bool(problems)
+            report(key, measured, ["achieved_wpm", "jitter_p50_ms", "jitter_p95_ms",
+                                   "jitter_p99_ms", "jitter_max_ms"], problems)
+            if args.update:
+                baseline["realtime"][key] = {k: round(v, 4) for k, v in measured.items()}
+
+    if args.update:
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2)
+            f.write("\n")
+        print(f"Baselines written to {BASELINE_PATH}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -73,10 +73,9 @@ pyinstaller_command = [
     f"--icon={ICON_PATH}" if os.path.exists(ICON_PATH) else "",
     "--noupx",  # Skip UPX compression for better compatibility
     "--clean",  # Clean PyInstaller cache
-    # Add all required packages
+    # Add all required packages (these are imported lazily, so PyInstaller
+    # cannot always see them). PIL is not used by the app and is left out.
     "--hidden-import=customtkinter",
-    "--hidden-import=PIL",
-    "--hidden-import=PIL._tkinter_finder",
     "--hidden-import=pyautogui",
     "--hidden-import=win32api",
     "--hidden-import=win32con",
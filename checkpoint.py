@@ -0,0 +1,208 @@
+"""
+Auto Type - Checkpoints
+Remembers how far a typing job got, so a job that was stopped or lost focus
+partway can resume from the last confirmed character instead of starting
+over. A checkpoint is only offered again for the same text (by hash) typed
+with the same settings.
+
+Checkpoints are written by a daemon thread that samples the progress the
+executor already publishes, at most once per CHECKPOINT_INTERVAL, so the
+typing loop itself never waits for the disk.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+# Seconds between two checkpoint writes while typing
+CHECKPOINT_INTERVAL = 2.0
+
+# Checkpoints kept on disk; the oldest are dropped beyond this
+MAX_CHECKPOINTS = 20
+
+# Bytes hashed per read when fingerprinting a file
+HASH_CHUNK_BYTES = 1 << 20
+
+# Settings that change the keystrokes or their timing; a checkpoint made
+# with different values is not offered for resuming
+CONFIG_FIELDS = ("wpm", "humanize", "timing", "typo_rate", "paste_mode", "auto_indent", "seed",
+                 "batch_size", "backend")
+
+
+@dataclass(frozen=True)
+class Checkpoint:
+    """How far one typing job got"""
+    text_hash: str
+    config_hash: str
+    offset: int                 # Source characters confirmed typed
+    total_chars: Optional[int]  # Length of the whole text, if known
+    source: str = ""            # File name or "text", for messages
+    saved_at: float = 0.0       # time.time() of the last write
+
+    def describe(self) -> str:
+        """Short text, e.g. "1,234 of 5,000 characters (25%)" """
+        text = f"{self.offset:,}"
+        if self.total_chars:
+            text += f" of {self.total_chars:,} characters ({self.offset / self.total_chars:.0%})"
+        else:
+            text += " characters"
+        return text
+
+
+def hash_text(text: str) -> str:
+    """Fingerprint of a text typed from a string"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def hash_file(path: str) -> str:
+    """Fingerprint of a file's raw bytes, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_config(config) -> str:
+    """Fingerprint of the TypingConfig fields listed in CONFIG_FIELDS"""
+    values = {name: getattr(config, name, None) for name in CONFIG_FIELDS}
+    return hashlib.sha256(json.dumps(values, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def default_checkpoint_path() -> str:
+    """Per-user location of the checkpoint file"""
+    base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".autotype")
+    return os.path.join(base, "AutoType", "checkpoints.json")
+
+
+class CheckpointStore:
+    """
+    Checkpoints on disk, one per text.
+
+    The file is small JSON rewritten atomically (write, then rename), so a
+    crash mid-write keeps the previous version. Safe to use from any thread.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or default_checkpoint_path()
+        self._lock = threading.Lock()
+
+    def _load_all(self) -> dict:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                entries = json.load(f)
+            return entries if isinstance(entries, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _store_all(self, entries: dict) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(entries, f)
+        os.replace(temp_path, self.path)
+
+    def load(self, text_hash: str, config_hash: str) -> Optional[Checkpoint]:
+        """The checkpoint for a text and settings, or None if there is no usable one"""
+        with self._lock:
+            entry = self._load_all().get(text_hash)
+        try:
+            checkpoint = Checkpoint(**entry)
+        except TypeError:
+            return None  # Missing, or written by an incompatible version
+        if checkpoint.config_hash != config_hash or checkpoint.offset <= 0:
+            return None
+        return checkpoint
+
+    def save(self, checkpoint: Checkpoint) -> None:
+        """Record a checkpoint, replacing the previous one for the same text"""
+        with self._lock:
+            entries = self._load_all()
+            entries.pop(checkpoint.text_hash, None)
+            entries[checkpoint.text_hash] = asdict(checkpoint)
+            # Dicts keep insertion order, so the oldest entries come first
+            for text_hash in list(entries)[:-MAX_CHECKPOINTS]:
+                del entries[text_hash]
+            self._store_all(entries)
+
+    def clear(self, text_hash: str) -> None:
+        """Forget the checkpoint of a text, e.g. once it was typed completely"""
+        with self._lock:
+            entries = self._load_all()
+            if entries.pop(text_hash, None) is not None:
+                self._store_all(entries)
+
+
+class CheckpointWriter:
+    """
+    Saves the progress of a running job in the background.
+
+    A daemon thread peeks at the job's ProgressChannel every interval and
+    writes a checkpoint when the offset moved; close() writes the exact
+    final offset (or clears the checkpoint when the job completed). Write
+    failures are only logged, typing never stops because of them.
+    """
+
+    def __init__(self, store: CheckpointStore, text_hash: str, config_hash: str,
+                 progress, start: int = 0, total_chars: Optional[int] = None,
+                 source: str = "", interval: float = CHECKPOINT_INTERVAL):
+        self.store = store
+        self.text_hash = text_hash
+        self.config_hash = config_hash
+        self.progress = progress
+        self.start = start  # Characters already typed before this run
+        self.total_chars = total_chars
+        self.source = source
+        self.interval = interval
+        self.offset = start
+        # A snapshot left in the channel by an earlier job must not count
+        self._seen = progress.peek()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="checkpoint", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            snapshot = self.progress.peek()
+            if snapshot is None or snapshot is self._seen:
+                continue
+            self._seen = snapshot
+            self._write(self.start + snapshot.chars_typed)
+
+    def _write(self, offset: int) -> None:
+        if offset == self.offset:
+            return
+        self.offset = offset
+        try:
+            self.store.save(Checkpoint(
+                text_hash=self.text_hash,
+                config_hash=self.config_hash,
+                offset=offset,
+                total_chars=self.total_chars,
+                source=self.source,
+                saved_at=time.time(),
+            ))
+        except OSError as e:
+            print(f"Warning: Could not write checkpoint: {e}")
+
+    def close(self, chars_typed: Optional[int] = None, completed: bool = False) -> None:
+        """
+        Stop the thread and record the final state.
+
+        Args:
+            chars_typed: Characters this run typed (TypingResult.chars_typed);
+                None keeps the last sampled offset, e.g. after an error
+            completed: Whether the whole text was typed
+        """
+        self._stop.set()
+        self._thread.join(1.0)
+        if completed:
+            try:
+                self.store.clear(self.text_hash)
+            except OSError as e:
+                print(f"Warning: Could not clear checkpoint: {e}")
+        elif chars_typed is not None:
+            self._write(self.start + chars_typed)
@@ -0,0 +1,195 @@
+"""
+Auto Type - Clipboard
+Pastes text into the target through the Windows clipboard and puts the
+user's own clipboard contents back afterwards.
+
+Every format on the clipboard that is held in global memory (text, rich
+text, HTML, file lists, DIB images...) is saved before the first paste
+and restored when the paster is closed. Formats held as GDI handles are
+skipped; Windows synthesizes most of them again from the memory formats.
+Off Windows nothing is pasted and paste() returns False, so the caller
+types the text instead.
+"""
+import contextlib
+import ctypes
+import platform
+import time
+from typing import Callable, List, Optional, Tuple
+
+from paste_plan import PASTE_SETTLE
+
+CF_UNICODETEXT = 13
+GMEM_MOVEABLE = 0x0002
+
+# Formats whose data is a GDI or owner handle rather than global memory
+HANDLE_FORMATS = frozenset({
+    2,     # CF_BITMAP
+    3,     # CF_METAFILEPICT
+    9,     # CF_PALETTE
+    14,    # CF_ENHMETAFILE
+    0x80,  # CF_OWNERDISPLAY
+    0x82,  # CF_DSPBITMAP
+    0x83,  # CF_DSPMETAFILEPICT
+    0x8E,  # CF_DSPENHMETAFILE
+})
+
+# Another application may hold the clipboard open for a moment
+OPEN_ATTEMPTS = 20
+OPEN_RETRY_DELAY = 0.005
+
+_user32 = None  # Set up on first use; False when not on Windows
+_kernel32 = None
+
+# Saved clipboard contents: (format, data) pairs
+ClipboardContents = List[Tuple[int, bytes]]
+
+
+def _get_user32():
+    """user32 with the clipboard signatures declared (None if not on Windows)"""
+    global _user32, _kernel32
+    if _user32 is None:
+        if platform.system() != "Windows":
+            _user32 = False
+            return None
+        handle = ctypes.c_void_p
+        user32 = ctypes.WinDLL("user32", use_last_error=True)
+        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        for dll, name, argtypes, restype in (
+            (user32, "OpenClipboard", [handle], ctypes.c_bool),
+            (user32, "CloseClipboard", [], ctypes.c_bool),
+            (user32, "EmptyClipboard", [], ctypes.c_bool),
+            (user32, "EnumClipboardFormats", [ctypes.c_uint], ctypes.c_uint),
+            (user32, "GetClipboardData", [ctypes.c_uint], handle),
+            (user32, "SetClipboardData", [ctypes.c_uint, handle], handle),
+            (kernel32, "GlobalAlloc", [ctypes.c_uint, ctypes.c_size_t], handle),
+            (kernel32, "GlobalLock", [handle], ctypes.c_void_p),
+            (kernel32, "GlobalUnlock", [handle], ctypes.c_bool),
+            (kernel32, "GlobalSize", [handle], ctypes.c_size_t),
+            (kernel32, "GlobalFree", [handle], handle),
+        ):
+            function = getattr(dll, name)
+            function.argtypes = argtypes
+            function.restype = restype
+        _kernel32 = kernel32
+        _user32 = user32
+    return _user32 or None
+
+
+@contextlib.contextmanager
+def _opened():
+    """Hold the clipboard open, retrying while another application has it"""
+    user32 = _get_user32()
+    for _ in range(OPEN_ATTEMPTS):
+        if user32.OpenClipboard(None):
+            break
+        time.sleep(OPEN_RETRY_DELAY)
+    else:
+        raise ctypes.WinError(ctypes.get_last_error())
+    try:
+        yield user32
+    finally:
+        user32.CloseClipboard()
+
+
+def _read_global(handle) -> Optional[bytes]:
+    size = _kernel32.GlobalSize(handle)
+    pointer = _kernel32.GlobalLock(handle)
+    if not pointer:
+        return None
+    try:
+        return ctypes.string_at(pointer, size)
+    finally:
+        _kernel32.GlobalUnlock(handle)
+
+
+def _set_data(user32, fmt: int, data: bytes) -> None:
+    """Put a copy of data on the (open) clipboard; the clipboard owns it afterwards"""
+    handle = _kernel32.GlobalAlloc(GMEM_MOVEABLE, max(len(data), 1))
+    if not handle:
+        raise ctypes.WinError(ctypes.get_last_error())
+    pointer = _kernel32.GlobalLock(handle)
+    ctypes.memmove(pointer, data, len(data))
+    _kernel32.GlobalUnlock(handle)
+    if not user32.SetClipboardData(fmt, handle):
+        _kernel32.GlobalFree(handle)
+        raise ctypes.WinError(ctypes.get_last_error())
+
+
+def save_clipboard() -> ClipboardContents:
+    """Copy of every global memory format on the clipboard"""
+    saved = []
+    with _opened() as user32:
+        fmt = user32.EnumClipboardFormats(0)
+        while fmt:
+            if fmt not in HANDLE_FORMATS:
+                handle = user32.GetClipboardData(fmt)
+                data = _read_global(handle) if handle else None
+                if data is not None:
+                    saved.append((fmt, data))
+            fmt = user32.EnumClipboardFormats(fmt)
+    return saved
+
+
+def restore_clipboard(saved: ClipboardContents) -> None:
+    """Replace the clipboard with contents from save_clipboard()"""
+    with _opened() as user32:
+        user32.EmptyClipboard()
+        for fmt, data in saved:
+            _set_data(user32, fmt, data)
+
+
+def set_clipboard_text(text: str) -> None:
+    """Replace the clipboard with text (Windows line endings, as pasting expects)"""
+    data = (text.replace("\r\n", "\n").replace("\n", "\r\n") + "\0").encode("utf-16-le")
+    with _opened() as user32:
+        user32.EmptyClipboard()
+        _set_data(user32, CF_UNICODETEXT, data)
+
+
+class ClipboardPaster:
+    """
+    Pastes text with the clipboard and a paste shortcut.
+
+    send_paste delivers the shortcut (Ctrl+V) to the target. The user's
+    clipboard is saved before the first paste and restored by close(),
+    after the target had PASTE_SETTLE seconds to read the last paste; the
+    clipboard is never changed sooner than that after a paste either.
+    """
+
+    def __init__(self, send_paste: Callable[[], None]):
+        self.send_paste = send_paste
+        self._saved: Optional[ClipboardContents] = None
+        self._pasted_at = None
+
+    def _settle(self) -> None:
+        if self._pasted_at is not None:
+            remaining = self._pasted_at + PASTE_SETTLE - time.perf_counter()
+            if remaining > 0:
+                time.sleep(remaining)
+
+    def paste(self, text: str) -> bool:
+        """Paste text; False if the clipboard cannot be used (type it instead)"""
+        if _get_user32() is None:
+            return False
+        try:
+            if self._saved is None:
+                self._saved = save_clipboard()
+            self._settle()
+            set_clipboard_text(text)
+        except OSError as e:
+            print(f"Warning: Could not use the clipboard: {e}")
+            return False
+        self.send_paste()
+        self._pasted_at = time.perf_counter()
+        return True
+
+    def close(self) -> None:
+        """Put the user's clipboard contents back"""
+        if self._saved is None:
+            return
+        self._settle()
+        try:
+            restore_clipboard(self._saved)
+        except OSError as e:
+            print(f"Warning: Could not restore the clipboard: {e}")
+        self._saved = None
@@ -0,0 +1,191 @@
+"""
+Auto Type - Delay Model
+Draws the human-like pauses between keystroke events. The text is
+classified into character classes once, and the randomness for a whole
+document is drawn in one pass: vectorized with NumPy when it is installed,
+with the standard library (random + array) otherwise.
+"""
+import random
+import re
+from array import array
+from itertools import accumulate
+from typing import TYPE_CHECKING, Optional, Sequence, Union
+
+if TYPE_CHECKING:
+    import numpy  # Only for annotations; imported on first use (see get_numpy)
+
+# Character classes, which decide the extra pause after a character
+CLASS_REGULAR = 0
+CLASS_SPACE = 1
+CLASS_PUNCTUATION = 2
+CLASS_NEWLINE = 3
+
+CHAR_CLASSES = {
+    " ": CLASS_SPACE, "\t": CLASS_SPACE,
+    ",": CLASS_PUNCTUATION, ".": CLASS_PUNCTUATION, ";": CLASS_PUNCTUATION,
+    ":": CLASS_PUNCTUATION, "-": CLASS_PUNCTUATION, "—": CLASS_PUNCTUATION,
+    "?": CLASS_PUNCTUATION, "!": CLASS_PUNCTUATION, ")": CLASS_PUNCTUATION,
+    "\n": CLASS_NEWLINE, "\r": CLASS_NEWLINE,
+}
+
+# Extra pause in seconds (low, high) after a character of each class
+PAUSE_RANGES = (
+    (0.0, 0.0),    # Regular characters
+    (0.01, 0.05),  # Spaces and tabs
+    (0.03, 0.12),  # Punctuation
+    (0.05, 0.15),  # Line breaks
+)
+
+# Every event takes 70-120% of its base time
+JITTER_LOW = 0.7
+JITTER_HIGH = 1.2
+
+# Lower bound for any single delay
+MIN_DELAY = 0.005
+
+# "\r\n" is a single Enter, so only its "\n" gets the line break pause
+_CLASSIFIED = re.compile("\r\n|[" + re.escape("".join(CHAR_CLASSES)) + "]")
+_PAUSE_BY_CHAR = {
+    char: (PAUSE_RANGES[cls][0], PAUSE_RANGES[cls][1] - PAUSE_RANGES[cls][0])
+    for char, cls in dict(CHAR_CLASSES, **{"\r\n": CLASS_NEWLINE}).items()
+}
+
+# Random generator: numpy.random.Generator, or random.Random without NumPy
+DelayRandom = Union[random.Random, "numpy.random.Generator"]
+
+_numpy = None  # Imported on first use; False when it is not installed
+_class_lookup = None
+
+
+def get_numpy():
+    """NumPy if it is installed (imported the first time it is needed), else None"""
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+            _numpy = numpy
+        except ImportError:
+            _numpy = False
+    return _numpy or None
+
+
+def make_rng(seed: Optional[int] = None) -> DelayRandom:
+    """
+    Random generator for delay draws; pass a seed for reproducible plans.
+
+    A seeded plan is reproducible on the same installation, but differs
+    between the NumPy and standard library generators.
+    """
+    numpy = get_numpy()
+    if numpy is not None:
+        return numpy.random.default_rng(seed)
+    return random.Random(seed)
+
+
+def calculate_human_delay(base_delay: float, char: str, rng=random) -> float:
+    """Calculate a human-like delay for the given character"""
+    # Add reduced randomness (70-120% of base speed) for faster typing
+    delay = base_delay * rng.uniform(JITTER_LOW, JITTER_HIGH)
+
+    # Add reduced extra pauses for punctuation, spaces and line breaks
+    low, high = PAUSE_RANGES[CHAR_CLASSES.get(char, CLASS_REGULAR)]
+    if high:
+        delay += rng.uniform(low, high)
+
+    return max(MIN_DELAY, delay)  # Lower minimum delay for faster typing
+
+
+def classify_text(text: str) -> array:
+    """Character class of every character of the text, as array('b')"""
+    classes = array("b", bytes(len(text)))
+    for match in _CLASSIFIED.finditer(text):
+        pos = match.end() - 1
+        classes[pos] = CHAR_CLASSES[text[pos]]
+    return classes
+
+
+def _classify_numpy(numpy, text: str):
+    """classify_text for NumPy: one lookup over the code points"""
+    global _class_lookup
+    if _class_lookup is None:
+        # One slot per code point up to the highest classified one, plus a
+        # trailing CLASS_REGULAR slot that every higher code point maps to
+        size = max(ord(char) for char in CHAR_CLASSES) + 2
+        _class_lookup = numpy.zeros(size, dtype=numpy.int8)
+        for char, cls in CHAR_CLASSES.items():
+            _class_lookup[ord(char)] = cls
+    codes = numpy.frombuffer(text.encode("utf-32-le"), dtype="<u4")
+    classes = _class_lookup[numpy.minimum(codes, len(_class_lookup) - 1)]
+    crlf = (codes[:-1] == 0x0D) & (codes[1:] == 0x0A)
+    classes[:-1][crlf] = CLASS_REGULAR
+    return classes
+
+
+def generate_delays(text: str, ends: Sequence[int], units: Sequence[float],
+                    base_delay: float, rng: DelayRandom) -> array:
+    """
+    Human-like delay after each event of a plan, for the whole text at once.
+
+    Event ``i`` covers ``text[ends[i - 1]:ends[i]]`` and takes ``units[i]``
+    times the base delay, scaled by a random jitter; the pauses of every
+    character in the event are added on top.
+
+    Args:
+        text: The text being planned
+        ends: Offset just past each event's last character (ascending)
+        units: Base delays per event (characters, or 2 for a key press)
+        base_delay: Seconds per character at the requested speed
+        rng: Generator from make_rng; a random.Random selects the
+            standard library implementation
+
+    Returns:
+        array('d') of delays in seconds, one per event
+    """
+    if not len(ends):
+        return array("d")
+    numpy = None if isinstance(rng, random.Random) else get_numpy()
+    if numpy is not None:
+        return _generate_numpy(numpy, text, ends, units, base_delay, rng)
+
+    draw = rng.random
+
+    # Pauses, drawn only for the characters that have one, then summed per
+    # event as differences of a running total
+    char_pauses = array("d", bytes(8 * len(text)))
+    for match in _CLASSIFIED.finditer(text):
+        low, span = _PAUSE_BY_CHAR[match.group()]
+        char_pauses[match.start()] = low + span * draw()
+    totals = array("d", [0.0])
+    totals.extend(accumulate(char_pauses))
+    totals = array("d", map(totals.__getitem__, ends))
+    starts = array("d", [0.0])
+    starts.extend(totals[:-1])
+
+    low = base_delay * JITTER_LOW
+    span = base_delay * (JITTER_HIGH - JITTER_LOW)
+    delays = array("d", [
+        unit * (low + span * draw()) + total - start
+        for unit, total, start in zip(units, totals, starts)
+    ])
+    if low < MIN_DELAY:
+        # Only very high speeds can go below the minimum
+        delays = array("d", [max(MIN_DELAY, delay) for delay in delays])
+    return delays
+
+
+def _generate_numpy(numpy, text, ends, units, base_delay, rng) -> array:
+    """generate_delays with every draw and sum vectorized"""
+    classes = _classify_numpy(numpy, text)
+    low = numpy.array([pause[0] for pause in PAUSE_RANGES])
+    span = numpy.array([pause[1] - pause[0] for pause in PAUSE_RANGES])
+    char_pauses = low[classes] + span[classes] * rng.random(len(classes))
+
+    ends = numpy.asarray(ends, dtype=numpy.int64)
+    starts = numpy.concatenate(([0], ends[:-1]))
+    pauses = numpy.add.reduceat(char_pauses, starts)
+
+    jitter = rng.uniform(JITTER_LOW, JITTER_HIGH, len(ends))
+    delays = numpy.maximum(MIN_DELAY, base_delay * numpy.asarray(units) * jitter + pauses)
+    result = array("d")
+    result.frombytes(delays.astype(numpy.float64).tobytes())
+    return result
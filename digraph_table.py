@@ -0,0 +1,159 @@
+"""
+Auto Type - Digraph Table
+The keystroke model's timing tables in a fixed-layout binary file: the
+alias tables of every digraph class, plus a timing factor for individual
+character pairs ("th" is quicker than most left-right pairs, "ec" slower).
+
+The file is memory-mapped read-only and its sections are used in place as
+typed memoryviews, so opening it parses nothing, a lookup only indexes into
+the mapping, and every running instance shares the same pages of the OS
+file cache. Pairs of code points below DENSE_CHARS live in a dense
+DENSE_CHARS x DENSE_CHARS array; any other pair is found by binary search
+in a sorted sparse section.
+
+Layout (little-endian, every section starts on an 8 byte boundary):
+    header   see _HEADER
+    prob     float64[classes * classes * bins]  alias table probabilities
+    alias    uint16[classes * classes * bins]   alias table columns
+    dense    float32[DENSE_CHARS * DENSE_CHARS] factor per pair (1.0: no data)
+    keys     uint64[sparse]                     (first << 32) | second, ascending
+    factors  float32[sparse]                    factor of each sparse pair
+"""
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from typing import Dict, Sequence, Tuple
+
+MAGIC = b"ATDG"
+VERSION = 1
+
+# Pairs of code points below this are stored densely
+DENSE_CHARS = 256
+
+# magic, version, classes, bins, reserved, bin_low, bin_high, reference, sparse pairs
+_HEADER = struct.Struct("<4sHHHHdddQ")
+
+
+def _aligned(size: int) -> int:
+    return (size + 7) & ~7
+
+
+def _offsets(classes: int, bins: int, sparse: int) -> Tuple[int, int, int, int, int, int]:
+    """Start of each section and the total file size"""
+    cells = classes * classes * bins
+    prob = _aligned(_HEADER.size)
+    alias = prob + 8 * cells
+    dense = alias + _aligned(2 * cells)
+    keys = dense + 4 * DENSE_CHARS * DENSE_CHARS
+    factors = keys + 8 * sparse
+    return prob, alias, dense, keys, factors, _aligned(factors + 4 * sparse)
+
+
+class DigraphTable:
+    """
+    A digraph table file, mapped read-only.
+
+    prob, alias, dense, keys and factors are memoryviews of the mapping
+    (see the module docstring); they stay valid until close().
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        if sys.byteorder != "little":
+            raise ValueError("digraph tables are little-endian")
+        with open(path, "rb") as f:
+            # The mapping keeps its own handle, so the file can be closed
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._view = memoryview(self._map)
+            self._open()
+        except Exception:
+            self.close()
+            raise
+
+    def _open(self) -> None:
+        if len(self._view) < _HEADER.size:
+            raise ValueError(f"{self.path} is not a digraph table")
+        (magic, version, self.classes, self.bins, _, self.bin_low, self.bin_high,
+         self.reference, sparse) = _HEADER.unpack_from(self._view)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path} is not a version {VERSION} digraph table")
+        prob, alias, dense, keys, factors, size = _offsets(self.classes, self.bins, sparse)
+        if len(self._view) < size:
+            raise ValueError(f"{self.path} is truncated")
+        cells = self.classes * self.classes * self.bins
+        view = self._view
+        self.prob = view[prob:prob + 8 * cells].cast("d")
+        self.alias = view[alias:alias + 2 * cells].cast("H")
+        self.dense = view[dense:keys].cast("f")
+        self.keys = view[keys:factors].cast("Q")
+        self.factors = view[factors:factors + 4 * sparse].cast("f")
+
+    def pair_factor(self, first: str, second: str) -> float:
+        """Timing factor of typing second right after first (1.0 if unknown)"""
+        a, b = ord(first), ord(second)
+        if a < DENSE_CHARS and b < DENSE_CHARS:
+            return self.dense[a * DENSE_CHARS + b]
+        key = (a << 32) | b
+        idx = bisect_left(self.keys, key)
+        if idx < len(self.keys) and self.keys[idx] == key:
+            return self.factors[idx]
+        return 1.0
+
+    def close(self) -> None:
+        """Release the views and unmap the file"""
+        for name in ("prob", "alias", "dense", "keys", "factors", "_view"):
+            view = self.__dict__.pop(name, None)
+            if view is not None:
+                view.release()
+        self._map.close()
+
+
+def write_table(path: str, prob: Sequence[float], alias: Sequence[int], classes: int,
+                bins: int, bin_low: float, bin_high: float, reference: float,
+                pair_factors: Dict[Tuple[str, str], float]) -> None:
+    """
+    Write a digraph table file (atomically: write, then rename).
+
+    Args:
+        path: File to write
+        prob, alias: Alias tables of every digraph class, indexed by
+            cell * bins + column
+        classes, bins, bin_low, bin_high: Shape of the tables
+        reference: Typical interval in seconds, which takes the base delay
+        pair_factors: Timing factor of individual character pairs
+    """
+    dense = array("f", [1.0]) * (DENSE_CHARS * DENSE_CHARS)
+    sparse = {}
+    for (first, second), factor in pair_factors.items():
+        a, b = ord(first), ord(second)
+        if a < DENSE_CHARS and b < DENSE_CHARS:
+            dense[a * DENSE_CHARS + b] = factor
+        else:
+            sparse[(a << 32) | b] = factor
+    keys = sorted(sparse)
+
+    offsets = _offsets(classes, bins, len(keys))
+    sections = (
+        _HEADER.pack(MAGIC, VERSION, classes, bins, 0, bin_low, bin_high, reference, len(keys)),
+        array("d", prob).tobytes(),
+        array("H", alias).tobytes(),
+        dense.tobytes(),
+        array("Q", keys).tobytes(),
+        array("f", [sparse[key] for key in keys]).tobytes(),
+    )
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        for start, data in zip((0,) + offsets[:-1], sections):
+            f.write(bytes(start - f.tell()))  # Padding up to the section
+            f.write(data)
+        f.write(bytes(offsets[-1] - f.tell()))
+    # A table mapped by a running instance cannot be replaced on Windows;
+    # os.replace raises then, and the old table stays in use
+    os.replace(temp_path, path)
@@ -0,0 +1,334 @@
+"""
+Auto Type - Job Queue
+A persistent list of typing jobs (text or file, target, speed, countdown)
+and a scheduler thread that types them back to back without any dialog in
+between. Each job records its own timing statistics; jobs that were stopped
+resume from their checkpoint the next time the queue runs.
+"""
+import dataclasses
+import json
+import os
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Callable, List, Optional, Tuple
+
+from backpressure import monitor_window
+from checkpoint import CheckpointStore, CheckpointWriter, hash_config, hash_file, hash_text
+from keystroke_backends import create_backend
+from paste_plan import choose_paste_mode
+from telemetry import span
+from text_sources import iter_file_text
+from typing_engine import (
+    ProgressChannel,
+    StopEvent,
+    TypingConfig,
+    create_batching,
+    execute_schedule,
+    iter_schedules,
+)
+from window_target import (
+    ReadinessWaits,
+    WindowTarget,
+    foreground_window,
+    has_input_focus,
+    root_window,
+    window_class,
+    window_from_point,
+)
+
+# Longest wait for a job's target window to be in front and ready for input
+READY_TIMEOUT = 0.5
+
+# Job states; pending, running and stopped jobs are (re)run by the scheduler
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_STOPPED = "stopped"
+JOB_FAILED = "failed"
+
+RUNNABLE_STATES = (JOB_PENDING, JOB_RUNNING, JOB_STOPPED)
+
+
+@dataclass
+class JobStats:
+    """Timing of one run of a job"""
+    chars_typed: int          # Characters typed in this run
+    setup_seconds: float      # Countdown, focusing and planning before the first key
+    typing_seconds: float     # First key to last key
+    achieved_wpm: float
+    max_lateness_ms: float
+    resumed_at: int = 0       # Characters already typed by earlier runs
+    finished_at: float = 0.0  # time.time() when the run ended
+
+    def describe(self) -> str:
+        """Short text, e.g. "1,234 chars in 52.1s at 88 WPM (setup 0.3s)" """
+        return (f"{self.chars_typed:,} chars in {self.typing_seconds:.1f}s "
+                f"at {self.achieved_wpm:.0f} WPM (setup {self.setup_seconds:.1f}s)")
+
+
+@dataclass
+class TypingJob:
+    """One entry of the queue: what to type, where, and how fast"""
+    text: Optional[str] = None           # Text to type, or
+    source_path: Optional[str] = None    # a file streamed while typing
+    position: Optional[Tuple[int, int]] = None  # Screen position clicked before typing
+    window: Optional[str] = None         # Title (or part of it) of the target window
+    window_class: Optional[str] = None   # Class name of the target window
+    wpm: float = 80.0
+    countdown_sec: int = 0               # Wait before this job starts
+    humanize: bool = True
+    job_id: str = field(default_factory=lambda: uuid.uuid4().hex[:8])
+    status: str = JOB_PENDING
+    error: Optional[str] = None
+    stats: Optional[JobStats] = None     # Timing of the latest run
+
+    @property
+    def name(self) -> str:
+        """File name, or the start of the text"""
+        if self.source_path:
+            return os.path.basename(self.source_path)
+        text = " ".join((self.text or "").split())
+        return text[:30] + "..." if len(text) > 30 else text
+
+    def config(self, base: TypingConfig) -> TypingConfig:
+        """The base settings with this job's speed and countdown"""
+        return dataclasses.replace(base, wpm=self.wpm, countdown_sec=self.countdown_sec,
+                                   humanize=self.humanize)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TypingJob":
+        data = dict(data)
+        if data.get("position") is not None:
+            data["position"] = tuple(data["position"])
+        if data.get("stats") is not None:
+            data["stats"] = JobStats(**data["stats"])
+        return cls(**data)
+
+
+def default_queue_path() -> str:
+    """Per-user location of the queue file"""
+    base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".autotype")
+    return os.path.join(base, "AutoType", "job_queue.json")
+
+
+class JobQueue:
+    """
+    Typing jobs persisted as JSON, in the order they will run.
+
+    Every change is written at once (atomically), so the queue survives a
+    restart. Safe to use from the UI and the scheduler thread at once.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or default_queue_path()
+        self._lock = threading.Lock()
+        self._jobs = self._load()
+
+    def _load(self) -> List[TypingJob]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                entries = json.load(f)
+            return [TypingJob.from_dict(entry) for entry in entries]
+        except (OSError, ValueError, TypeError) as e:
+            if os.path.exists(self.path):
+                print(f"Warning: Could not read job queue: {e}")
+            return []
+
+    def _save(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump([asdict(job) for job in self._jobs], f)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"Warning: Could not write job queue: {e}")
+
+    @property
+    def jobs(self) -> List[TypingJob]:
+        with self._lock:
+            return list(self._jobs)
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return sum(job.status in RUNNABLE_STATES for job in self._jobs)
+
+    def add(self, job: TypingJob) -> TypingJob:
+        with self._lock:
+            self._jobs.append(job)
+            self._save()
+        return job
+
+    def remove(self, job_id: str) -> None:
+        with self._lock:
+            self._jobs = [job for job in self._jobs if job.job_id != job_id]
+            self._save()
+
+    def clear_finished(self) -> None:
+        """Drop the jobs that are done or failed"""
+        with self._lock:
+            self._jobs = [job for job in self._jobs if job.status in RUNNABLE_STATES]
+            self._save()
+
+    def next_runnable(self) -> Optional[TypingJob]:
+        with self._lock:
+            for job in self._jobs:
+                if job.status in RUNNABLE_STATES:
+                    return job
+        return None
+
+    def update(self, job: TypingJob, **changes) -> None:
+        """Change fields of a job and save the queue"""
+        with self._lock:
+            for name, value in changes.items():
+                setattr(job, name, value)
+            self._save()
+
+
+def focus_target(job: TypingJob, waits: ReadinessWaits) -> Optional[int]:
+    """
+    Bring a job's target to the front: focus its window, click its position.
+
+    A window is focused by handle (found once, then cached), so a job with
+    a window and no position never moves the mouse. After a click, waits
+    until the window is in front and ready for input. Returns the handle of
+    the window that will receive the keys, if known.
+    """
+    hwnd = None
+    if job.window or job.window_class:
+        target = WindowTarget(title=job.window or "", class_name=job.window_class)
+        if not target.focus():
+            raise RuntimeError(f"Cannot focus the window '{target.describe()}'")
+        hwnd = target.hwnd
+    if job.position:
+        import pyautogui
+        pyautogui.FAILSAFE = False
+        pyautogui.click(*job.position)
+        hwnd = hwnd or root_window(window_from_point(*job.position))
+        if hwnd:
+            waits.wait("foreground", lambda: foreground_window() == hwnd, READY_TIMEOUT)
+            waits.wait("caret", lambda: has_input_focus(hwnd), READY_TIMEOUT)
+    return hwnd or foreground_window()
+
+
+class JobScheduler:
+    """
+    Types every runnable job of a queue, one after the other.
+
+    One keystroke backend is shared by all jobs and nothing waits between
+    them except each job's own countdown. Setting the stop event stops the
+    current job (it keeps a checkpoint and stays in the queue) and the
+    scheduler. Progress of the current job goes to the progress channel,
+    status messages to callback.
+    """
+
+    def __init__(self, queue: JobQueue, base_config: TypingConfig = None,
+                 stop_event: StopEvent = None, progress: ProgressChannel = None,
+                 checkpoints: CheckpointStore = None,
+                 callback: Callable[[str], None] = None,
+                 focus: Callable[[TypingJob, ReadinessWaits], Optional[int]] = focus_target):
+        self.queue = queue
+        self.base_config = base_config or TypingConfig()
+        self.stop_event = stop_event or StopEvent()
+        self.progress = progress or ProgressChannel()
+        self.checkpoints = checkpoints or CheckpointStore()
+        self.callback = callback or (lambda message: None)
+        self.focus = focus
+        self.completed = 0    # Jobs finished by this scheduler
+        self.chars_typed = 0  # Characters typed by this scheduler, over all jobs
+        self._thread = None
+
+    def start(self) -> threading.Thread:
+        """Run the queue on a daemon thread"""
+        self._thread = threading.Thread(target=self.run, name="job-scheduler", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def run(self) -> int:
+        """Run the queue on this thread; returns the number of jobs completed"""
+        backend = create_backend(self.base_config.backend, self.stop_event)
+        try:
+            while not self.stop_event.is_set():
+                job = self.queue.next_runnable()
+                if job is None:
+                    break
+                with span("job", job.name):
+                    self._run_job(job, backend)
+        finally:
+            backend.close()
+        return self.completed
+
+    def _run_job(self, job: TypingJob, backend) -> None:
+        began = time.perf_counter()
+        config = job.config(self.base_config)
+        remaining = self.queue.pending_count()
+        self.callback(f"Job {job.name}: starting ({remaining} in queue)")
+        self.queue.update(job, status=JOB_RUNNING, error=None)
+        monitor = writer = result = None
+        start = 0
+        try:
+            if job.source_path:
+                text_hash = hash_file(job.source_path)
+                source = iter_file_text(job.source_path)
+                total_chars = None
+            else:
+                text_hash = hash_text(job.text or "")
+                source = job.text or ""
+                total_chars = len(source)
+            # Checkpoints go by the requested settings, which a target may override
+            config_hash = hash_config(config)
+            checkpoint = self.checkpoints.load(text_hash, config_hash)
+            if checkpoint is not None:
+                start = checkpoint.offset
+
+            with span("countdown", job.countdown_sec):
+                stopped = self.stop_event.wait(job.countdown_sec)
+            if stopped:
+                self.queue.update(job, status=JOB_STOPPED)
+                return
+            waits = ReadinessWaits(self.stop_event)
+            with span("positioning", job.name):
+                hwnd = self.focus(job, waits)
+            if waits.phases:
+                self.callback(f"Job {job.name}: target ready ({waits.describe()})")
+            # Targets that cannot take pastes (see paste_plan) are typed
+            config = dataclasses.replace(
+                config, paste_mode=choose_paste_mode(config.paste_mode, window_class(hwnd)))
+            schedules = iter_schedules(source, config, start=start)
+            if config.backpressure:
+                monitor = monitor_window(hwnd)
+            writer = CheckpointWriter(self.checkpoints, text_hash, config_hash,
+                                      self.progress, start=start, source=job.name,
+                                      total_chars=total_chars)
+            result = execute_schedule(schedules, backend, stop_event=self.stop_event,
+                                      total_chars=total_chars and total_chars - start,
+                                      progress=self.progress,
+                                      batching=create_batching(config, monitor))
+        except Exception as e:
+            self.queue.update(job, status=JOB_FAILED, error=str(e))
+            self.callback(f"Job {job.name} failed: {e}")
+            return
+        finally:
+            if monitor is not None:
+                monitor.stop()
+            if writer is not None:
+                writer.close(result.chars_typed if result else None,
+                             completed=bool(result and result.completed))
+
+        stats = JobStats(
+            chars_typed=result.chars_typed,
+            setup_seconds=time.perf_counter() - began - result.elapsed,
+            typing_seconds=result.elapsed,
+            achieved_wpm=result.achieved_wpm,
+            max_lateness_ms=result.max_lateness * 1000.0,
+            resumed_at=start,
+            finished_at=time.time(),
+        )
+        self.chars_typed += result.chars_typed
+        status = JOB_DONE if result.completed else JOB_STOPPED
+        self.queue.update(job, status=status, stats=stats)
+        if result.completed:
+            self.completed += 1
+        self.callback(f"Job {job.name} {status}: {stats.describe()}")
@@ -0,0 +1,392 @@
+"""
+Auto Type - Keystroke Backends
+Everything that actually delivers keystrokes to the OS goes through a
+KeystrokeBackend, so the typing engine can switch injectors at runtime and
+can run headless (e.g. benchmarks on Linux) with the RecordingBackend.
+"""
+import ctypes
+import importlib.util
+import platform
+import sys
+import threading
+import time
+from array import array
+from typing import Callable, Dict, List, Tuple, Type
+
+from auto_indent import SELECT_LINE_START
+from clipboard import ClipboardPaster
+from typo_model import BACKSPACE
+
+# Key names understood by every backend's press() and the characters that
+# stand for them ("backspace" erases the character before it, "shift+home"
+# selects back to the start of the line; see shown_text)
+KEY_TEXT = {"enter": "\n", "tab": "\t", "backspace": BACKSPACE, "shift+home": SELECT_LINE_START}
+
+
+def shown_text(keys: str) -> str:
+    """
+    What a target without auto indent shows after receiving keys.
+
+    Backspaces erase the character before them, Shift+Home selects back to
+    the start of the line, and the next key replaces the selection (a
+    backspace only erases it).
+    """
+    if BACKSPACE not in keys and SELECT_LINE_START not in keys:
+        return keys
+    shown = []
+    selected = None  # Start of the selection in shown, if any
+    for char in keys:
+        if char == SELECT_LINE_START:
+            line_start = len(shown)
+            while line_start and shown[line_start - 1] != "\n":
+                line_start -= 1
+            selected = line_start if line_start < len(shown) else None
+            continue
+        if selected is not None:
+            del shown[selected:]
+            selected = None
+            if char == BACKSPACE:
+                continue
+        if char != BACKSPACE:
+            shown.append(char)
+        elif shown:
+            shown.pop()
+    return "".join(shown)
+
+
+class KeystrokeBackend:
+    """Interface for keystroke injectors"""
+
+    name = "base"
+
+    def __init__(self, stop_event: threading.Event = None):
+        # Backends that send a chunk key by key check this between keys
+        self.stop_event = stop_event
+
+    @classmethod
+    def is_available(cls) -> bool:
+        """Whether this backend can run on the current machine"""
+        return True
+
+    def write(self, text: str) -> None:
+        """Type a chunk of regular characters"""
+        raise NotImplementedError
+
+    def press(self, key: str) -> None:
+        """Press a named key ("enter", "tab")"""
+        raise NotImplementedError
+
+    def paste(self, text: str) -> None:
+        """Paste a block of text; backends without a clipboard type it instead"""
+        self.write(text)
+
+    def close(self) -> None:
+        """Release any resources held by the backend"""
+
+
+class PyAutoGUIBackend(KeystrokeBackend):
+    """Injects keys through pyautogui, without its interval or PAUSE sleeps"""
+
+    name = "pyautogui"
+
+    @classmethod
+    def is_available(cls) -> bool:
+        # Look for pyautogui without importing it; that is left to the
+        # first backend made, when typing starts
+        return importlib.util.find_spec("pyautogui") is not None
+
+    def __init__(self, stop_event: threading.Event = None):
+        super().__init__(stop_event)
+        import pyautogui
+        self._pyautogui = pyautogui
+        self._paster = ClipboardPaster(lambda: pyautogui.hotkey("ctrl", "v", _pause=False))
+
+    def write(self, text: str) -> None:
+        # The schedule owns all timing, so skip pyautogui's own sleeps.
+        # Note: pyautogui can only type characters on a US layout and skips
+        # anything else; use the sendinput backend for Unicode text.
+        if self.stop_event is None:
+            self._pyautogui.write(text, interval=0.0, _pause=False)
+            return
+        # pyautogui sends one key at a time anyway, so stop between keys
+        is_set = self.stop_event.is_set
+        for char in text:
+            if is_set():
+                return
+            self._pyautogui.write(char, interval=0.0, _pause=False)
+
+    def press(self, key: str) -> None:
+        if "+" in key:
+            self._pyautogui.hotkey(*key.split("+"), _pause=False)
+        else:
+            self._pyautogui.press(key, _pause=False)
+
+    def paste(self, text: str) -> None:
+        if not self._paster.paste(text):
+            self.write(text)
+
+    def close(self) -> None:
+        self._paster.close()
+
+
+# ===== Win32 SendInput =====
+
+# Portable fixed-width equivalents of the Win32 types, so the structures
+# have the Windows layout even when this module is imported elsewhere
+_WORD = ctypes.c_uint16
+_DWORD = ctypes.c_uint32
+_LONG = ctypes.c_int32
+_ULONG_PTR = ctypes.c_size_t
+
+INPUT_KEYBOARD = 1
+KEYEVENTF_EXTENDEDKEY = 0x0001
+KEYEVENTF_KEYUP = 0x0002
+KEYEVENTF_UNICODE = 0x0004
+
+VK_RETURN = 0x0D
+VK_TAB = 0x09
+VK_BACK = 0x08
+VK_SHIFT = 0x10
+VK_CONTROL = 0x11
+VK_HOME = 0x24
+VK_V = 0x56
+
+# Named keys to virtual-key codes
+NAMED_VK = {"enter": VK_RETURN, "tab": VK_TAB, "backspace": VK_BACK}
+
+# Named key combinations to their virtual-key codes, modifiers first
+NAMED_CHORDS = {"shift+home": (VK_SHIFT, VK_HOME)}
+
+# Navigation keys that must be flagged as extended; otherwise they are read
+# as the numeric keypad, where Shift+Home turns into a plain Home (NumLock)
+_EXTENDED_VK = frozenset({VK_HOME})
+
+# Control characters that must be sent as real keys, not Unicode packets
+_CONTROL_VK = {ord("\n"): VK_RETURN, ord("\r"): VK_RETURN, ord("\t"): VK_TAB, ord("\b"): VK_BACK}
+
+
+class MOUSEINPUT(ctypes.Structure):
+    _fields_ = [
+        ("dx", _LONG),
+        ("dy", _LONG),
+        ("mouseData", _DWORD),
+        ("dwFlags", _DWORD),
+        ("time", _DWORD),
+        ("dwExtraInfo", _ULONG_PTR),
+    ]
+
+
+class KEYBDINPUT(ctypes.Structure):
+    _fields_ = [
+        ("wVk", _WORD),
+        ("wScan", _WORD),
+        ("dwFlags", _DWORD),
+        ("time", _DWORD),
+        ("dwExtraInfo", _ULONG_PTR),
+    ]
+
+
+class HARDWAREINPUT(ctypes.Structure):
+    _fields_ = [
+        ("uMsg", _DWORD),
+        ("wParamL", _WORD),
+        ("wParamH", _WORD),
+    ]
+
+
+class _INPUTUNION(ctypes.Union):
+    _fields_ = [("mi", MOUSEINPUT), ("ki", KEYBDINPUT), ("hi", HARDWAREINPUT)]
+
+
+class INPUT(ctypes.Structure):
+    _anonymous_ = ("u",)
+    _fields_ = [("type", _DWORD), ("u", _INPUTUNION)]
+
+
+def utf16_units(text: str) -> array:
+    """UTF-16 code units of text (characters outside the BMP become surrogate pairs)"""
+    units = array("H")
+    units.frombytes(text.encode("utf-16-le"))
+    if sys.byteorder == "big":
+        units.byteswap()
+    return units
+
+
+def build_key_inputs(vk: int) -> ctypes.Array:
+    """INPUT array for one press (key-down, key-up) of a virtual key"""
+    records = (INPUT * 2)()
+    down, up = records[0], records[1]
+    down.type = up.type = INPUT_KEYBOARD
+    down.ki.wVk = up.ki.wVk = vk
+    up.ki.dwFlags = KEYEVENTF_KEYUP
+    return records
+
+
+def build_chord_inputs(*vks: int) -> ctypes.Array:
+    """INPUT array that holds down each virtual key in turn, then releases them (e.g. Ctrl+V)"""
+    records = (INPUT * (2 * len(vks)))()
+    for idx, vk in enumerate(vks):
+        down, up = records[idx], records[len(records) - 1 - idx]
+        down.type = up.type = INPUT_KEYBOARD
+        down.ki.wVk = up.ki.wVk = vk
+        extended = KEYEVENTF_EXTENDEDKEY if vk in _EXTENDED_VK else 0
+        down.ki.dwFlags = extended
+        up.ki.dwFlags = KEYEVENTF_KEYUP | extended
+    return records
+
+
+def build_unicode_inputs(text: str) -> ctypes.Array:
+    """
+    INPUT array that types text with KEYEVENTF_UNICODE packets.
+
+    Every UTF-16 code unit becomes a key-down/key-up pair carrying the unit
+    in wScan, so accented, CJK and astral (surrogate pair) characters are
+    typed regardless of keyboard layout. Newlines and tabs are sent as real
+    Enter/Tab keys because many applications ignore them as Unicode packets.
+    This is pure ctypes and works (and can be inspected) on any OS.
+    """
+    units = utf16_units(text.replace("\r\n", "\n"))
+    records = (INPUT * (2 * len(units)))()
+    unicode_up = KEYEVENTF_UNICODE | KEYEVENTF_KEYUP
+    control_vk = _CONTROL_VK
+    i = 0
+    for unit in units:
+        down = records[i].ki
+        up = records[i + 1].ki
+        records[i].type = records[i + 1].type = INPUT_KEYBOARD
+        vk = control_vk.get(unit)
+        if vk is None:
+            down.wScan = up.wScan = unit
+            down.dwFlags = KEYEVENTF_UNICODE
+            up.dwFlags = unicode_up
+        else:
+            down.wVk = up.wVk = vk
+            up.dwFlags = KEYEVENTF_KEYUP
+        i += 2
+    return records
+
+
+class SendInputBackend(KeystrokeBackend):
+    """
+    Injects keys with one Win32 SendInput call per chunk.
+
+    Text is sent as KEYEVENTF_UNICODE packets, so any character can be typed
+    (pyautogui silently drops non-ASCII text), and all key-down/key-up
+    records for a chunk go into a single INPUT array: a whole chunk costs one
+    system call instead of several per key. A chunk is delivered atomically
+    in microseconds, so stop requests are honoured between chunks.
+    """
+
+    name = "sendinput"
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return platform.system() == "Windows"
+
+    def __init__(self, stop_event: threading.Event = None):
+        super().__init__(stop_event)
+        self._user32 = ctypes.WinDLL("user32", use_last_error=True)
+        self._named = {key: build_key_inputs(vk) for key, vk in NAMED_VK.items()}
+        self._named.update((key, build_chord_inputs(*vks)) for key, vks in NAMED_CHORDS.items())
+        paste_keys = build_chord_inputs(VK_CONTROL, VK_V)
+        self._paster = ClipboardPaster(lambda: self._send(paste_keys))
+
+    def _send(self, records: ctypes.Array) -> None:
+        count = len(records)
+        sent = self._user32.SendInput(count, records, ctypes.sizeof(INPUT))
+        if sent != count:
+            raise ctypes.WinError(ctypes.get_last_error())
+
+    def write(self, text: str) -> None:
+        if text:
+            self._send(build_unicode_inputs(text))
+
+    def press(self, key: str) -> None:
+        self._send(self._named[key])
+
+    def paste(self, text: str) -> None:
+        if not self._paster.paste(text):
+            self.write(text)
+
+    def close(self) -> None:
+        self._paster.close()
+
+
+class RecordingBackend(KeystrokeBackend):
+    """
+    Records keystrokes in memory instead of sending them.
+
+    Each event is stored with the perf_counter() time it was delivered, which
+    makes the typing engine benchmarkable and testable without a display.
+    """
+
+    name = "recording"
+
+    def __init__(self, stop_event: threading.Event = None,
+                 clock: Callable[[], float] = time.perf_counter):
+        super().__init__(stop_event)
+        self._clock = clock
+        self.events: List[Tuple[float, str, str]] = []
+
+    def write(self, text: str) -> None:
+        self.events.append((self._clock(), "write", text))
+
+    def press(self, key: str) -> None:
+        self.events.append((self._clock(), "press", key))
+
+    def paste(self, text: str) -> None:
+        self.events.append((self._clock(), "paste", text))
+
+    @property
+    def timestamps(self) -> List[float]:
+        """Delivery time of every recorded event"""
+        return [event[0] for event in self.events]
+
+    def typed_text(self) -> str:
+        """The text a target application would show (see shown_text)"""
+        return shown_text("".join(
+            KEY_TEXT.get(payload, "") if kind == "press" else payload
+            for _, kind, payload in self.events
+        ))
+
+    def clear(self) -> None:
+        self.events = []
+
+
+# Backends in order of preference for create_backend("auto")
+BACKENDS: Dict[str, Type[KeystrokeBackend]] = {
+    SendInputBackend.name: SendInputBackend,
+    PyAutoGUIBackend.name: PyAutoGUIBackend,
+    RecordingBackend.name: RecordingBackend,
+}
+
+
+def available_backends() -> List[str]:
+    """Names of the backends that can run here, fastest first"""
+    return [name for name, cls in BACKENDS.items() if cls.is_available()]
+
+
+def create_backend(name: str = "auto", stop_event: threading.Event = None) -> KeystrokeBackend:
+    """
+    Create a keystroke backend by name.
+
+    "auto" picks the fastest real injector available on this machine
+    (never the recording backend). stop_event lets backends that send a
+    chunk key by key stop in the middle of it.
+    """
+    if name == "auto":
+        for candidate in available_backends():
+            if candidate != RecordingBackend.name:
+                return BACKENDS[candidate](stop_event)
+        raise RuntimeError("No keystroke backend is available on this system.")
+
+    try:
+        backend_cls = BACKENDS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown keystroke backend '{name}'. "
+            f"Choose from: auto, {', '.join(BACKENDS)}"
+        ) from None
+    if not backend_cls.is_available():
+        raise RuntimeError(f"Keystroke backend '{name}' is not available on this system.")
+    return backend_cls(stop_event)
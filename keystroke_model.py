@@ -0,0 +1,526 @@
+"""
+Auto Type - Keystroke Model
+Inter-key timing drawn from distributions fitted to recorded typing, in
+place of a uniform jitter with fixed pauses. Each interval depends on the
+digraph it spans: the class of the key before and of the key after (left
+or right hand letter, space, digit, punctuation, shifted key, line break),
+so alternating hands come fast and a capital after a full stop comes slow.
+
+Every digraph class has a log-normal or ex-Gaussian fit. The fits are
+discretized once into histograms over shared log-spaced bins and turned
+into alias tables (Vose's method), so drawing an interval costs two random
+numbers and two table lookups whatever the distribution.
+
+Built-in fits describe an average typist. Fitting recordings of your own
+    python keystroke_model.py fit recording.csv [...]
+compiles the class fits, plus a timing factor for every character pair
+with enough samples, into a memory-mapped digraph table (see
+digraph_table) at default_model_path(), or wherever the
+AUTOTYPE_KEYSTROKE_MODEL environment variable points.
+"""
+import math
+import os
+import random
+import sys
+from array import array
+from dataclasses import dataclass
+from itertools import accumulate, repeat
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from auto_indent import SELECT_LINE_START
+from delay_model import MIN_DELAY, DelayRandom, get_numpy
+from digraph_table import DENSE_CHARS, DigraphTable, write_table
+from typo_model import BACKSPACE
+
+# Key classes; an interval is conditioned on the classes of both its keys
+KEY_LEFT = 0      # Lowercase letters typed with the left hand (QWERTY)
+KEY_RIGHT = 1     # Lowercase letters typed with the right hand
+KEY_SPACE = 2
+KEY_DIGIT = 3
+KEY_PUNCT = 4     # Punctuation typed without Shift
+KEY_SHIFTED = 5   # Capitals and shifted symbols
+KEY_BREAK = 6     # Enter, Tab, Backspace and Shift+Home (see auto_indent)
+KEY_OTHER = 7     # Everything else, e.g. characters sent as Unicode
+NUM_CLASSES = 8
+
+CLASS_NAMES = ("left", "right", "space", "digit", "punct", "shifted", "break", "other")
+
+KEY_CLASSES = dict(
+    [(char, KEY_LEFT) for char in "qwertasdfgzxcvb"]
+    + [(char, KEY_RIGHT) for char in "yuiophjklnm"]
+    + [(char, KEY_DIGIT) for char in "0123456789"]
+    + [(char, KEY_PUNCT) for char in "`-=[]\\;',./"]
+    + [(char, KEY_SHIFTED) for char in "ABCDEFGHIJKLMNOPQRSTUVWXYZ~!@#$%^&*()_+{}|:\"<>?"]
+    + [(" ", KEY_SPACE), ("\n", KEY_BREAK), ("\r", KEY_BREAK), ("\t", KEY_BREAK),
+       (BACKSPACE, KEY_BREAK), (SELECT_LINE_START, KEY_BREAK)]
+)
+
+# Names of keys in recordings that are not a single character
+KEY_NAMES = {"space": " ", "enter": "\n", "return": "\n", "tab": "\t"}
+
+# Shared histogram bins: BINS log-spaced bins from BIN_LOW to BIN_HIGH seconds
+BINS = 64
+BIN_LOW = 0.02
+BIN_HIGH = 3.0
+
+# Recorded intervals outside this range (seconds) are hesitations or
+# rollover and are left out of fitting
+FIT_MIN_INTERVAL = 0.015
+FIT_MAX_INTERVAL = 2.0
+
+# Fewest intervals a digraph class needs before its fit replaces the default
+MIN_SAMPLES = 30
+
+# Fewest intervals a character pair needs for a timing factor of its own,
+# and the range the factor is kept in
+MIN_PAIR_SAMPLES = 10
+PAIR_FACTOR_RANGE = (0.5, 2.0)
+
+# Built-in fits (log-normal): median seconds before a key of each class,
+# and the spread of the log interval
+DEFAULT_MEDIANS = (0.17, 0.16, 0.17, 0.26, 0.24, 0.29, 0.36, 0.30)
+DEFAULT_SIGMAS = (0.35, 0.35, 0.35, 0.45, 0.45, 0.45, 0.5, 0.5)
+
+# Built-in adjustments: alternating hands is faster, a key after
+# punctuation, a capital or a line break follows a pause
+ALTERNATE_HANDS = 0.85
+AFTER_PAUSE = 1.3
+
+MODEL_ENV = "AUTOTYPE_KEYSTROKE_MODEL"
+
+FAMILY_LOGNORMAL = "lognormal"
+FAMILY_EXGAUSS = "exgauss"
+
+_LOG_STEP = math.log(BIN_HIGH / BIN_LOW) / BINS
+_LOG_LOW = math.log(BIN_LOW)
+_SQRT2 = math.sqrt(2.0)
+
+_model: Optional["KeystrokeModel"] = None
+
+
+def _normal_cdf(z: float) -> float:
+    return 0.5 * math.erfc(-z / _SQRT2)
+
+
+@dataclass(frozen=True)
+class DigraphFit:
+    """
+    Interval distribution of one digraph class.
+
+    Log-normal: mu and sigma of the log interval (seconds). Ex-Gaussian:
+    mu and sigma of the normal part and tau of the exponential part, in
+    seconds.
+    """
+    family: str
+    mu: float
+    sigma: float
+    tau: float = 0.0
+    samples: int = 0  # Recorded intervals it was fitted to (0: built in)
+
+    @property
+    def mean(self) -> float:
+        if self.family == FAMILY_EXGAUSS:
+            return self.mu + self.tau
+        return math.exp(self.mu + self.sigma * self.sigma / 2.0)
+
+    def cdf(self, x: float) -> float:
+        if self.family == FAMILY_EXGAUSS:
+            z = (x - self.mu) / self.sigma
+            tail = _normal_cdf(z - self.sigma / self.tau)
+            if tail > 0.0:
+                exponent = (self.sigma * self.sigma / (2.0 * self.tau * self.tau)
+                            - (x - self.mu) / self.tau)
+                tail = math.exp(min(exponent + math.log(tail), 0.0))
+            return max(0.0, _normal_cdf(z) - tail)
+        return _normal_cdf((math.log(x) - self.mu) / self.sigma)
+
+    def log_pdf(self, x: float) -> float:
+        if self.family == FAMILY_EXGAUSS:
+            tail = _normal_cdf((x - self.mu) / self.sigma - self.sigma / self.tau)
+            return (-math.log(self.tau) + self.sigma * self.sigma / (2.0 * self.tau * self.tau)
+                    - (x - self.mu) / self.tau + math.log(max(tail, 1e-300)))
+        z = (math.log(x) - self.mu) / self.sigma
+        return -math.log(x * self.sigma) - 0.5 * math.log(2.0 * math.pi) - 0.5 * z * z
+
+    def histogram(self) -> List[float]:
+        """Probability of each shared bin; the tails go to the outer bins"""
+        cdfs = [0.0] + [self.cdf(BIN_LOW * math.exp(_LOG_STEP * idx)) for idx in range(1, BINS)]
+        cdfs.append(1.0)
+        return [max(0.0, high - low) for low, high in zip(cdfs, cdfs[1:])]
+
+
+def default_fit(prev: int, key: int) -> DigraphFit:
+    """Built-in interval distribution from a key of class prev to one of class key"""
+    median = DEFAULT_MEDIANS[key]
+    if {prev, key} == {KEY_LEFT, KEY_RIGHT}:
+        median *= ALTERNATE_HANDS
+    elif prev in (KEY_PUNCT, KEY_SHIFTED, KEY_BREAK):
+        median *= AFTER_PAUSE
+    sigma = max(DEFAULT_SIGMAS[prev], DEFAULT_SIGMAS[key])
+    return DigraphFit(FAMILY_LOGNORMAL, math.log(median), sigma)
+
+
+def build_alias(weights: Sequence[float]) -> Tuple[List[float], List[int]]:
+    """
+    Alias table for drawing an index with the given weights (Vose's method).
+
+    Draw column c uniformly and keep it with probability prob[c], else take
+    alias[c]. Returns (prob, alias).
+    """
+    count = len(weights)
+    total = sum(weights)
+    if total <= 0.0:
+        return [1.0] * count, list(range(count))
+    scaled = [weight * count / total for weight in weights]
+    prob = [1.0] * count
+    alias = list(range(count))
+    small = [idx for idx, value in enumerate(scaled) if value < 1.0]
+    large = [idx for idx, value in enumerate(scaled) if value >= 1.0]
+    while small and large:
+        less = small.pop()
+        more = large.pop()
+        prob[less] = scaled[less]
+        alias[less] = more
+        scaled[more] -= 1.0 - scaled[less]
+        (small if scaled[more] < 1.0 else large).append(more)
+    # Whatever is left has (up to rounding) exactly one column's worth
+    return prob, alias
+
+
+class KeystrokeModel:
+    """
+    Digraph-conditioned inter-key intervals, sampled through alias tables.
+
+    The tables for all NUM_CLASSES x NUM_CLASSES digraph classes are built
+    once from fits, or used in place from a memory-mapped digraph table
+    (which adds a timing factor per character pair); event_delays then
+    draws every interval of a text in one pass.
+    """
+
+    def __init__(self, fits: Dict[int, DigraphFit] = None, table: DigraphTable = None):
+        self.table = table
+        self._numpy_tables = None
+        if table is not None:
+            if (table.classes, table.bins, table.bin_low, table.bin_high) != (
+                    NUM_CLASSES, BINS, BIN_LOW, BIN_HIGH):
+                raise ValueError(f"{table.path} was built for a different keystroke model")
+            self.prob = table.prob
+            self.alias = table.alias
+            self.reference = table.reference
+            return
+
+        fits = fits or {}
+        fits = [fits.get(cell) or default_fit(*divmod(cell, NUM_CLASSES))
+                for cell in range(NUM_CLASSES * NUM_CLASSES)]
+        # Flat tables, indexed by cell * BINS + column
+        self.prob = array("d")
+        self.alias = array("H")
+        for fit in fits:
+            prob, alias = build_alias(fit.histogram())
+            self.prob.extend(prob)
+            self.alias.extend(alias)
+        # Typical interval between letters and spaces; delays are scaled so
+        # that it takes the base delay
+        words = (KEY_LEFT, KEY_RIGHT, KEY_SPACE)
+        means = [fits[prev * NUM_CLASSES + key].mean for prev in words for key in words]
+        self.reference = sum(means) / len(means)
+
+    def event_delays(self, text: str, ends: Sequence[int], base_delay: float,
+                     rng: DelayRandom) -> array:
+        """
+        Delay after each event of a plan, drawn from the digraph fits.
+
+        Every character gets the interval to the key after it (a "\\r\\n"
+        pair is one Enter), times the pair's factor if a digraph table is
+        loaded; an event waits for the sum of its characters' intervals.
+        Intervals are scaled so a typical one takes base_delay.
+
+        Args:
+            text: The text being planned
+            ends: Offset just past each event's last character (ascending)
+            base_delay: Seconds per character at the requested speed
+            rng: Generator from delay_model.make_rng
+
+        Returns:
+            array('d') of delays in seconds, one per event
+        """
+        if not len(ends):
+            return array("d")
+        scale = base_delay / self.reference
+        numpy = None if isinstance(rng, random.Random) else get_numpy()
+        if numpy is not None:
+            return self._event_delays_numpy(numpy, text, ends, scale, rng)
+
+        classes = list(map(KEY_CLASSES.get, text, repeat(KEY_OTHER)))
+        classes.append(KEY_SPACE)  # The key after the text is unknown
+        draw = rng.random
+        prob = self.prob
+        alias = self.alias
+        intervals = array("d")
+        for prev, key in zip(classes, classes[1:]):
+            base = (prev * NUM_CLASSES + key) * BINS
+            column = draw() * BINS
+            idx = int(column)
+            if column - idx >= prob[base + idx]:
+                idx = alias[base + idx]
+            intervals.append(math.exp(_LOG_LOW + (idx + draw()) * _LOG_STEP) * scale)
+        if self.table is not None:
+            factor = self.table.pair_factor
+            for pos in range(len(text) - 1):
+                intervals[pos] *= factor(text[pos], text[pos + 1])
+        start = text.find("\r\n")
+        while start >= 0:
+            intervals[start] = 0.0
+            start = text.find("\r\n", start + 2)
+
+        totals = array("d", [0.0])
+        totals.extend(accumulate(intervals))
+        totals = array("d", map(totals.__getitem__, ends))
+        starts = array("d", [0.0])
+        starts.extend(totals[:-1])
+        return array("d", [max(MIN_DELAY, total - start) for total, start in zip(totals, starts)])
+
+    def _event_delays_numpy(self, numpy, text, ends, scale, rng) -> array:
+        """event_delays with every draw and sum vectorized"""
+        if self._numpy_tables is None:
+            # Class of every ASCII code point; anything above maps to the last slot
+            lookup = numpy.full(129, KEY_OTHER, dtype=numpy.int64)
+            for char, cls in KEY_CLASSES.items():
+                lookup[ord(char)] = cls
+            # Views of the tables (of the mapped file itself, if there is one)
+            self._numpy_tables = (lookup, numpy.frombuffer(self.prob, dtype=numpy.float64),
+                                  numpy.frombuffer(self.alias, dtype=numpy.uint16))
+        lookup, prob, alias = self._numpy_tables
+
+        codes = numpy.frombuffer(text.encode("utf-32-le"), dtype="<u4")
+        classes = lookup[numpy.minimum(codes, 128)]
+        following = numpy.empty_like(classes)
+        following[:-1] = classes[1:]
+        following[-1:] = KEY_SPACE
+        base = (classes * NUM_CLASSES + following) * BINS
+
+        columns = rng.random(len(codes)) * BINS
+        idx = columns.astype(numpy.int64)
+        keep = (columns - idx) < prob[base + idx]
+        idx = numpy.where(keep, idx, alias[base + idx])
+        intervals = numpy.exp(_LOG_LOW + (idx + rng.random(len(codes))) * _LOG_STEP) * scale
+        if self.table is not None:
+            intervals[:-1] *= self._pair_factors_numpy(numpy, codes[:-1], codes[1:])
+        crlf = (codes[:-1] == 0x0D) & (codes[1:] == 0x0A)
+        intervals[:-1][crlf] = 0.0
+
+        ends = numpy.asarray(ends, dtype=numpy.int64)
+        starts = numpy.concatenate(([0], ends[:-1]))
+        delays = numpy.maximum(MIN_DELAY, numpy.add.reduceat(intervals, starts))
+        result = array("d")
+        result.frombytes(delays.astype(numpy.float64).tobytes())
+        return result
+
+    def _pair_factors_numpy(self, numpy, first, second):
+        """Timing factor of each (first, second) code point pair, from the table"""
+        table = self.table
+        dense = numpy.frombuffer(table.dense, dtype=numpy.float32)
+        in_dense = (first < DENSE_CHARS) & (second < DENSE_CHARS)
+        factors = dense[numpy.where(in_dense, first * DENSE_CHARS + second, 0)].astype(numpy.float64)
+        factors[~in_dense] = 1.0
+        if len(table.keys) and not in_dense.all():
+            outside = numpy.flatnonzero(~in_dense)
+            keys = numpy.frombuffer(table.keys, dtype=numpy.uint64)
+            wanted = (first[outside].astype(numpy.uint64) << numpy.uint64(32)) | second[outside]
+            idx = numpy.minimum(numpy.searchsorted(keys, wanted), len(keys) - 1)
+            found = keys[idx] == wanted
+            factors[outside[found]] = numpy.frombuffer(table.factors, dtype=numpy.float32)[idx[found]]
+        return factors
+
+
+# ---------------------------------------------------------------------------
+# Fitting and storage
+# ---------------------------------------------------------------------------
+# Only the fit command needs statistics, csv and argparse; they are imported
+# on first use to keep them out of the typing engine's startup
+
+def fit_lognormal(intervals: Sequence[float]) -> DigraphFit:
+    """Maximum likelihood log-normal fit"""
+    import statistics
+    logs = [math.log(x) for x in intervals]
+    return DigraphFit(FAMILY_LOGNORMAL, statistics.mean(logs),
+                      max(statistics.pstdev(logs), 0.01), samples=len(intervals))
+
+
+def fit_exgauss(intervals: Sequence[float]) -> DigraphFit:
+    """Ex-Gaussian fit by the method of moments"""
+    import statistics
+    mean = statistics.mean(intervals)
+    spread = max(statistics.pstdev(intervals), 1e-4)
+    skew = statistics.mean([((x - mean) / spread) ** 3 for x in intervals])
+    # The ex-Gaussian covers skews between 0 and 2
+    skew = min(max(skew, 0.01), 1.99)
+    tau = spread * (skew / 2.0) ** (1.0 / 3.0)
+    sigma = math.sqrt(max(spread * spread - tau * tau, (0.1 * spread) ** 2))
+    return DigraphFit(FAMILY_EXGAUSS, mean - tau, sigma, tau, samples=len(intervals))
+
+
+def fit_intervals(intervals: Sequence[float]) -> DigraphFit:
+    """Log-normal or ex-Gaussian fit, whichever explains the intervals better"""
+    fits = [fit_lognormal(intervals), fit_exgauss(intervals)]
+    return max(fits, key=lambda fit: sum(map(fit.log_pdf, intervals)))
+
+
+def read_recording(path: str) -> Iterable[Tuple[float, str]]:
+    """
+    Keystrokes of a recorded session, as (seconds, key).
+
+    The CSV has a time column (seconds) and a key column: the character
+    typed, or a name such as "space", "enter", "tab" or "backspace". A
+    header row is skipped.
+    """
+    import csv
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.reader(f):
+            if len(row) < 2:
+                continue
+            try:
+                seconds = float(row[0])
+            except ValueError:
+                continue  # Header
+            key = row[1]
+            yield seconds, KEY_NAMES.get(key.lower(), key) if len(key) > 1 else key
+
+
+def collect_intervals(keystrokes: Iterable[Tuple[float, str]],
+                      intervals: Dict[int, List[float]] = None,
+                      pairs: Dict[Tuple[str, str], List[float]] = None) -> Dict[int, List[float]]:
+    """
+    Intervals of a session grouped by digraph class (and by character pair
+    into pairs, if given).
+
+    Keys that do not produce a character (backspace, arrows) break the
+    chain, so the intervals around corrections are not counted.
+    """
+    intervals = intervals if intervals is not None else {}
+    last = None
+    for seconds, key in keystrokes:
+        if len(key) != 1:
+            last = None
+            continue
+        if last is not None:
+            interval = seconds - last[0]
+            if FIT_MIN_INTERVAL <= interval <= FIT_MAX_INTERVAL:
+                prev = KEY_CLASSES.get(last[1], KEY_OTHER)
+                cls = KEY_CLASSES.get(key, KEY_OTHER)
+                intervals.setdefault(prev * NUM_CLASSES + cls, []).append(interval)
+                if pairs is not None:
+                    pairs.setdefault((last[1], key), []).append(interval)
+        last = (seconds, key)
+    return intervals
+
+
+def fit_recordings(paths: Sequence[str]) -> Tuple[Dict[int, DigraphFit], Dict[Tuple[str, str], float]]:
+    """
+    Fit the recordings: every digraph class with MIN_SAMPLES intervals, and
+    a timing factor for every character pair with MIN_PAIR_SAMPLES.
+
+    A pair's factor is its geometric mean interval over that of its class,
+    so pairs only refine their class and never change the overall speed.
+
+    Returns:
+        (fits by digraph class, factors by character pair)
+    """
+    import statistics
+    intervals = {}
+    pairs = {}
+    for path in paths:
+        collect_intervals(read_recording(path), intervals, pairs)
+    fits = {cell: fit_intervals(values) for cell, values in intervals.items()
+            if len(values) >= MIN_SAMPLES}
+    class_logs = {cell: statistics.mean(map(math.log, values))
+                  for cell, values in intervals.items()}
+    factors = {}
+    for (first, second), values in pairs.items():
+        if len(values) < MIN_PAIR_SAMPLES:
+            continue
+        cell = KEY_CLASSES.get(first, KEY_OTHER) * NUM_CLASSES + KEY_CLASSES.get(second, KEY_OTHER)
+        factor = math.exp(statistics.mean(map(math.log, values)) - class_logs[cell])
+        factors[(first, second)] = min(max(factor, PAIR_FACTOR_RANGE[0]), PAIR_FACTOR_RANGE[1])
+    return fits, factors
+
+
+def _cell_name(cell: int) -> str:
+    prev, key = divmod(cell, NUM_CLASSES)
+    return f"{CLASS_NAMES[prev]}>{CLASS_NAMES[key]}"
+
+
+def build_table(fits: Dict[int, DigraphFit], pair_factors: Dict[Tuple[str, str], float],
+                path: str) -> None:
+    """Compile fits and pair factors into a digraph table file at path"""
+    model = KeystrokeModel(fits)
+    write_table(path, model.prob, model.alias, NUM_CLASSES, BINS, BIN_LOW, BIN_HIGH,
+                model.reference, pair_factors)
+
+
+def load_model(path: str) -> KeystrokeModel:
+    """Model sampling from the digraph table file at path (memory-mapped)"""
+    table = DigraphTable(path)
+    try:
+        return KeystrokeModel(table=table)
+    except ValueError:
+        table.close()
+        raise
+
+
+def default_model_path() -> str:
+    """Per-user location of a fitted model"""
+    base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".autotype")
+    return os.path.join(base, "AutoType", "keystroke_model.bin")
+
+
+def get_keystroke_model() -> KeystrokeModel:
+    """
+    The model used for humanized typing (built on first use).
+
+    Loads AUTOTYPE_KEYSTROKE_MODEL or the per-user fitted model if there is
+    one, else the built-in fits.
+    """
+    global _model
+    if _model is None:
+        path = os.environ.get(MODEL_ENV) or default_model_path()
+        model = None
+        if os.path.exists(path):
+            try:
+                model = load_model(path)
+            except (OSError, ValueError) as e:
+                print(f"Warning: Could not read keystroke model: {e}")
+        _model = model or KeystrokeModel()
+    return _model
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(
+        description="Fit the keystroke timing model to recorded typing sessions.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    fit = commands.add_parser("fit", help="Fit digraph timing from recordings (CSV: seconds,key)")
+    fit.add_argument("recordings", nargs="+", help="Recorded sessions")
+    fit.add_argument("-o", "--output", default=default_model_path(),
+                     help="Model file to write (default: the per-user model)")
+    args = parser.parse_args(argv)
+
+    fits, pair_factors = fit_recordings(args.recordings)
+    if not fits:
+        print(f"No digraph class has {MIN_SAMPLES} usable intervals", file=sys.stderr)
+        return 1
+    for cell, fit in sorted(fits.items()):
+        print(f"{_cell_name(cell):16} {fit.family:9} mean {fit.mean * 1000:6.1f} ms "
+              f"({fit.samples} intervals)")
+    try:
+        build_table(fits, pair_factors, args.output)
+    except OSError as e:
+        print(f"Could not write {args.output}: {e}", file=sys.stderr)
+        return 1
+    print(f"Saved {len(fits)} of {NUM_CLASSES * NUM_CLASSES} digraph classes and "
+          f"{len(pair_factors)} character pairs to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+"""
+Auto Type - Paste Planning
+Decides which parts of a text are pasted through the clipboard instead of
+typed key by key. Pasting a 100 KB file takes seconds where typing it takes
+minutes, but some targets do not take pastes, and pasted prose does not
+look typed, so there are three modes:
+
+    PASTE_OFF     type everything (the default)
+    PASTE_ALL     paste everything, in chunks of up to PASTE_CHUNK_CHARS
+    PASTE_HYBRID  paste code blocks (``` fences, or runs of indented or
+                  code-like lines) and type the prose around them
+
+Everything here is pure Python without Windows dependencies, so it can be
+used and checked on any OS; the clipboard itself is in clipboard.py.
+"""
+import re
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional
+
+PASTE_OFF = "off"
+PASTE_ALL = "paste"
+PASTE_HYBRID = "hybrid"
+PASTE_MODES = (PASTE_OFF, PASTE_ALL, PASTE_HYBRID)
+
+# Most characters put on the clipboard for one paste
+PASTE_CHUNK_CHARS = 65536
+
+# Shorter blocks are typed; a paste costs PASTE_SETTLE seconds however short
+MIN_PASTE_CHARS = 80
+
+# Consecutive code-like lines that make a code block in hybrid mode
+MIN_CODE_LINES = 3
+
+# Seconds the target gets to read the clipboard after Ctrl+V before the
+# clipboard is changed again
+PASTE_SETTLE = 0.15
+
+# Window classes (prefixes) of targets that do not see the local clipboard,
+# such as virtual machine consoles; they are always typed
+PASTE_BLOCKED_CLASSES = (
+    "VMUIFrame",                 # VMware Workstation
+    "VMPlayerFrame",             # VMware Player
+    "HwndWrapper[vmconnect",     # Hyper-V Virtual Machine Connection
+    "VirtualBox",                # VirtualBox VM windows
+)
+
+_FENCE = re.compile(r"\s*(```|~~~)")
+_CODE_LINE = re.compile(
+    r"(?: {4}|\t)\s*\S"   # Indented
+    r"|.*[{};]\s*$"      # Ends a statement, or opens or closes a block
+    r"|\s*(?:(?:def|class|import|return|function|const|let|var|public|private)\b"
+    r"|#include|#define|(?:if|for|while) ?\()"
+)
+
+
+@dataclass(frozen=True)
+class Block:
+    """A piece of the text and whether it is pasted (or typed)"""
+    text: str
+    paste: bool
+
+
+def choose_paste_mode(requested: str, window_class: Optional[str] = None,
+                      blocked: Iterable[str] = PASTE_BLOCKED_CLASSES) -> str:
+    """
+    The paste mode to use for a target window.
+
+    Targets whose class starts with one of the blocked prefixes are typed
+    (PASTE_OFF) whatever was requested.
+
+    Raises:
+        ValueError: If requested is not one of PASTE_MODES
+    """
+    if requested not in PASTE_MODES:
+        raise ValueError(f"unknown paste mode '{requested}'")
+    if requested != PASTE_OFF and window_class and window_class.startswith(tuple(blocked)):
+        return PASTE_OFF
+    return requested
+
+
+def is_code_line(line: str) -> bool:
+    """Whether a line looks like source code (indented, or code-like syntax)"""
+    return _CODE_LINE.match(line) is not None
+
+
+def iter_lines(pieces: Iterable[str]) -> Iterator[str]:
+    """The lines of a text given in pieces, each with its "\\n" (the last may lack it)"""
+    partial = ""
+    for piece in pieces:
+        lines = (partial + piece).split("\n")
+        partial = lines.pop()
+        for line in lines:
+            yield line + "\n"
+    if partial:
+        yield partial
+
+
+def _chunks(text: str, paste: bool) -> Iterator[Block]:
+    for start in range(0, len(text), PASTE_CHUNK_CHARS):
+        yield Block(text[start:start + PASTE_CHUNK_CHARS], paste)
+
+
+def iter_blocks(pieces: Iterable[str], mode: str) -> Iterator[Block]:
+    """
+    Split a text, given in pieces (e.g. text_sources.iter_segments), into
+    blocks to type or paste.
+
+    Together the blocks are exactly the text, and none is longer than
+    PASTE_CHUNK_CHARS, so a stream of any size is split in bounded memory.
+    Blocks shorter than MIN_PASTE_CHARS are typed, in hybrid mode along
+    with the prose around them.
+
+    Raises:
+        ValueError: If mode is not one of PASTE_MODES
+    """
+    if mode == PASTE_OFF:
+        for piece in pieces:
+            if piece:
+                yield Block(piece, False)
+        return
+    if mode == PASTE_ALL:
+        pending = []
+        size = 0
+        for piece in pieces:
+            pending.append(piece)
+            size += len(piece)
+            if size >= PASTE_CHUNK_CHARS:
+                text = "".join(pending)
+                yield Block(text[:PASTE_CHUNK_CHARS], True)
+                pending = [text[PASTE_CHUNK_CHARS:]]
+                size = len(pending[0])
+        text = "".join(pending)
+        if text:
+            yield Block(text, len(text) >= MIN_PASTE_CHARS)
+        return
+    if mode != PASTE_HYBRID:
+        raise ValueError(f"unknown paste mode '{mode}'")
+
+    prose: List[str] = []
+    code: List[str] = []  # Lines of a (possible) code block
+    prose_size = code_size = 0
+    code_lines = 0  # Code-like lines in code
+    fenced = False
+
+    def take_prose() -> Iterator[Block]:
+        nonlocal prose_size
+        text = "".join(prose)
+        prose.clear()
+        prose_size = 0
+        return _chunks(text, False)
+
+    def end_code() -> Iterator[Block]:
+        """Emit the pending lines: a code block if long enough, else prose"""
+        nonlocal code_size, code_lines, prose_size
+        # Trailing blank lines belong to the prose that follows
+        tail = len(code)
+        while tail and not code[tail - 1].strip():
+            tail -= 1
+        text = "".join(code[:tail])
+        blank = code[tail:]
+        is_block = fenced or code_lines >= MIN_CODE_LINES
+        code.clear()
+        code_size = code_lines = 0
+        if is_block and len(text) >= MIN_PASTE_CHARS:
+            yield from take_prose()
+            yield from _chunks(text, True)
+        else:
+            prose.append(text)
+            prose_size += len(text)
+        prose.extend(blank)
+        prose_size += sum(map(len, blank))
+
+    for line in iter_lines(pieces):
+        if fenced:
+            code.append(line)
+            code_size += len(line)
+            if _FENCE.match(line):
+                yield from end_code()
+                fenced = False
+                continue
+        elif _FENCE.match(line):
+            yield from end_code()
+            fenced = True
+            code.append(line)
+            code_size += len(line)
+        elif is_code_line(line) or (code and not line.strip()):
+            # A blank line inside a run of code stays with it
+            code.append(line)
+            code_size += len(line)
+            code_lines += bool(line.strip())
+        else:
+            if code:
+                yield from end_code()
+            prose.append(line)
+            prose_size += len(line)
+        if code_size >= PASTE_CHUNK_CHARS and (fenced or code_lines >= MIN_CODE_LINES):
+            yield from end_code()
+        elif prose_size >= PASTE_CHUNK_CHARS:
+            yield from take_prose()
+    yield from end_code()
+    yield from take_prose()
@@ -0,0 +1,109 @@
+"""
+Auto Type - Global Stop Hotkey
+Registers a system-wide hotkey (Ctrl+Alt+Esc by default) that sets the
+typing stop event the moment it is pressed, whichever window has focus.
+"""
+import ctypes
+import platform
+import threading
+from typing import Callable, Optional
+
+MOD_ALT = 0x0001
+MOD_CONTROL = 0x0002
+MOD_SHIFT = 0x0004
+MOD_NOREPEAT = 0x4000
+
+VK_ESCAPE = 0x1B
+
+WM_HOTKEY = 0x0312
+WM_QUIT = 0x0012
+
+# Default stop hotkey; Unicode text injection can never produce it
+DEFAULT_MODIFIERS = MOD_CONTROL | MOD_ALT
+DEFAULT_VK = VK_ESCAPE
+DEFAULT_LABEL = "Ctrl+Alt+Esc"
+
+_HOTKEY_ID = 0xA770
+
+
+class _MSG(ctypes.Structure):
+    _fields_ = [
+        ("hwnd", ctypes.c_void_p),
+        ("message", ctypes.c_uint32),
+        ("wParam", ctypes.c_size_t),
+        ("lParam", ctypes.c_ssize_t),
+        ("time", ctypes.c_uint32),
+        ("pt_x", ctypes.c_int32),
+        ("pt_y", ctypes.c_int32),
+    ]
+
+
+class GlobalStopHotkey:
+    """
+    Sets a stop event when a global hotkey is pressed.
+
+    RegisterHotKey delivers WM_HOTKEY to the registering thread, so a
+    dedicated thread registers the key and blocks in GetMessage. Nothing is
+    polled: the event is set as soon as Windows dispatches the hotkey.
+    """
+
+    def __init__(self, stop_event: threading.Event,
+                 on_trigger: Optional[Callable[[], None]] = None,
+                 modifiers: int = DEFAULT_MODIFIERS, vk: int = DEFAULT_VK,
+                 label: str = DEFAULT_LABEL):
+        self.stop_event = stop_event
+        self.on_trigger = on_trigger
+        self.modifiers = modifiers
+        self.vk = vk
+        self.label = label
+        self._thread = None
+        self._thread_id = None
+        self._ready = threading.Event()
+        self.registered = False
+
+    @staticmethod
+    def is_available() -> bool:
+        return platform.system() == "Windows"
+
+    def start(self) -> bool:
+        """Register the hotkey; returns False if it is unavailable or taken"""
+        if not self.is_available() or self._thread is not None:
+            return self.registered
+        self._thread = threading.Thread(target=self._run, name="stop-hotkey", daemon=True)
+        self._thread.start()
+        self._ready.wait(1.0)
+        return self.registered
+
+    def _run(self) -> None:
+        user32 = ctypes.WinDLL("user32", use_last_error=True)
+        kernel32 = ctypes.WinDLL("kernel32")
+        self._thread_id = kernel32.GetCurrentThreadId()
+        self.registered = bool(user32.RegisterHotKey(
+            None, _HOTKEY_ID, self.modifiers | MOD_NOREPEAT, self.vk
+        ))
+        self._ready.set()
+        if not self.registered:
+            print(f"Warning: Could not register the {self.label} stop hotkey "
+                  f"(error {ctypes.get_last_error()})")
+            return
+
+        msg = _MSG()
+        try:
+            while user32.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+                if msg.message == WM_HOTKEY and msg.wParam == _HOTKEY_ID:
+                    self.stop_event.set()
+                    if self.on_trigger is not None:
+                        self.on_trigger()
+        finally:
+            user32.UnregisterHotKey(None, _HOTKEY_ID)
+
+    def stop(self) -> None:
+        """Unregister the hotkey and end its thread"""
+        if self._thread is None:
+            return
+        if self._thread_id is not None:
+            ctypes.WinDLL("user32").PostThreadMessageW(self._thread_id, WM_QUIT, 0, 0)
+        self._thread.join(1.0)
+        self._thread = None
+        self._thread_id = None
+        self.registered = False
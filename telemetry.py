@@ -0,0 +1,175 @@
+"""
+Auto Type - Telemetry
+Spans, counters and instant events from a typing run (countdown,
+positioning, planning, every injection and the waits between them), kept
+in a fixed-size ring buffer and exported as Chrome trace JSON (open it in
+chrome://tracing or https://ui.perfetto.dev) or CSV.
+
+Tracing is off unless start_tracing() was called (the CLI's --trace option,
+or the AUTOTYPE_TRACE environment variable for the app). While it is off,
+span() returns a shared no-op context and the executor skips its per-event
+records entirely, so the cost is one None check.
+"""
+import contextlib
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+# Records kept; older ones are overwritten once the buffer is full
+DEFAULT_CAPACITY = 65536
+
+# Environment variable naming a trace file (.json or .csv) for every run
+TRACE_ENV = "AUTOTYPE_TRACE"
+
+# Record kinds, named after the Chrome trace event phases
+SPAN = "X"
+COUNTER = "C"
+INSTANT = "i"
+
+_NO_SPAN = contextlib.nullcontext()
+
+_active: Optional["Tracer"] = None
+
+
+class Tracer:
+    """
+    Ring buffer of telemetry records.
+
+    Each record is one tuple (kind, name, start, duration, value, thread),
+    with times from time.perf_counter(). Appending to the deque is atomic,
+    so any thread may record without a lock (the recorded count and the
+    counter totals are exact as long as one thread updates each of them).
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.origin = time.perf_counter()
+        self.recorded = 0
+        self.totals = {}  # Running total of every counter
+        self._records = deque(maxlen=capacity)
+
+    @property
+    def dropped(self) -> int:
+        """Records overwritten because the buffer was full"""
+        return self.recorded - len(self._records)
+
+    def records(self) -> list:
+        return list(self._records)
+
+    def add_span(self, name: str, start: float, end: float, value=None) -> None:
+        """Record something that ran from start to end (perf_counter times)"""
+        self.recorded += 1
+        self._records.append((SPAN, name, start, end - start, value, threading.get_ident()))
+
+    @contextlib.contextmanager
+    def span(self, name: str, value=None):
+        """Record the time spent in a with block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_span(name, start, time.perf_counter(), value)
+
+    def count(self, name: str, value: float = 1) -> None:
+        """Add to a counter and record its new total"""
+        total = self.totals.get(name, 0) + value
+        self.totals[name] = total
+        self.recorded += 1
+        self._records.append((COUNTER, name, time.perf_counter(), 0.0, total, threading.get_ident()))
+
+    def instant(self, name: str, value=None) -> None:
+        """Record a point in time, e.g. a change of pace"""
+        self.recorded += 1
+        self._records.append((INSTANT, name, time.perf_counter(), 0.0, value, threading.get_ident()))
+
+    def summary(self) -> dict:
+        """Per span name: (count, total seconds), plus the counter totals"""
+        spans = {}
+        for kind, name, _, duration, _, _ in self.records():
+            if kind == SPAN:
+                count, total = spans.get(name, (0, 0.0))
+                spans[name] = (count + 1, total + duration)
+        return {"spans": spans, "counters": dict(self.totals)}
+
+    def chrome_trace(self) -> dict:
+        """The records in the Chrome trace event format"""
+        pid = os.getpid()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        events = []
+        threads = set()
+        for kind, name, start, duration, value, thread in self.records():
+            threads.add(thread)
+            event = {"name": name, "ph": kind, "pid": pid, "tid": thread,
+                     "ts": (start - self.origin) * 1e6}
+            if kind == SPAN:
+                event["dur"] = duration * 1e6
+                if value is not None:
+                    event["args"] = {"value": value}
+            elif kind == COUNTER:
+                event["args"] = {name: value}
+            else:
+                event["s"] = "t"
+                if value is not None:
+                    event["args"] = {"value": value}
+            events.append(event)
+        for thread in threads:
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": thread,
+                           "args": {"name": names.get(thread, str(thread))}})
+        return {"traceEvents": events, "displayTimeUnit": "ms",
+                "otherData": {"recorded": self.recorded, "dropped": self.dropped}}
+
+    def export(self, path: str) -> None:
+        """Write the trace to path: CSV for a .csv name, Chrome trace JSON otherwise"""
+        if path.lower().endswith(".csv"):
+            import csv  # Only needed for CSV exports
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(["kind", "name", "thread", "start_ms", "duration_ms", "value"])
+                for kind, name, start, duration, value, thread in self.records():
+                    writer.writerow([kind, name, thread, f"{(start - self.origin) * 1000:.3f}",
+                                     f"{duration * 1000:.3f}", "" if value is None else value])
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.chrome_trace(), f)
+
+
+def start_tracing(capacity: int = DEFAULT_CAPACITY) -> Tracer:
+    """Switch tracing on with a fresh buffer"""
+    global _active
+    _active = Tracer(capacity)
+    return _active
+
+
+def stop_tracing() -> Optional[Tracer]:
+    """Switch tracing off; returns the tracer that was active, for exporting"""
+    global _active
+    tracer, _active = _active, None
+    return tracer
+
+
+def active_tracer() -> Optional[Tracer]:
+    """The running tracer, or None while tracing is off"""
+    return _active
+
+
+def span(name: str, value=None):
+    """Context manager that records a span if tracing is on (no-op otherwise)"""
+    tracer = _active
+    if tracer is None:
+        return _NO_SPAN
+    return tracer.span(name, value)
+
+
+def count(name: str, value: float = 1) -> None:
+    """Add to a counter if tracing is on"""
+    tracer = _active
+    if tracer is not None:
+        tracer.count(name, value)
+
+
+def trace_path_from_env() -> Optional[str]:
+    """Trace file requested through AUTOTYPE_TRACE, if any"""
+    return os.environ.get(TRACE_ENV) or None
@@ -0,0 +1,66 @@
+"""Verifying the access code against a local HTTP source"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from auth_cache import AuthCache, HttpAccessCodeSource
+
+pytest.importorskip("requests")
+
+
+class PassJson(BaseHTTPRequestHandler):
+    """Serves pass.json after the server's delay"""
+
+    def do_GET(self):
+        time.sleep(self.server.delay)
+        body = json.dumps({"access_code": "secret"}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PassJson)
+    server.daemon_threads = True
+    server.delay = 0.0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_cache(server, tmp_path):
+    url = f"http://127.0.0.1:{server.server_port}/pass.json"
+    return AuthCache(HttpAccessCodeSource(url, timeout=5.0), str(tmp_path / "auth_cache.json"))
+
+
+def test_check_fetches_and_caches_the_code(server, tmp_path):
+    cache = make_cache(server, tmp_path)
+    assert cache.check("secret") == (True, None)
+    assert cache.check("wrong") == (False, None)
+    assert cache.is_fresh()
+    assert cache.verify("secret") is True
+
+
+def test_cancel_ends_the_check_at_once(server, tmp_path):
+    cache = make_cache(server, tmp_path)
+    server.delay = 1.0
+    threading.Timer(0.05, cache.cancel).start()
+    began = time.perf_counter()
+    assert cache.check("secret") == (False, None)
+    assert time.perf_counter() - began < 0.8
+
+    # The late response is discarded, and the next check starts afresh
+    time.sleep(1.2)
+    assert not cache.is_fresh()
+    server.delay = 0.0
+    assert cache.check("secret") == (True, None)
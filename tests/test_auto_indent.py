@@ -0,0 +1,166 @@
+"""Planning keys for editors that indent new lines by themselves"""
+import random
+import re
+
+import pytest
+
+from auto_indent import (
+    INDENT_CLEAR,
+    INDENT_KEEP,
+    SELECT_LINE_START,
+    IndentPlanner,
+    iter_indent_segments,
+)
+from keystroke_backends import KEY_TEXT, RecordingBackend, shown_text
+from typing_engine import SEGMENT_CHARS, TypingConfig, execute_schedule, iter_schedules
+
+SOURCE = (
+    "def outer():\n"
+    "    if ready:\n"
+    "        go()\n"
+    "\n"
+    "\tmixed = True\n"
+    "    back = 1\n"
+    "   \n"
+    "after = 2\n"
+    "    trailing\n"
+)
+TEXTS = [SOURCE, SOURCE.rstrip("\n"), "a\n\n    b\n  c\n\n\nd\n    \n", "  x", "\n\n", ""]
+MODES = (INDENT_KEEP, INDENT_CLEAR)
+
+
+class Editor:
+    """
+    A target that indents new lines: with the indentation of the line
+    before (INDENT_KEEP), or with whitespace of its own (INDENT_CLEAR).
+    """
+
+    def __init__(self, mode, seed=0):
+        self.mode = mode
+        self.rng = random.Random(seed)
+        self.lines = [""]
+        self.selection = None  # Start of the selected part of the last line
+
+    @property
+    def text(self):
+        return "\n".join(self.lines)
+
+    def enter(self, indent=True):
+        previous = re.match("[ \t]*", self.lines[-1]).group()
+        if not indent:
+            inserted = ""
+        elif self.mode == INDENT_KEEP:
+            inserted = previous
+        else:
+            inserted = self.rng.choice(["", "  ", "    ", "\t", previous])
+        self.lines.append(inserted)
+        self.selection = None
+
+    def receive(self, keys, indent=True):
+        for char in keys:
+            if char == "\n":
+                self.enter(indent)
+            elif char == SELECT_LINE_START:
+                self.selection = 0
+            elif char == "\b":
+                if self.selection is not None and self.selection < len(self.lines[-1]):
+                    self.lines[-1] = self.lines[-1][:self.selection]
+                else:
+                    assert self.lines[-1], "backspace joined two lines"
+                    self.lines[-1] = self.lines[-1][:-1]
+                self.selection = None
+            else:
+                if self.selection is not None:
+                    self.lines[-1] = self.lines[-1][:self.selection]
+                    self.selection = None
+                self.lines[-1] += char
+
+    def replay(self, events):
+        for _, kind, payload in events:
+            if kind == "press":
+                self.receive(KEY_TEXT[payload])
+            else:
+                self.receive(payload, indent=kind != "paste")
+
+
+def typed(text, mode, editor=None, start=0, segment_chars=SEGMENT_CHARS, **options):
+    """What the editor shows after text is typed into it from start on"""
+    config = TypingConfig(wpm=10 ** 7, auto_indent=mode, seed=2, **options)
+    backend = RecordingBackend()
+    execute_schedule(iter_schedules(text, config, segment_chars, start), backend)
+    editor = editor or Editor(mode)
+    editor.replay(backend.events)
+    return editor.text
+
+
+@pytest.mark.parametrize("mode", MODES)
+@pytest.mark.parametrize("text", TEXTS)
+@pytest.mark.parametrize("segment_chars", [7, 64, 4096])
+def test_editor_shows_the_source(mode, text, segment_chars):
+    assert typed(text, mode, segment_chars=segment_chars) == text
+
+
+@pytest.mark.parametrize("mode", MODES)
+@pytest.mark.parametrize("typo_rate", [0.0, 0.05])
+def test_editor_shows_the_source_with_pastes_and_typos(mode, typo_rate):
+    text = "Some prose before the code.\n" + SOURCE * 3 + "Some prose after it.\n    end\n"
+    assert typed(text, mode, segment_chars=64, paste_mode="hybrid", typo_rate=typo_rate) == text
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_resume_at_every_offset(mode):
+    for start in range(1, len(SOURCE)):
+        # The editor shows the part typed before, and has indented the
+        # line after it if that part ended with Enter
+        editor = Editor(mode, seed=start)
+        prefix = SOURCE[:start]
+        if prefix.endswith("\n"):
+            editor.receive(prefix[:-1], indent=False)
+            editor.enter()
+        else:
+            editor.receive(prefix, indent=False)
+        assert typed(SOURCE, mode, editor, start) == SOURCE, start
+
+
+def test_keep_types_only_the_difference():
+    plan = IndentPlanner(INDENT_KEEP).plan("a\n    b\n    c\nd\n")
+    assert plan.typed == "a\n    b\nc\n" + SELECT_LINE_START + "d\n"
+
+
+def test_clear_selects_every_line():
+    indent = IndentPlanner(INDENT_CLEAR)
+    indent.finish()
+    plan = indent.plan("a\n  b")
+    assert plan.typed == "a\n" + SELECT_LINE_START + "  b"
+    assert shown_text(plan.typed) == "a\n  b"
+
+
+def test_pending_indentation_is_cleared_by_finish():
+    indent = IndentPlanner(INDENT_KEEP)
+    assert indent.plan("    a\n").typed == "    a\n"
+    assert indent.pending
+    indent.finish()
+    assert indent.plan("").typed == SELECT_LINE_START + "\b"
+    assert not indent.pending
+
+
+def test_unknown_modes_are_rejected():
+    with pytest.raises(ValueError):
+        IndentPlanner("off")
+
+
+def test_segments_do_not_end_in_indentation():
+    text = "a\n    b\n\t\tc\n  "
+    for size in (1, 3, 5):
+        pieces = [text[start:start + size] for start in range(0, len(text), size)]
+        segments = list(iter_indent_segments(pieces))
+        assert "".join(segments) == text
+        for segment in segments[:-1]:
+            assert not re.search(r"\n[ \t]+\Z", segment)
+
+
+def test_shown_text_applies_selections():
+    assert shown_text("ab\b") == "a"
+    assert shown_text("a\n  " + SELECT_LINE_START + "b") == "a\nb"
+    assert shown_text("a\n  " + SELECT_LINE_START + "\b") == "a\n"
+    assert shown_text("a\n" + SELECT_LINE_START + "\b") == "a"
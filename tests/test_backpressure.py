@@ -0,0 +1,92 @@
+"""Slowing typing down for a target that falls behind"""
+from types import SimpleNamespace
+
+from backpressure import (
+    HIGH_LATENCY,
+    LOW_LATENCY,
+    MAX_PACE,
+    BackpressureMonitor,
+    BackpressureThrottle,
+    SimulatedTarget,
+)
+from batch_control import RECOVER_DECISIONS, SETTLE_EVENTS, AdaptiveBatchController
+from typing_engine import TypingConfig, compile_schedule, execute_schedule
+
+TEXT = "The quick brown fox jumps over the lazy dog.\n" * 6
+
+
+def test_throttle_slows_down_and_recovers():
+    throttle = BackpressureThrottle()
+    paces = [throttle.update(HIGH_LATENCY * 2) for _ in range(20)]
+    assert paces == sorted(paces)
+    assert paces[0] > 1.0 and paces[-1] == MAX_PACE
+    assert throttle.update(None) == MAX_PACE
+    assert throttle.update((HIGH_LATENCY + LOW_LATENCY) / 2) == MAX_PACE
+    paces = [throttle.update(0.0) for _ in range(100)]
+    assert paces == sorted(paces, reverse=True)
+    assert paces[-1] == 1.0
+
+
+def decide(controller, decisions):
+    """Report cheap injections for a number of controller decisions"""
+    for _ in range(decisions * SETTLE_EVENTS):
+        controller.observe(1, 1e-5, 0.0)
+
+
+def test_controller_follows_the_target():
+    monitor = SimpleNamespace(latency=None)
+    controller = AdaptiveBatchController(backpressure=monitor)
+    controller.begin(wpm=600, char_seconds=0.02)
+    decide(controller, 2)
+    assert controller.pace == 1.0
+
+    monitor.latency = HIGH_LATENCY * 2
+    decide(controller, 3)
+    assert controller.pace > 1.0
+    assert controller.backoffs == 3
+    assert controller.telemetry().target_wpm < 600
+
+    # The target caught up: the pace recovers, but only once that lasts
+    monitor.latency = 0.0
+    slowed = controller.pace
+    decide(controller, RECOVER_DECISIONS - 1)
+    assert controller.pace == slowed
+    decide(controller, 100)
+    assert controller.pace == 1.0
+    assert controller.telemetry().target_wpm == 600
+
+
+def test_simulated_target_reports_its_backlog():
+    target = SimulatedTarget(chars_per_second=100)
+    assert target.measure() == 0.0
+    target.write("x" * 50)
+    assert 0.4 < target.measure() <= 0.5
+    target.press("enter")
+    target.press("backspace")
+    target.paste("yz")
+    assert target.typed_text() == "x" * 50 + "yz"
+
+
+def type_into(target, batching=None):
+    schedule = compile_schedule(TEXT, TypingConfig(wpm=4800, humanize=False))
+    return execute_schedule(schedule, target, batching=batching)
+
+
+def test_slow_target_gets_every_key_in_order():
+    # Typed at the requested rate, the target's input queue overruns
+    overrun = SimulatedTarget(chars_per_second=250, drop_after=0.25)
+    type_into(overrun)
+    assert overrun.dropped > 0
+
+    target = SimulatedTarget(chars_per_second=250, drop_after=0.25)
+    monitor = BackpressureMonitor(target, interval=0.005)
+    monitor.start()
+    try:
+        result = type_into(target, AdaptiveBatchController(max_batch=1, backpressure=monitor))
+    finally:
+        monitor.stop()
+    assert result.completed
+    assert result.batch.backoffs > 0
+    assert result.achieved_wpm < 4800
+    assert target.dropped == 0
+    assert target.typed_text() == TEXT
@@ -0,0 +1,125 @@
+"""Saving and resuming the progress of typing jobs"""
+import dataclasses
+import time
+
+from checkpoint import (
+    MAX_CHECKPOINTS,
+    Checkpoint,
+    CheckpointStore,
+    CheckpointWriter,
+    hash_config,
+    hash_file,
+    hash_text,
+)
+from typing_engine import Progress, ProgressChannel, TypingConfig
+
+CONFIG_HASH = hash_config(TypingConfig())
+
+
+def checkpoint(text_hash="text", offset=10, config_hash=CONFIG_HASH):
+    return Checkpoint(text_hash=text_hash, config_hash=config_hash, offset=offset,
+                      total_chars=100, source="notes.txt", saved_at=1.0)
+
+
+def test_store_round_trip(tmp_path):
+    path = str(tmp_path / "AutoType" / "checkpoints.json")
+    CheckpointStore(path).save(checkpoint())
+    assert CheckpointStore(path).load("text", CONFIG_HASH) == checkpoint()
+    CheckpointStore(path).save(checkpoint(offset=20))
+    assert CheckpointStore(path).load("text", CONFIG_HASH).offset == 20
+
+
+def test_only_usable_checkpoints_are_offered(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.json"))
+    assert store.load("text", CONFIG_HASH) is None
+    store.save(checkpoint())
+    store.save(checkpoint("started", offset=0))
+    assert store.load("text", hash_config(TypingConfig(wpm=41))) is None
+    assert store.load("other", CONFIG_HASH) is None
+    assert store.load("started", CONFIG_HASH) is None
+
+
+def test_clear_forgets_one_text(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.json"))
+    store.save(checkpoint("first"))
+    store.save(checkpoint("second"))
+    store.clear("first")
+    store.clear("unknown")
+    assert store.load("first", CONFIG_HASH) is None
+    assert store.load("second", CONFIG_HASH) is not None
+
+
+def test_oldest_checkpoints_are_dropped(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.json"))
+    for index in range(MAX_CHECKPOINTS + 2):
+        store.save(checkpoint(f"text {index}"))
+    store.save(checkpoint("text 2", offset=30))  # Saving again makes it the newest
+    store.save(checkpoint("newest"))
+    assert store.load("text 0", CONFIG_HASH) is None
+    assert store.load("text 1", CONFIG_HASH) is None
+    assert store.load("text 3", CONFIG_HASH) is None
+    assert store.load("text 2", CONFIG_HASH).offset == 30
+    assert store.load("newest", CONFIG_HASH) is not None
+
+
+def test_unreadable_files_have_no_checkpoints(tmp_path):
+    path = tmp_path / "checkpoints.json"
+    path.write_text("{not json", encoding="utf-8")
+    assert CheckpointStore(str(path)).load("text", CONFIG_HASH) is None
+    path.write_text('{"text": {"offset": 5}}', encoding="utf-8")
+    assert CheckpointStore(str(path)).load("text", CONFIG_HASH) is None
+
+
+def test_hashes(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_bytes("naïve text\n".encode("utf-8"))
+    assert hash_file(str(path)) == hash_text("naïve text\n")
+    for change in ({"wpm": 60}, {"typo_rate": 0.02}, {"paste_mode": "hybrid"},
+                   {"auto_indent": "keep"}, {"seed": 1}):
+        assert hash_config(dataclasses.replace(TypingConfig(), **change)) != CONFIG_HASH
+    assert hash_config(TypingConfig(countdown_sec=1)) == CONFIG_HASH
+
+
+def progress(chars_typed):
+    return Progress(chars_typed=chars_typed, total_chars=100, achieved_wpm=60.0, eta=None)
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.perf_counter() + timeout
+    while not condition() and time.perf_counter() < deadline:
+        time.sleep(0.005)
+    return condition()
+
+
+def test_writer_saves_progress_and_the_final_offset(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.json"))
+    channel = ProgressChannel()
+    channel.publish(progress(99))  # Left over from an earlier job
+    writer = CheckpointWriter(store, "text", CONFIG_HASH, channel, start=40,
+                              total_chars=100, source="notes.txt", interval=0.01)
+    time.sleep(0.05)
+    assert store.load("text", CONFIG_HASH) is None
+
+    channel.publish(progress(5))
+    assert wait_for(lambda: store.load("text", CONFIG_HASH) is not None)
+    assert store.load("text", CONFIG_HASH).offset == 45
+
+    writer.close(chars_typed=12)
+    saved = store.load("text", CONFIG_HASH)
+    assert (saved.offset, saved.total_chars, saved.source) == (52, 100, "notes.txt")
+
+
+def test_writer_clears_completed_jobs(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.json"))
+    store.save(checkpoint(offset=50))
+    writer = CheckpointWriter(store, "text", CONFIG_HASH, ProgressChannel(), start=50)
+    writer.close(chars_typed=50, completed=True)
+    assert store.load("text", CONFIG_HASH) is None
+
+
+def test_writer_keeps_the_last_offset_after_an_error(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.json"))
+    store.save(checkpoint(offset=50))
+    writer = CheckpointWriter(store, "text", CONFIG_HASH, ProgressChannel(), start=50)
+    writer.close()
+    assert store.load("text", CONFIG_HASH).offset == 50
@@ -0,0 +1,82 @@
+"""The memory-mapped digraph table file"""
+import random
+import struct
+
+import pytest
+
+from digraph_table import DENSE_CHARS, DigraphTable, write_table
+from keystroke_model import KeystrokeModel, build_table, load_model
+
+CLASSES = 2
+BINS = 3
+PROB = [1.0, 0.5, 0.25, 1.0, 0.75, 0.5, 1.0, 0.125, 0.375, 1.0, 1.0, 0.0625]
+ALIAS = [0, 0, 1, 1, 0, 2, 2, 0, 1, 0, 1, 2]
+# Factors are stored as float32, so these are exact
+PAIRS = {
+    ("t", "h"): 0.75,  # Dense
+    ("é", "e"): 1.25,  # Dense, beyond ASCII
+    ("a", "中"): 1.5,  # Sparse
+    ("中", "文"): 0.875,  # Sparse
+    ("\U0001F600", "!"): 2.0,  # Sparse, outside the BMP
+}
+
+
+@pytest.fixture
+def table(tmp_path):
+    path = str(tmp_path / "model" / "keystroke_model.bin")
+    write_table(path, PROB, ALIAS, CLASSES, BINS, 0.01, 2.0, 0.2, PAIRS)
+    table = DigraphTable(path)
+    yield table
+    table.close()
+
+
+def test_write_open_round_trip(table):
+    assert (table.classes, table.bins) == (CLASSES, BINS)
+    assert (table.bin_low, table.bin_high, table.reference) == (0.01, 2.0, 0.2)
+    assert list(table.prob) == PROB
+    assert list(table.alias) == ALIAS
+    assert len(table.dense) == DENSE_CHARS * DENSE_CHARS
+    assert list(table.keys) == sorted(table.keys)
+    assert len(table.keys) == len(table.factors) == 3
+
+
+def test_pair_factors(table):
+    for (first, second), factor in PAIRS.items():
+        assert table.pair_factor(first, second) == factor
+    # Pairs without data, dense and sparse, before, between and after the
+    # stored keys
+    for first, second in [("h", "t"), ("x", "y"), ("a", "文"), ("中", "a"),
+                          ("文", "中"), ("\U0001F600", "?"), ("\U0001F601", "!")]:
+        assert table.pair_factor(first, second) == 1.0
+
+
+def test_other_files_are_rejected(tmp_path):
+    path = tmp_path / "table.bin"
+    path.write_bytes(b"not a digraph table, but long enough to have a header.")
+    with pytest.raises(ValueError):
+        DigraphTable(str(path))
+
+    write_table(str(path), PROB, ALIAS, CLASSES, BINS, 0.01, 2.0, 0.2, PAIRS)
+    data = path.read_bytes()
+    path.write_bytes(data[:-8])
+    with pytest.raises(ValueError, match="truncated"):
+        DigraphTable(str(path))
+
+    path.write_bytes(data[:4] + struct.pack("<H", 99) + data[6:])
+    with pytest.raises(ValueError, match="version"):
+        DigraphTable(str(path))
+
+
+def test_model_from_a_table_draws_like_the_built_in_one(tmp_path):
+    path = str(tmp_path / "keystroke_model.bin")
+    build_table({}, {}, path)
+    loaded = load_model(path)
+    try:
+        text = "Typing from a mapped table.\n"
+        ends = list(range(1, len(text) + 1))
+        built_in = KeystrokeModel()
+        assert loaded.reference == built_in.reference
+        assert (list(loaded.event_delays(text, ends, 0.1, random.Random(5)))
+                == list(built_in.event_delays(text, ends, 0.1, random.Random(5))))
+    finally:
+        loaded.table.close()
@@ -0,0 +1,131 @@
+"""Typing the jobs of a queue back to back"""
+import threading
+import time
+
+import job_queue
+from checkpoint import CheckpointStore, hash_config, hash_text
+from job_queue import (
+    JOB_DONE,
+    JOB_FAILED,
+    JOB_STOPPED,
+    JobQueue,
+    JobScheduler,
+    TypingJob,
+)
+from keystroke_backends import RecordingBackend
+from typing_engine import StopEvent, TypingConfig
+
+TEXT = "First line of the job.\nSecond line, a little longer than the first.\n"
+CONFIG = TypingConfig(backend="recording", backpressure=False)
+
+
+class StoppingBackend(RecordingBackend):
+    """Records keys and presses the stop hotkey after stop_after of them"""
+
+    def __init__(self, stop_event, stop_after=None):
+        super().__init__(stop_event)
+        self.stop_after = stop_after
+
+    def write(self, text):
+        super().write(text)
+        if self.stop_after is not None and len(self.typed_text()) >= self.stop_after:
+            self.stop_event.set()
+
+
+def scheduler(tmp_path, monkeypatch, stop_after=None, focus=None):
+    """A scheduler for the queue in tmp_path; returns it and its backend"""
+    stop_event = StopEvent()
+    backend = StoppingBackend(stop_event, stop_after)
+    monkeypatch.setattr(job_queue, "create_backend", lambda name, stop_event: backend)
+    focused = []
+
+    def focus_stub(job, waits):
+        focused.append(job.job_id)
+        return None
+
+    messages = []
+    runner = JobScheduler(
+        JobQueue(str(tmp_path / "job_queue.json")), CONFIG, stop_event=stop_event,
+        checkpoints=CheckpointStore(str(tmp_path / "checkpoints.json")),
+        callback=messages.append, focus=focus or focus_stub)
+    runner.focused = focused
+    runner.messages = messages
+    return runner, backend
+
+
+def job(text=TEXT):
+    return TypingJob(text=text, wpm=6000, humanize=False)
+
+
+def test_jobs_are_typed_in_order(tmp_path, monkeypatch):
+    queue = JobQueue(str(tmp_path / "job_queue.json"))
+    first, second = queue.add(job()), queue.add(job("Another job."))
+    runner, backend = scheduler(tmp_path, monkeypatch)
+
+    assert runner.run() == 2
+    assert backend.typed_text() == TEXT + "Another job."
+    assert runner.focused == [first.job_id, second.job_id]
+    assert runner.chars_typed == len(TEXT) + len("Another job.")
+
+    # The queue on disk has the results
+    jobs = JobQueue(str(tmp_path / "job_queue.json")).jobs
+    assert [saved.status for saved in jobs] == [JOB_DONE, JOB_DONE]
+    stats = jobs[0].stats
+    assert stats.chars_typed == len(TEXT)
+    assert stats.resumed_at == 0
+    assert stats.typing_seconds > 0 and stats.setup_seconds >= 0
+    assert stats.achieved_wpm > 0
+    assert any(message.startswith(f"Job {first.name} done") for message in runner.messages)
+
+
+def test_stopped_job_resumes_from_its_checkpoint(tmp_path, monkeypatch):
+    queued = JobQueue(str(tmp_path / "job_queue.json")).add(job())
+    runner, backend = scheduler(tmp_path, monkeypatch, stop_after=30)
+    assert runner.run() == 0
+    typed = backend.typed_text()
+    assert 30 <= len(typed) < len(TEXT)
+    [stopped] = JobQueue(str(tmp_path / "job_queue.json")).jobs
+    assert stopped.status == JOB_STOPPED
+    assert stopped.stats.chars_typed == len(typed)
+
+    runner, backend = scheduler(tmp_path, monkeypatch)
+    assert runner.run() == 1
+    assert typed + backend.typed_text() == TEXT
+    [done] = JobQueue(str(tmp_path / "job_queue.json")).jobs
+    assert done.status == JOB_DONE
+    assert done.stats.resumed_at == len(typed)
+    assert done.stats.chars_typed == len(TEXT) - len(typed)
+    # A completed job leaves no checkpoint behind
+    store = CheckpointStore(str(tmp_path / "checkpoints.json"))
+    assert store.load(hash_text(TEXT), hash_config(queued.config(CONFIG))) is None
+
+
+def test_failed_focus_fails_the_job_and_the_queue_goes_on(tmp_path, monkeypatch):
+    queue = JobQueue(str(tmp_path / "job_queue.json"))
+    queue.add(job("Unreachable."))
+    queue.add(job("Reachable."))
+
+    def focus(job, waits):
+        if job.text == "Unreachable.":
+            raise RuntimeError("Cannot focus the window 'gone'")
+        return None
+
+    runner, backend = scheduler(tmp_path, monkeypatch, focus=focus)
+    assert runner.run() == 1
+    assert backend.typed_text() == "Reachable."
+    failed, done = JobQueue(str(tmp_path / "job_queue.json")).jobs
+    assert (failed.status, failed.error) == (JOB_FAILED, "Cannot focus the window 'gone'")
+    assert done.status == JOB_DONE
+
+
+def test_stop_during_countdown_keeps_the_job(tmp_path, monkeypatch):
+    queue = JobQueue(str(tmp_path / "job_queue.json"))
+    queue.add(TypingJob(text=TEXT, countdown_sec=30))
+    runner, backend = scheduler(tmp_path, monkeypatch)
+    threading.Timer(0.05, runner.stop_event.set).start()
+    began = time.perf_counter()
+    assert runner.run() == 0
+    assert time.perf_counter() - began < 5.0
+    assert backend.events == []
+    assert runner.focused == []
+    assert JobQueue(str(tmp_path / "job_queue.json")).jobs[0].status == JOB_STOPPED
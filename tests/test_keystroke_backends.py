@@ -0,0 +1,46 @@
+"""Building SendInput event arrays, which needs no Windows"""
+from keystroke_backends import (
+    INPUT_KEYBOARD,
+    KEYEVENTF_KEYUP,
+    KEYEVENTF_UNICODE,
+    VK_RETURN,
+    VK_TAB,
+    build_unicode_inputs,
+    utf16_units,
+)
+
+
+def packets(records):
+    """(wVk, wScan, dwFlags) of every record"""
+    assert all(record.type == INPUT_KEYBOARD for record in records)
+    return [(record.ki.wVk, record.ki.wScan, record.ki.dwFlags) for record in records]
+
+
+def test_utf16_units_split_astral_characters_into_surrogate_pairs():
+    assert list(utf16_units("aé")) == [0x61, 0xE9]
+    assert list(utf16_units("\U0001F600")) == [0xD83D, 0xDE00]
+
+
+def test_each_code_unit_is_a_unicode_down_up_pair():
+    text = "aé中\U0001F600"
+    records = build_unicode_inputs(text)
+    expected = []
+    for unit in utf16_units(text):
+        expected.append((0, unit, KEYEVENTF_UNICODE))
+        expected.append((0, unit, KEYEVENTF_UNICODE | KEYEVENTF_KEYUP))
+    assert packets(records) == expected
+
+
+def test_line_breaks_and_tabs_are_real_keys():
+    records = build_unicode_inputs("a\r\nb\tc\n")
+    keys = [(vk, flags) for vk, scan, flags in packets(records) if vk]
+    assert keys == [
+        (VK_RETURN, 0), (VK_RETURN, KEYEVENTF_KEYUP),
+        (VK_TAB, 0), (VK_TAB, KEYEVENTF_KEYUP),
+        (VK_RETURN, 0), (VK_RETURN, KEYEVENTF_KEYUP),
+    ]
+    assert len(records) == 2 * len("a\nb\tc\n")
+
+
+def test_empty_text_builds_no_records():
+    assert len(build_unicode_inputs("")) == 0
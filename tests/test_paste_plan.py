@@ -0,0 +1,83 @@
+"""Splitting text into blocks to type or paste"""
+import pytest
+
+from paste_plan import (
+    MIN_PASTE_CHARS,
+    PASTE_ALL,
+    PASTE_CHUNK_CHARS,
+    PASTE_HYBRID,
+    PASTE_MODES,
+    PASTE_OFF,
+    choose_paste_mode,
+    is_code_line,
+    iter_blocks,
+)
+
+PROSE = "Some prose that explains the code below it, in plain English words.\n"
+CODE = ("def double(x):\n    y = x * 2\n\n    return y\n\n\n"
+        "class Counter:\n    def __init__(self):\n        self.count = 0\n")
+FENCED = "```\nprint('a fenced block, with a line that is just long enough to be pasted')\n```\n"
+TEXT = (PROSE * 2 + CODE + PROSE + FENCED + "short;\n" + PROSE) * 20 + "no newline at the end"
+
+
+def pieces(text, size):
+    return [text[start:start + size] for start in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize("mode", PASTE_MODES)
+@pytest.mark.parametrize("size", [1, 7, 100, 4096, len(TEXT)])
+def test_blocks_concatenate_to_the_input(mode, size):
+    blocks = list(iter_blocks(pieces(TEXT, size), mode))
+    assert "".join(block.text for block in blocks) == TEXT
+    assert all(0 < len(block.text) <= PASTE_CHUNK_CHARS for block in blocks)
+
+
+def test_off_types_everything():
+    assert not any(block.paste for block in iter_blocks(pieces(TEXT, 50), PASTE_OFF))
+
+
+def test_paste_all_uses_chunks():
+    text = "x" * (2 * PASTE_CHUNK_CHARS + 500)
+    blocks = list(iter_blocks(pieces(text, 3000), PASTE_ALL))
+    assert [len(block.text) for block in blocks] == [PASTE_CHUNK_CHARS, PASTE_CHUNK_CHARS, 500]
+    assert all(block.paste for block in blocks)
+
+
+def test_paste_all_types_short_texts():
+    short = "x" * (MIN_PASTE_CHARS - 1)
+    assert [block.paste for block in iter_blocks([short], PASTE_ALL)] == [False]
+
+
+def test_hybrid_pastes_code_and_types_prose():
+    blocks = list(iter_blocks(pieces(PROSE + CODE + PROSE + FENCED + PROSE, 13), PASTE_HYBRID))
+    pasted = [block.text for block in blocks if block.paste]
+    assert pasted == [CODE, FENCED]
+    typed = "".join(block.text for block in blocks if not block.paste)
+    assert typed.count(PROSE) == 3
+    assert "short;" not in "".join(pasted)
+
+
+def test_hybrid_types_short_code():
+    text = PROSE + "x = 1;\ny = 2;\nz = 3;\n" + PROSE
+    assert not any(block.paste for block in iter_blocks([text], PASTE_HYBRID))
+
+
+def test_code_lines():
+    assert is_code_line("    indented\n")
+    assert is_code_line("\tindented\n")
+    assert is_code_line("int x = 1;\n")
+    assert is_code_line("import os\n")
+    assert not is_code_line("Importantly, this is prose.\n")
+
+
+def test_blocked_targets_are_typed():
+    assert choose_paste_mode(PASTE_HYBRID, "VMUIFrame") == PASTE_OFF
+    assert choose_paste_mode(PASTE_ALL, "Notepad") == PASTE_ALL
+    assert choose_paste_mode(PASTE_ALL) == PASTE_ALL
+
+
+def test_unknown_modes_are_rejected():
+    with pytest.raises(ValueError):
+        choose_paste_mode("sometimes")
+    with pytest.raises(ValueError):
+        list(iter_blocks([TEXT], "sometimes"))
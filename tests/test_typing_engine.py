@@ -0,0 +1,108 @@
+"""Compiling keystroke schedules and replaying them headless"""
+import random
+import threading
+import time
+
+import pytest
+
+from keystroke_backends import RecordingBackend
+from typing_engine import (
+    EVENT_KEY,
+    EVENT_TEXT,
+    TypingConfig,
+    compile_schedule,
+    estimate_duration,
+    execute_schedule,
+    wait_until,
+)
+
+TEXT = "Hello, world!\n\tIndented line with a tab.\r\nWindows line end; done."
+CONFIGS = [
+    TypingConfig(wpm=80, humanize=False),
+    TypingConfig(wpm=80, seed=7),
+    TypingConfig(wpm=80, seed=7, timing="uniform"),
+    TypingConfig(wpm=80, seed=7, typo_rate=0.1),
+    TypingConfig(wpm=80, seed=7, batch_size=4),
+]
+
+
+def plan(schedule):
+    return (schedule.events, list(schedule.kinds), list(schedule.deadlines),
+            list(schedule.offsets), schedule.duration, schedule.typos)
+
+
+@pytest.mark.parametrize("config", CONFIGS)
+def test_seeded_schedules_reproduce(config):
+    assert plan(compile_schedule(TEXT, config)) == plan(compile_schedule(TEXT, config))
+    # With the standard library generator as well as NumPy's
+    assert (plan(compile_schedule(TEXT, config, random.Random(3)))
+            == plan(compile_schedule(TEXT, config, random.Random(3))))
+
+
+def test_other_seeds_change_the_rhythm():
+    first, second = (compile_schedule(TEXT, TypingConfig(seed=seed)) for seed in (1, 2))
+    assert first.events == second.events
+    assert list(first.deadlines) != list(second.deadlines)
+
+
+@pytest.mark.parametrize("config", CONFIGS)
+def test_deadlines_fill_the_wpm_budget(config):
+    schedule = compile_schedule(TEXT * 3, config)
+    deadlines = list(schedule.deadlines)
+    assert deadlines[0] == 0.0
+    assert all(later > earlier for earlier, later in zip(deadlines, deadlines[1:]))
+    assert deadlines[-1] < schedule.duration
+    assert schedule.duration == pytest.approx(estimate_duration(len(TEXT) * 3, config.wpm))
+    assert list(schedule.offsets) == sorted(schedule.offsets)
+    assert schedule.char_count == len(TEXT) * 3
+
+
+def test_empty_text_has_an_empty_schedule():
+    schedule = compile_schedule("", TypingConfig(seed=1))
+    assert len(schedule) == 0
+    assert schedule.duration == 0.0
+    assert schedule.char_count == 0
+
+
+@pytest.mark.parametrize("humanize", [False, True])
+def test_recording_backend_receives_the_source(humanize):
+    config = TypingConfig(wpm=1500, humanize=humanize, seed=1)
+    schedule = compile_schedule(TEXT, config)
+    backend = RecordingBackend()
+    result = execute_schedule(schedule, backend)
+
+    assert result.completed
+    assert result.chars_typed == len(TEXT)
+    # A Windows line end is one Enter
+    assert backend.typed_text() == TEXT.replace("\r\n", "\n")
+    sent = sum(len(payload) if kind == "write" else 1 for _, kind, payload in backend.events)
+    assert sent == schedule.keystroke_count
+    assert [kind for _, kind, _ in backend.events] == [
+        "write" if kind == EVENT_TEXT else "press" for kind in schedule.kinds]
+    assert result.achieved_wpm == pytest.approx(config.wpm, rel=0.15)
+
+
+def test_events_follow_their_deadlines():
+    schedule = compile_schedule(TEXT, TypingConfig(wpm=1500, humanize=False))
+    backend = RecordingBackend()
+    execute_schedule(schedule, backend)
+    times = backend.timestamps
+    sent = [stamp - times[0] for stamp in times]
+    assert sent == sorted(sent)
+    for stamp, deadline in zip(sent, schedule.deadlines):
+        assert stamp >= deadline - 1e-3
+    assert EVENT_KEY in schedule.kinds
+
+
+def test_wait_until_a_past_deadline_returns_how_late_it_is():
+    deadline = time.perf_counter() - 0.5
+    assert wait_until(deadline) >= 0.5
+    assert wait_until(deadline, threading.Event()) >= 0.5
+
+
+def test_wait_until_returns_at_once_when_stopped():
+    stop_event = threading.Event()
+    stop_event.set()
+    started = time.perf_counter()
+    assert wait_until(started + 60.0, stop_event) == 0.0
+    assert time.perf_counter() - started < 1.0
@@ -0,0 +1,59 @@
+"""Typo edit plans always reproduce their source text"""
+import random
+
+import pytest
+
+from delay_model import make_rng
+from typo_model import BACKSPACE, neighbour_keys, plan_typos, replay
+
+TEXT = (
+    "The quick brown fox jumps over the lazy dog.\n"
+    "\tPack my box with five dozen liquor jugs!\r\n"
+    "Sphinx of black quartz, judge my vow: 0123456789 - ÄÖÜ ß 中文\n"
+)
+
+
+@pytest.mark.parametrize("seed", range(8))
+@pytest.mark.parametrize("rate", [0.02, 0.2, 1.0])
+def test_plan_replays_to_the_source(seed, rate):
+    plan = plan_typos(TEXT, rate, make_rng(seed))
+    assert plan is not None
+    assert plan.typos > 0
+    assert replay(plan.typed) == TEXT
+    assert len(plan.confirmed) == len(plan.typed) + 1
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_confirmed_characters_only_grow_to_the_whole_text(seed):
+    plan = plan_typos(TEXT, 0.1, random.Random(seed))
+    confirmed = list(plan.confirmed)
+    assert confirmed[0] == 0
+    assert confirmed[-1] == len(TEXT)
+    assert all(a <= b for a, b in zip(confirmed, confirmed[1:]))
+
+
+def test_slips_stay_on_their_line():
+    plan = plan_typos(TEXT, 1.0, make_rng(3))
+    for line in plan.typed.split("\n")[:-1]:
+        assert not line.startswith(BACKSPACE)
+        assert replay(line) + "\n" in TEXT
+
+
+def test_typos_hit_neighbouring_keys():
+    neighbours = neighbour_keys()
+    assert "w" in neighbours["q"] and "a" in neighbours["q"]
+    assert "p" not in neighbours["q"]
+    # Shift is held for a capital, so it slips to other capitals only
+    assert neighbours["Q"] == "".join(key.upper() for key in neighbours["q"] if key.isalpha())
+
+
+def test_no_plan_without_typos():
+    assert plan_typos(TEXT, 0.0, make_rng(1)) is None
+    assert plan_typos("", 0.5, make_rng(1)) is None
+    assert plan_typos("a\bb", 0.5, make_rng(1)) is None
+
+
+@pytest.mark.parametrize("rate", [-0.1, 1.5])
+def test_rate_must_be_a_probability(rate):
+    with pytest.raises(ValueError):
+        plan_typos(TEXT, rate, make_rng(1))
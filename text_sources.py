@@ -0,0 +1,121 @@
+"""
+Auto Type - Text Sources
+Generator pipeline that feeds the typing engine from strings, iterables,
+file objects or memory-mapped files, reading the source incrementally so
+memory use stays constant no matter how large the input is.
+"""
+import codecs
+import mmap
+import os
+from typing import IO, Iterable, Iterator, Union
+
+# Characters read from a source per step
+DEFAULT_CHUNK_CHARS = 65536
+
+# Anything human_typing accepts as text
+TextSource = Union[str, Iterable[str], IO]
+
+
+def iter_text(source: TextSource, chunk_chars: int = DEFAULT_CHUNK_CHARS,
+              encoding: str = "utf-8") -> Iterator[str]:
+    """
+    Yield the text of a source piece by piece.
+
+    Args:
+        source: A string, a text or binary file object, or any iterable of strings
+        chunk_chars: Maximum size of each piece read from a file object
+        encoding: Encoding used when a file object returns bytes
+    """
+    if isinstance(source, str):
+        for start in range(0, len(source), chunk_chars):
+            yield source[start:start + chunk_chars]
+        return
+
+    if hasattr(source, "read"):
+        decoder = None
+        while True:
+            piece = source.read(chunk_chars)
+            if not piece:
+                break
+            if isinstance(piece, bytes):
+                if decoder is None:
+                    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+                piece = decoder.decode(piece)
+            if piece:
+                yield piece
+        if decoder is not None:
+            tail = decoder.decode(b"", final=True)
+            if tail:
+                yield tail
+        return
+
+    for piece in source:
+        if piece:
+            yield piece
+
+
+def iter_file_text(path: str, encoding: str = "utf-8-sig",
+                   chunk_bytes: int = DEFAULT_CHUNK_CHARS) -> Iterator[str]:
+    """
+    Yield the text of a file through a read-only memory map.
+
+    Pages are only touched as they are decoded, so multi-megabyte files are
+    typed without ever holding the whole text in memory.
+    """
+    if os.path.getsize(path) == 0:
+        return  # mmap cannot map an empty file
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+        size = len(view)
+        for start in range(0, size, chunk_bytes):
+            piece = decoder.decode(view[start:start + chunk_bytes])
+            if piece:
+                yield piece
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+
+
+def normalize_newlines(pieces: Iterable[str]) -> Iterator[str]:
+    """Convert CRLF and lone CR line endings to LF, even across piece boundaries"""
+    pending_cr = False
+    for piece in pieces:
+        if pending_cr:
+            piece = "\r" + piece
+        pending_cr = piece.endswith("\r")
+        if pending_cr:
+            piece = piece[:-1]
+        piece = piece.replace("\r\n", "\n").replace("\r", "\n")
+        if piece:
+            yield piece
+    if pending_cr:
+        yield "\n"
+
+
+def iter_segments(source: TextSource, segment_chars: int, start: int = 0) -> Iterator[str]:
+    """
+    Split a source into normalized segments of about segment_chars characters.
+
+    Small pieces (e.g. lines from a file iterator) are merged and large ones
+    are split, so each segment is a sensible unit for one schedule. The first
+    start characters (counted after newline normalization) are skipped, e.g.
+    to resume a job that was stopped partway.
+    """
+    buffer = []
+    buffered = 0
+    for piece in normalize_newlines(iter_text(source)):
+        if start:
+            skipped = min(start, len(piece))
+            piece = piece[skipped:]
+            start -= skipped
+        while piece:
+            take = piece[:segment_chars - buffered]
+            piece = piece[len(take):]
+            buffer.append(take)
+            buffered += len(take)
+            if buffered >= segment_chars:
+                yield "".join(buffer)
+                buffer = []
+                buffered = 0
+    if buffer:
+        yield "".join(buffer)
@@ -0,0 +1,721 @@
+"""
+Auto Type - Typing Engine
+Plans keystrokes ahead of time and replays them. This module has no UI or
+Windows dependencies so the planning logic can be used (and timed) anywhere.
+"""
+import platform
+import re
+import threading
+import time
+from array import array
+from itertools import accumulate, chain
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional, Tuple, Callable, Union
+
+from auto_indent import INDENT_OFF, SELECT_LINE_START, IndentPlanner, iter_indent_segments
+from backpressure import BackpressureMonitor
+from batch_control import AdaptiveBatchController, BatchTelemetry
+from delay_model import DelayRandom, calculate_human_delay, generate_delays, make_rng  # noqa: F401
+from keystroke_backends import KeystrokeBackend, create_backend
+from keystroke_model import get_keystroke_model
+from telemetry import active_tracer, span
+from paste_plan import PASTE_OFF, PASTE_SETTLE, Block, iter_blocks
+from text_sources import TextSource, iter_segments
+from typo_model import BACKSPACE, plan_typos
+
+# Event kinds stored in KeystrokeSchedule.kinds
+EVENT_TEXT = 0   # Write a chunk of regular characters
+EVENT_KEY = 1    # Press a named key ("enter", "tab")
+EVENT_PASTE = 2  # Paste a block of text through the clipboard
+
+# Characters that are sent as key presses instead of being written
+SPECIAL_KEYS = {"\n": "enter", "\r": "enter", "\t": "tab", BACKSPACE: "backspace",
+                SELECT_LINE_START: "shift+home"}
+_SPECIAL_RUNS = re.compile("\r\n|[" + re.escape("".join(SPECIAL_KEYS)) + "]")
+
+# Humanized delay models (TypingConfig.timing)
+TIMING_DIGRAPH = "digraph"
+TIMING_UNIFORM = "uniform"
+
+# Characters per word when converting between WPM and characters per second
+CHARS_PER_WORD = 5.0
+
+# Waits shorter than this are finished by spinning on perf_counter(), which
+# is far more precise than a timed Event.wait(). On Windows, wait timeouts
+# have the ~15.6 ms system timer granularity, so the spin window is wider.
+SPIN_SECONDS = 0.016 if platform.system() == "Windows" else 0.002
+
+# If the executor falls further behind the plan than this (e.g. the target
+# app stalled), it re-anchors instead of bursting keys to catch up
+MAX_CATCH_UP = 1.0
+
+# Characters compiled per schedule when typing from a stream
+SEGMENT_CHARS = 4096
+
+# Minimum seconds between progress snapshots published by the executor
+PROGRESS_INTERVAL = 0.02
+
+
+@dataclass
+class TypingConfig:
+    """Configuration for typing behavior"""
+    wpm: float = 40.0           # words per minute (5 chars per word convention)
+    humanize: bool = True       # Add human-like randomness to typing
+    countdown_sec: int = 5      # Countdown before starting to type
+    windows_focus: bool = True  # Use Windows-specific focus methods
+    backend: str = "auto"       # Keystroke backend name (see keystroke_backends)
+    seed: Optional[int] = None  # Seed for the random delays (None: different every run)
+    batch_size: Optional[int] = None  # Characters per text event; None adapts while typing
+    backpressure: bool = True   # Slow down when the target window falls behind (Windows)
+    timing: str = "digraph"     # Humanized delays: "digraph" (keystroke_model) or "uniform" jitter
+    typo_rate: float = 0.0      # Chance per character of a corrected typo (humanize only)
+    paste_mode: str = PASTE_OFF  # Paste blocks through the clipboard (see paste_plan)
+    auto_indent: str = INDENT_OFF  # Leave indentation to the editor (see auto_indent)
+
+
+@dataclass(frozen=True)
+class KeystrokeSchedule:
+    """
+    A precompiled typing plan.
+
+    Event ``i`` is ``events[i]`` (a text chunk or a key name, see ``kinds``)
+    and must be sent ``deadlines[i]`` seconds after typing starts. After it is
+    sent, ``offsets[i]`` characters of the source text have been typed.
+    The arrays are built once by compile_schedule and must not be modified.
+    """
+    events: Tuple[str, ...]
+    kinds: array      # 'b' - EVENT_TEXT, EVENT_KEY or EVENT_PASTE
+    deadlines: array  # 'd' - seconds from the start of typing
+    offsets: array    # 'q' - source characters typed after each event
+    duration: float   # Planned total typing time in seconds
+    wpm: float        # Requested typing speed the plan was built for
+    typos: int = 0    # Typos planned, each followed by its correction
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    @property
+    def keystroke_count(self) -> int:
+        """Keys the schedule sends, including typos and backspaces (a paste is one)"""
+        return sum(len(event) for event, kind in zip(self.events, self.kinds)
+                   if kind == EVENT_TEXT) + len(self.kinds) - self.kinds.count(EVENT_TEXT)
+
+    @property
+    def char_count(self) -> int:
+        """Number of source characters covered by the schedule"""
+        return self.offsets[-1] if self.offsets else 0
+
+
+@dataclass(frozen=True)
+class Progress:
+    """Snapshot of a running typing job"""
+    chars_typed: int
+    total_chars: Optional[int]  # None when typing from a stream of unknown length
+    achieved_wpm: float
+    eta: Optional[float]        # Estimated seconds left, if the total is known
+    batch: Optional[BatchTelemetry] = None  # Adaptive batching state, if enabled
+
+    def describe(self) -> str:
+        """Short status line, e.g. for the main window"""
+        done = f"{self.chars_typed:,}"
+        if self.total_chars:
+            done += f"/{self.total_chars:,}"
+        text = f"Typing {done} chars - {self.achieved_wpm:.0f} WPM"
+        if self.eta is not None:
+            text += f" - {format_duration(self.eta)} left"
+        if self.batch is not None and (self.batch.batch_size > 1 or self.batch.pace > 1.0):
+            text += f" ({self.batch.describe()})"
+        return text
+
+
+class ProgressChannel:
+    """
+    Single-slot, latest-value channel from the typing thread to the UI.
+
+    The typing thread publish()es immutable snapshots; each one replaces the
+    previous, so a slow reader never falls behind and the number of UI
+    updates depends only on how often the UI calls take(). Publishing is one
+    reference assignment (atomic in CPython), so no lock is needed with a
+    single writer.
+    """
+
+    def __init__(self):
+        self._slot = (0, None)  # (version, value)
+        self._seen = 0
+
+    def publish(self, value) -> None:
+        self._slot = (self._slot[0] + 1, value)
+
+    def take(self):
+        """The latest value if it changed since the last take(), else None"""
+        version, value = self._slot
+        if version == self._seen:
+            return None
+        self._seen = version
+        return value
+
+    def peek(self):
+        """The latest value, whether or not it was taken before"""
+        return self._slot[1]
+
+
+class StopEvent(threading.Event):
+    """
+    threading.Event that remembers when it was set.
+
+    Used as the stop signal for typing so the engine can report how long it
+    took to react to a stop request (TypingResult.cancel_latency).
+    """
+
+    requested_at = None  # perf_counter() time of the first set()
+
+    def set(self) -> None:
+        if self.requested_at is None:
+            self.requested_at = time.perf_counter()
+        super().set()
+
+    def clear(self) -> None:
+        self.requested_at = None
+        super().clear()
+
+
+@dataclass
+class TypingResult:
+    """Outcome and timing statistics of one execute_schedule run"""
+    completed: bool         # False if typing was stopped early
+    chars_typed: int        # Source characters sent
+    elapsed: float          # Wall-clock seconds spent typing
+    requested_wpm: float
+    achieved_wpm: float
+    max_lateness: float     # Worst delay behind a deadline, in seconds
+    mean_lateness: float
+    reanchors: int = 0      # Times the plan was shifted after a stall
+    cancel_latency: Optional[float] = None  # Stop request to last key, in seconds
+    batch: Optional[BatchTelemetry] = None  # Final adaptive batching state
+
+    def summary(self) -> str:
+        """Short human readable description of the achieved speed"""
+        return (f"{self.achieved_wpm:.1f} WPM achieved "
+                f"({self.requested_wpm:.0f} requested)")
+
+
+def compile_schedule(text: str, config: TypingConfig,
+                     rng: DelayRandom = None,
+                     indent: IndentPlanner = None) -> KeystrokeSchedule:
+    """
+    Turn text into a keystroke schedule.
+
+    All batching and delay decisions are made here, so the executor only has
+    to wait for each deadline and send the event.
+
+    Args:
+        text: Text to type
+        config: Typing configuration (speed, humanize flag, typo rate and seed)
+        rng: Random generator to draw delays from (see delay_model.make_rng);
+            by default a new one seeded with config.seed
+        indent: Planner that tracks the editor's indentation across the
+            segments of one text; by default a new one for config.auto_indent
+    """
+    # Base timing calculation
+    chars_per_second = (config.wpm * CHARS_PER_WORD) / 60.0
+    base_delay = 1.0 / chars_per_second
+
+    # With adaptive batching the plan has one event per character and the
+    # executor groups them at runtime (see batch_control)
+    batch_size = config.batch_size or 1
+
+    # Typos are planned first; the events then send the plan's keystrokes
+    # (see typo_model), and offsets count only source characters that are
+    # on screen and correct
+    keys = text
+    plan = None
+    if config.humanize and config.typo_rate and text:
+        if rng is None:
+            rng = make_rng(config.seed)
+        plan = plan_typos(text, config.typo_rate, rng)
+        if plan is not None:
+            keys = plan.typed
+    confirmed = plan.confirmed if plan is not None else None
+
+    # Then the indentation the editor inserts itself is left out (see
+    # auto_indent); its plan counts keys of the typo plan, if there is one
+    if indent is None and config.auto_indent != INDENT_OFF:
+        indent = IndentPlanner(config.auto_indent)
+        indent.finish()
+    if indent is not None:
+        indented = indent.plan(keys)
+        keys = indented.typed
+        if confirmed is None:
+            confirmed = indented.confirmed
+        else:
+            confirmed = array("q", map(confirmed.__getitem__, indented.confirmed))
+
+    events = []
+    kinds = array("b")
+    offsets = array("q")
+    units = array("d")  # Base delays each event takes
+
+    length = len(keys)
+    position = 0
+    for match in chain(_SPECIAL_RUNS.finditer(keys), (None,)):
+        # Batch regular characters, stopping before the next special one
+        run_end = match.start() if match is not None else length
+        for start in range(position, run_end, batch_size):
+            end_idx = min(start + batch_size, run_end)
+            events.append(keys[start:end_idx])
+            kinds.append(EVENT_TEXT)
+            offsets.append(end_idx)
+            units.append(end_idx - start)
+        if match is None:
+            break
+
+        # A Windows line ending is matched as a whole and is a single Enter
+        position = match.end()
+        events.append(SPECIAL_KEYS[match.group()[0]])
+        kinds.append(EVENT_KEY)
+        offsets.append(position)
+        units.append(2.0)  # Apply longer delay after special characters
+
+    # Draw the delays for the whole text at once, from the intervals between
+    # the keys each event actually contains (or with the older uniform jitter
+    # plus pauses for spaces, punctuation and line breaks)
+    if config.humanize and events:
+        if rng is None:
+            rng = make_rng(config.seed)
+        if config.timing == TIMING_DIGRAPH:
+            delays = get_keystroke_model().event_delays(keys, offsets, base_delay, rng)
+        else:
+            delays = generate_delays(keys, offsets, units, base_delay, rng)
+    else:
+        delays = array("d", [base_delay * unit for unit in units])
+    if confirmed is not None:
+        offsets = array("q", map(confirmed.__getitem__, offsets))
+
+    # Each event is due once all earlier delays have elapsed
+    deadlines = array("d", [0.0])
+    deadlines.extend(accumulate(delays))
+    elapsed = deadlines.pop()
+
+    # Pauses and jitter shape the rhythm, but the plan as a whole must run
+    # at the requested speed, so stretch or squeeze it to the exact budget
+    # (typos and their corrections included)
+    budget = len(text) * base_delay
+    if elapsed > 0 and budget > 0:
+        deadlines = array("d", map((budget / elapsed).__mul__, deadlines))
+        elapsed = budget
+
+    return KeystrokeSchedule(
+        events=tuple(events),
+        kinds=kinds,
+        deadlines=deadlines,
+        offsets=offsets,
+        duration=elapsed,
+        wpm=config.wpm,
+        typos=plan.typos if plan is not None else 0,
+    )
+
+
+def compile_paste(text: str, config: TypingConfig) -> KeystrokeSchedule:
+    """
+    Schedule that pastes text in one go.
+
+    The paste takes PASTE_SETTLE seconds, the time the target gets to read
+    the clipboard before anything else is sent.
+    """
+    return KeystrokeSchedule(
+        events=(text,),
+        kinds=array("b", [EVENT_PASTE]),
+        deadlines=array("d", [0.0]),
+        offsets=array("q", [len(text)]),
+        duration=PASTE_SETTLE,
+        wpm=config.wpm,
+    )
+
+
+def iter_schedules(source: TextSource, config: TypingConfig,
+                   segment_chars: int = SEGMENT_CHARS,
+                   start: int = 0) -> Iterator[KeystrokeSchedule]:
+    """
+    Compile a text stream into consecutive schedules, one segment at a time.
+
+    Only one segment of text and its schedule are alive at once, so any
+    source (see text_sources.iter_text) is typed in constant memory. All
+    segments draw from one random generator, so a seeded stream is
+    reproducible as a whole. Typing begins start characters into the source.
+    With a paste mode, the blocks that paste_plan picks are pasted instead.
+    With auto indent, one planner follows the editor's indentation through
+    all segments, and no segment ends inside the indentation of a line.
+    """
+    rng = make_rng(config.seed) if config.humanize else None
+    indent = None
+    if config.auto_indent == INDENT_OFF or not start:
+        segments = iter_segments(source, segment_chars, start)
+    else:
+        # Resuming right after a line break, the editor has already indented
+        # the new line, with whitespace the planner cannot know
+        segments = iter_segments(source, segment_chars, start - 1)
+        first = next(segments, "")
+        indent = IndentPlanner(config.auto_indent, at_line_start=first[:1] in ("\n", "\r"),
+                               inserted=None)
+        segments = chain((first[1:],), segments)
+    if config.auto_indent != INDENT_OFF:
+        if indent is None:
+            indent = IndentPlanner(config.auto_indent)
+        segments = iter_indent_segments(segments)
+    if config.paste_mode == PASTE_OFF:
+        blocks = (Block(segment, False) for segment in segments)
+    else:
+        blocks = iter_blocks(segments, config.paste_mode)
+    for block in blocks:
+        if block.paste:
+            if indent is not None and indent.pending:
+                # The paste has its own indentation
+                indent.finish()
+                yield compile_schedule("", config, rng, indent)
+            with span("plan", len(block.text)):
+                schedule = compile_paste(block.text, config)
+                if indent is not None:
+                    indent.skip(block.text)
+            yield schedule
+            continue
+        pieces = (block.text[begin:begin + segment_chars]
+                  for begin in range(0, len(block.text), segment_chars))
+        if indent is not None:
+            pieces = iter_indent_segments(pieces)
+        for segment in pieces:
+            with span("plan", len(segment)):
+                schedule = compile_schedule(segment, config, rng, indent)
+            yield schedule
+    if indent is not None and indent.pending:
+        # Clear the indentation the editor put after the final line break
+        indent.finish()
+        yield compile_schedule("", config, rng, indent)
+
+
+def create_batching(config: TypingConfig,
+                    backpressure: BackpressureMonitor = None) -> Optional[AdaptiveBatchController]:
+    """
+    Batch controller for execute_schedule.
+
+    With a fixed batch size there is nothing to adapt, unless a backpressure
+    monitor is given: then the controller only throttles the pace.
+    """
+    if not config.backpressure:
+        backpressure = None
+    if config.batch_size:
+        if backpressure is None:
+            return None
+        return AdaptiveBatchController(min_batch=1, max_batch=1, backpressure=backpressure)
+    return AdaptiveBatchController(backpressure=backpressure)
+
+
+def estimate_duration(chars: int, wpm: float) -> float:
+    """Planned typing time in seconds for a number of characters"""
+    return chars * 60.0 / (wpm * CHARS_PER_WORD)
+
+
+def wait_until(deadline: float, stop_event: threading.Event = None) -> float:
+    """
+    Block until time.perf_counter() reaches an absolute deadline.
+
+    Waits coarsely on stop_event (or sleeps, without one) for most of the
+    time and spins for the last SPIN_SECONDS, so a stop request interrupts
+    the wait immediately. Returns how late the wait finished (0 or more
+    seconds); callers must check stop_event afterwards.
+    """
+    remaining = deadline - time.perf_counter()
+    if remaining > SPIN_SECONDS:
+        if stop_event is None:
+            time.sleep(remaining - SPIN_SECONDS)
+        elif stop_event.wait(remaining - SPIN_SECONDS):
+            return 0.0
+    now = time.perf_counter()
+    if stop_event is None:
+        while now < deadline:
+            now = time.perf_counter()
+    else:
+        is_set = stop_event.is_set
+        while now < deadline:
+            if is_set():
+                return 0.0
+            now = time.perf_counter()
+    return now - deadline
+
+
+def calculate_wpm(chars: int, seconds: float) -> float:
+    """Convert a character count over a duration to words per minute"""
+    if seconds <= 0:
+        return 0.0
+    return chars / CHARS_PER_WORD * 60.0 / seconds
+
+
+def execute_schedule(schedule: Union[KeystrokeSchedule, Iterable[KeystrokeSchedule]],
+                     backend: KeystrokeBackend,
+                     callback: Callable[[str], None] = None,
+                     stop_event: threading.Event = None,
+                     total_chars: int = None,
+                     progress: ProgressChannel = None,
+                     batching: AdaptiveBatchController = None) -> TypingResult:
+    """
+    Replay compiled schedules against absolute deadlines.
+
+    Deadlines are measured from a single start time, so time lost on one
+    event is made up on the following ones instead of accumulating.
+    Consecutive schedules (e.g. from iter_schedules) are played back to
+    back on the same timeline; the next one is compiled right after the
+    first event of the current one is sent, well ahead of its deadline.
+
+    Args:
+        schedule: A schedule from compile_schedule, or an iterable of them
+        backend: Keystroke backend that delivers the events
+        callback: Optional callback for status messages (completion, stop,
+            errors); called only a handful of times per run
+        stop_event: Event to check for stop requests
+        total_chars: Length of the whole text, if known, for progress and ETA
+        progress: Optional channel that receives Progress snapshots at most
+            every PROGRESS_INTERVAL seconds
+        batching: Optional controller that groups consecutive text events
+            into one injection call and may slow the pace down, based on
+            how long each call takes (see batch_control)
+
+    While tracing is on (see telemetry), every wait and injection is
+    recorded as a span, changes of pace as instants, and the totals of
+    keys, text chunks and sleep overshoot as counters.
+
+    Returns:
+        TypingResult with achieved vs. requested speed
+    """
+    if isinstance(schedule, KeystrokeSchedule):
+        total_chars = schedule.char_count
+        segments = iter((schedule,))
+    else:
+        segments = iter(schedule)
+    clock = time.perf_counter
+    write = backend.write
+    press = backend.press
+
+    completed = True
+    sent = 0
+    typed = 0
+    base_chars = 0  # Characters covered by the segments already played
+    max_lateness = 0.0
+    total_lateness = 0.0
+    reanchors = 0
+    requested_wpm = 0.0
+    next_publish = 0.0
+    pace = 1.0  # Plan stretch factor set by the batch controller
+    observe = batching.observe if batching is not None else None
+    tracer = active_tracer()
+    keys_sent = 0
+
+    def snapshot(now: float) -> Progress:
+        elapsed = now - began
+        eta = None
+        if total_chars and typed:
+            eta = max(0, total_chars - typed) * elapsed / typed
+        batch = batching.telemetry() if batching is not None else None
+        return Progress(typed, total_chars, calculate_wpm(typed, elapsed), eta, batch)
+
+    # Plan the first segment before the clock starts
+    segment = next(segments, None)
+    began = segment_start = waited_from = clock()
+    while segment is not None:
+        events = segment.events
+        kinds = segment.kinds
+        deadlines = segment.deadlines
+        offsets = segment.offsets
+        requested_wpm = segment.wpm
+        count = len(events)
+        # Event i is due at start + (deadlines[i] - anchor) * pace
+        start = segment_start
+        anchor = 0.0
+        upcoming = None
+        prefetched = False
+        if batching is not None:
+            batching.begin(requested_wpm, estimate_duration(1, requested_wpm))
+
+        idx = 0
+        while idx < count:
+            last = idx
+            if batching is not None:
+                if batching.pace != pace:
+                    # Stretch the rest of the plan from this event on; after a
+                    # back-off the backlog is dropped rather than caught up
+                    start = max(start + (deadlines[idx] - anchor) * pace, clock())
+                    anchor = deadlines[idx]
+                    pace = batching.pace
+                    if tracer is not None:
+                        tracer.instant("pace", pace)
+                size = batching.batch_size
+                if size > 1 and kinds[idx] == EVENT_TEXT:
+                    # Group the following text events into one call
+                    limit = min(count, idx + size)
+                    while last + 1 < limit and kinds[last + 1] == EVENT_TEXT:
+                        last += 1
+
+            # Wait for this event's absolute target time; a stop request
+            # interrupts the wait at once
+            lateness = wait_until(start + (deadlines[idx] - anchor) * pace, stop_event)
+            if stop_event is not None and stop_event.is_set():
+                completed = False
+                break
+            if lateness > MAX_CATCH_UP:
+                # Too far behind to catch up without flooding the target
+                start += lateness
+                reanchors += 1
+                if tracer is not None:
+                    tracer.instant("reanchor", lateness)
+            total_lateness += lateness
+            if lateness > max_lateness:
+                max_lateness = lateness
+
+            injected_at = clock()
+            try:
+                if kinds[idx] == EVENT_KEY:
+                    press(events[idx])
+                elif kinds[idx] == EVENT_PASTE:
+                    backend.paste(events[idx])
+                elif last == idx:
+                    write(events[idx])
+                else:
+                    write("".join(events[idx:last + 1]))
+            except Exception as e:
+                if callback:
+                    callback(f"Error typing at position {typed}: {str(e)}")
+                # Pause after error (interruptible)
+                if stop_event is not None:
+                    stop_event.wait(0.5)
+                else:
+                    time.sleep(0.5)
+                start += 0.5  # Keep the rest of the plan from bunching up
+            done = base_chars + offsets[last]
+            if batching is not None and kinds[idx] != EVENT_PASTE:
+                observe(done - typed, clock() - injected_at, lateness)
+            if tracer is not None:
+                # The wait span's value is how far it overshot the deadline
+                finished_at = clock()
+                tracer.add_span("wait", waited_from, injected_at, lateness)
+                if kinds[idx] == EVENT_KEY:
+                    keys_sent += 1
+                    tracer.add_span("press", injected_at, finished_at, events[idx])
+                elif kinds[idx] == EVENT_PASTE:
+                    tracer.add_span("paste", injected_at, finished_at, done - typed)
+                else:
+                    tracer.add_span("write", injected_at, finished_at, done - typed)
+                waited_from = finished_at
+            sent += 1
+            typed = done
+            idx = last + 1
+
+            # Publish progress, coalesced to a fixed maximum rate
+            if progress is not None:
+                now = clock()
+                if now >= next_publish:
+                    next_publish = now + PROGRESS_INTERVAL
+                    progress.publish(snapshot(now))
+
+            if not prefetched:
+                # Plan the next segment while waiting for this one's deadlines
+                upcoming = next(segments, None)
+                prefetched = True
+
+        if not completed:
+            break
+        base_chars += segment.char_count
+        segment_start = start + (segment.duration - anchor) * pace
+        segment = upcoming if prefetched else next(segments, None)
+
+    cancel_latency = None
+    if completed:
+        # Let the final keystroke's gap elapse so the measured speed is exact
+        wait_until(segment_start, stop_event)
+    else:
+        requested_at = getattr(stop_event, "requested_at", None)
+        if requested_at is not None:
+            cancel_latency = max(0.0, clock() - requested_at)
+    elapsed = clock() - began
+    if progress is not None:
+        progress.publish(snapshot(began + elapsed))
+    if tracer is not None:
+        tracer.add_span("typing", began, began + elapsed, typed)
+        tracer.count("keys_sent", keys_sent)
+        tracer.count("chunks_sent", sent - keys_sent)
+        tracer.count("chars_typed", typed)
+        tracer.count("sleep_overshoot_ms", total_lateness * 1000.0)
+        tracer.count("reanchors", reanchors)
+    result = TypingResult(
+        completed=completed,
+        chars_typed=typed,
+        elapsed=elapsed,
+        requested_wpm=requested_wpm,
+        achieved_wpm=calculate_wpm(typed, elapsed),
+        max_lateness=max_lateness,
+        mean_lateness=total_lateness / sent if sent else 0.0,
+        reanchors=reanchors,
+        cancel_latency=cancel_latency,
+        batch=batching.telemetry() if batching is not None else None,
+    )
+    if callback:
+        if completed:
+            callback(f"Typing complete - {result.summary()}")
+        elif cancel_latency is not None:
+            callback(f"Typing stopped (reacted in {cancel_latency * 1000:.2f} ms)")
+        else:
+            callback("Typing stopped")
+    return result
+
+
+def human_typing(text: TextSource, wpm: float, callback: Callable[[str], None] = None,
+                 stop_event: threading.Event = None,
+                 backend: KeystrokeBackend = None,
+                 progress: ProgressChannel = None) -> Optional[TypingResult]:
+    """
+    Type text with human-like timing variations.
+
+    Args:
+        text: Text to type - a string, or any iterable of strings or file
+            object, which is read and typed incrementally
+        wpm: Words per minute (based on 5 chars = 1 word)
+        callback: Optional callback for status messages
+        stop_event: Event to check for stop requests
+        backend: Keystroke backend to use (defaults to the fastest available)
+        progress: Optional channel for coalesced Progress snapshots
+
+    Returns:
+        TypingResult with achieved vs. requested WPM, or None if nothing was typed
+    """
+    if isinstance(text, str) and not text:
+        return None
+
+    # Check for stop request
+    if stop_event and stop_event.is_set():
+        if callback:
+            callback("Typing stopped")
+        return None
+
+    # Plan every keystroke up front (or segment by segment for streams),
+    # then replay the plan
+    config = TypingConfig(wpm=wpm)
+    total_chars = None
+    if isinstance(text, str):
+        schedule = compile_schedule(text, config)
+        total_chars = schedule.char_count
+    else:
+        schedule = iter_schedules(text, config)
+    if backend is None:
+        backend = create_backend(stop_event=stop_event)
+    return execute_schedule(schedule, backend, callback, stop_event,
+                            total_chars=total_chars, progress=progress,
+                            batching=create_batching(config))
+
+
+def format_duration(seconds: float) -> str:
+    """Format a duration as a short human readable string"""
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds}s"
+    minutes, seconds = divmod(seconds, 60)
+    if minutes < 60:
+        return f"{minutes}m {seconds:02d}s"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes:02d}m"
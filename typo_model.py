@@ -0,0 +1,165 @@
+"""
+Auto Type - Typos
+Plans occasional slips of the finger and their corrections ahead of time.
+A typo hits a neighbouring key on a QWERTY keyboard instead of the right
+one, sometimes goes unnoticed for a character or two, and is then erased
+with backspaces and typed again.
+
+The whole text is turned into an edit plan once, before typing starts: the
+exact keystrokes to send, with "\\b" for each backspace, and how much of
+the source is correct on screen after each of them. The plan is replayed
+and checked against the source when it is made, so typos never change what
+ends up in the target.
+"""
+import math
+import random
+from array import array
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+# Rows of a US QWERTY keyboard and how far each is shifted to the right,
+# in key widths
+QWERTY_ROWS = ("1234567890-=", "qwertyuiop[]", "asdfghjkl;'", "zxcvbnm,./")
+ROW_OFFSETS = (0.0, 0.5, 0.75, 1.25)
+
+# Keys at most this far apart (in key widths) count as neighbours
+NEIGHBOUR_DISTANCE = 1.25
+
+# Chance that a typo is noticed after 0, 1, 2... further correct characters
+NOTICE_WEIGHTS = (0.6, 0.3, 0.1)
+
+# Typed for each backspace in an edit plan
+BACKSPACE = "\b"
+
+# Characters a typo never runs past before it is noticed (they are keys)
+_BREAKS = frozenset("\n\r\t" + BACKSPACE)
+
+_neighbours: Optional[Dict[str, str]] = None
+
+
+def neighbour_keys() -> Dict[str, str]:
+    """
+    Characters that a finger aiming at a key may hit instead, per key.
+
+    Built once from the key positions. Capitals slip to capitals (Shift is
+    held), other keys to any neighbour on their rows.
+    """
+    global _neighbours
+    if _neighbours is None:
+        positions = {
+            key: (col + ROW_OFFSETS[row], float(row))
+            for row, keys in enumerate(QWERTY_ROWS) for col, key in enumerate(keys)
+        }
+        neighbours = {}
+        for key, (x, y) in positions.items():
+            neighbours[key] = "".join(
+                other for other, (ox, oy) in positions.items()
+                if other != key and math.hypot(ox - x, oy - y) <= NEIGHBOUR_DISTANCE
+            )
+        for key in list(neighbours):
+            if key.isalpha():
+                neighbours[key.upper()] = "".join(
+                    other.upper() for other in neighbours[key] if other.isalpha())
+        _neighbours = neighbours
+    return _neighbours
+
+
+@dataclass(frozen=True)
+class EditPlan:
+    """
+    The keystrokes that type a text with typos and their corrections.
+
+    typed[i] is sent as key i ("\\b" is a backspace); after the first i keys,
+    confirmed[i] characters of the source are on screen and correct.
+    """
+    typed: str
+    confirmed: array  # 'q', len(typed) + 1 entries
+    typos: int
+
+    @property
+    def keystrokes(self) -> int:
+        return len(self.typed)
+
+
+def replay(typed: str) -> str:
+    """What a target shows after receiving typed, applying the backspaces"""
+    shown = []
+    for char in typed:
+        if char == BACKSPACE:
+            if shown:
+                shown.pop()
+        else:
+            shown.append(char)
+    return "".join(shown)
+
+
+def _uniforms(rng, count: int):
+    """count uniform numbers from a NumPy or standard library generator"""
+    if isinstance(rng, random.Random):
+        return [rng.random() for _ in range(count)]
+    return rng.random(count).tolist()
+
+
+def plan_typos(text: str, rate: float, rng) -> Optional[EditPlan]:
+    """
+    Edit plan with typos at the given rate, or None if none was drawn.
+
+    Every character with QWERTY neighbours is mistyped with probability
+    rate. A typo is noticed after up to len(NOTICE_WEIGHTS) - 1 further
+    correct characters (never past a line break or tab, or the next typo),
+    then that many characters plus the typo are erased and retyped.
+
+    Args:
+        text: Source text
+        rate: Chance per character of a typo, from 0 to 1
+        rng: Generator from delay_model.make_rng
+
+    Raises:
+        ValueError: If rate is outside 0..1
+        RuntimeError: If the plan would not type exactly the source text
+    """
+    if not 0.0 <= rate <= 1.0:
+        raise ValueError(f"typo rate must be between 0 and 1, got {rate}")
+    if rate == 0.0 or BACKSPACE in text:
+        return None  # A literal backspace in the source would be ambiguous
+    neighbours = neighbour_keys()
+    draws = _uniforms(rng, len(text))
+    positions = [pos for pos, (char, draw) in enumerate(zip(text, draws))
+                 if draw < rate and neighbours.get(char)]
+    if not positions:
+        return None
+
+    typed = []
+    confirmed = array("q", [0])
+    done = 0  # Source characters already added to the plan
+    draws = _uniforms(rng, 2 * len(positions))
+    limits = positions[1:] + [len(text)]
+    for pos, limit, pick, notice in zip(positions, limits, draws[::2], draws[1::2]):
+        typed.append(text[done:pos])
+        confirmed.extend(range(done + 1, pos + 1))
+
+        choices = neighbours[text[pos]]
+        wrong = choices[min(int(pick * len(choices)), len(choices) - 1)]
+        ahead = 0
+        for weight in NOTICE_WEIGHTS:
+            notice -= weight
+            if notice < 0:
+                break
+            ahead += 1
+        ahead = min(ahead, len(NOTICE_WEIGHTS) - 1)
+        # Characters typed on before noticing stay within the line and
+        # before the next typo
+        end = pos + 1
+        while end < min(pos + 1 + ahead, limit) and text[end] not in _BREAKS:
+            end += 1
+        slip = wrong + text[pos + 1:end]
+        typed.append(slip + BACKSPACE * len(slip))
+        confirmed.extend([pos] * (2 * len(slip)))
+        done = pos
+
+    typed.append(text[done:])
+    confirmed.extend(range(done + 1, len(text) + 1))
+    plan = EditPlan("".join(typed), confirmed, len(positions))
+    if replay(plan.typed) != text or len(plan.confirmed) != len(plan.typed) + 1:
+        raise RuntimeError("typo plan does not reproduce the source text")
+    return plan
@@ -0,0 +1,330 @@
+"""
+Auto Type - Window Targets
+Finds and focuses the window that should receive the keystrokes by handle
+instead of by pixel position. A target remembers the window's handle plus
+its class and title, so it is resolved once, re-checked cheaply before use,
+and found again by class and title if the window was closed and reopened.
+
+Focusing uses SetForegroundWindow with AttachThreadInput, so no mouse
+movement or click is needed. ReadinessWaits replaces fixed sleeps while
+preparing a target: it polls for the state typing needs (minimized,
+focused, caret shown) and records how long each phase took. Everything
+here is a no-op off Windows.
+"""
+import ctypes
+import platform
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from telemetry import active_tracer
+
+# Root window of a child (GetAncestor)
+GA_ROOT = 2
+
+# ShowWindow command that restores a minimized window
+SW_RESTORE = 9
+
+# Longest window class name / title read back
+MAX_NAME_CHARS = 512
+
+# How often a readiness condition is checked while waiting for it
+POLL_INTERVAL = 0.005
+
+_user32 = None  # Set up on first use; False when not on Windows
+_kernel32 = None
+
+# Handles found by find_window, by (title, class name)
+_found: Dict[Tuple[str, Optional[str]], int] = {}
+
+
+class _POINT(ctypes.Structure):
+    _fields_ = [("x", ctypes.c_long), ("y", ctypes.c_long)]
+
+
+class _RECT(ctypes.Structure):
+    _fields_ = [("left", ctypes.c_long), ("top", ctypes.c_long),
+                ("right", ctypes.c_long), ("bottom", ctypes.c_long)]
+
+
+class _GUITHREADINFO(ctypes.Structure):
+    _fields_ = [
+        ("cbSize", ctypes.c_uint), ("flags", ctypes.c_uint),
+        ("hwndActive", ctypes.c_void_p), ("hwndFocus", ctypes.c_void_p),
+        ("hwndCapture", ctypes.c_void_p), ("hwndMenuOwner", ctypes.c_void_p),
+        ("hwndMoveSize", ctypes.c_void_p), ("hwndCaret", ctypes.c_void_p),
+        ("rcCaret", _RECT),
+    ]
+
+
+_ENUM_PROC = ctypes.WINFUNCTYPE(ctypes.c_bool, ctypes.c_void_p, ctypes.c_void_p) \
+    if platform.system() == "Windows" else None
+
+
+def _get_user32():
+    """user32 with the signatures used here declared once (None if not on Windows)"""
+    global _user32, _kernel32
+    if _user32 is None:
+        if platform.system() != "Windows":
+            _user32 = False
+            return None
+        user32 = ctypes.WinDLL("user32", use_last_error=True)
+        hwnd = ctypes.c_void_p
+        for name, argtypes, restype in (
+            ("WindowFromPoint", [_POINT], hwnd),
+            ("GetForegroundWindow", [], hwnd),
+            ("GetAncestor", [hwnd, ctypes.c_uint], hwnd),
+            ("IsWindow", [hwnd], ctypes.c_bool),
+            ("IsWindowVisible", [hwnd], ctypes.c_bool),
+            ("IsIconic", [hwnd], ctypes.c_bool),
+            ("ShowWindow", [hwnd, ctypes.c_int], ctypes.c_bool),
+            ("GetClassNameW", [hwnd, ctypes.c_wchar_p, ctypes.c_int], ctypes.c_int),
+            ("GetWindowTextW", [hwnd, ctypes.c_wchar_p, ctypes.c_int], ctypes.c_int),
+            ("EnumWindows", [_ENUM_PROC, ctypes.c_void_p], ctypes.c_bool),
+            ("GetWindowThreadProcessId", [hwnd, ctypes.c_void_p], ctypes.c_uint),
+            ("AttachThreadInput", [ctypes.c_uint, ctypes.c_uint, ctypes.c_bool], ctypes.c_bool),
+            ("SetForegroundWindow", [hwnd], ctypes.c_bool),
+            ("BringWindowToTop", [hwnd], ctypes.c_bool),
+            ("GetGUIThreadInfo", [ctypes.c_uint, ctypes.POINTER(_GUITHREADINFO)], ctypes.c_bool),
+        ):
+            function = getattr(user32, name)
+            function.argtypes = argtypes
+            function.restype = restype
+        _kernel32 = ctypes.WinDLL("kernel32")
+        _user32 = user32
+    return _user32 or None
+
+
+def window_from_point(x: int, y: int) -> Optional[int]:
+    """Handle of the window at a screen position (Windows only, else None)"""
+    user32 = _get_user32()
+    if user32 is None:
+        return None
+    return user32.WindowFromPoint(_POINT(x, y)) or None
+
+
+def foreground_window() -> Optional[int]:
+    """Handle of the window that receives keystrokes (Windows only, else None)"""
+    user32 = _get_user32()
+    if user32 is None:
+        return None
+    return user32.GetForegroundWindow() or None
+
+
+def root_window(hwnd: int) -> Optional[int]:
+    """Top-level window that contains hwnd"""
+    user32 = _get_user32()
+    if user32 is None or not hwnd:
+        return None
+    return user32.GetAncestor(hwnd, GA_ROOT) or None
+
+
+def window_class(hwnd: int) -> str:
+    """Class name of a window ("" if it is gone)"""
+    user32 = _get_user32()
+    if user32 is None or not hwnd:
+        return ""
+    buffer = ctypes.create_unicode_buffer(MAX_NAME_CHARS)
+    user32.GetClassNameW(hwnd, buffer, MAX_NAME_CHARS)
+    return buffer.value
+
+
+def window_title(hwnd: int) -> str:
+    """Title of a window ("" if it has none or is gone)"""
+    user32 = _get_user32()
+    if user32 is None or not hwnd:
+        return ""
+    buffer = ctypes.create_unicode_buffer(MAX_NAME_CHARS)
+    user32.GetWindowTextW(hwnd, buffer, MAX_NAME_CHARS)
+    return buffer.value
+
+
+def is_minimized(hwnd: int) -> bool:
+    """Whether a window is minimized (False if unknown)"""
+    user32 = _get_user32()
+    return user32 is not None and bool(hwnd) and user32.IsIconic(hwnd)
+
+
+def has_input_focus(hwnd: int) -> bool:
+    """
+    Whether the window's thread shows a caret or has a focused control.
+
+    Classic edit controls create a system caret; browsers and Electron apps
+    draw their own, so a focused control counts as ready as well.
+    """
+    user32 = _get_user32()
+    if user32 is None or not hwnd:
+        return False
+    info = _GUITHREADINFO(cbSize=ctypes.sizeof(_GUITHREADINFO))
+    thread = user32.GetWindowThreadProcessId(hwnd, None)
+    if not thread or not user32.GetGUIThreadInfo(thread, ctypes.byref(info)):
+        return False
+    return bool(info.hwndCaret or info.hwndFocus)
+
+
+def _matches(hwnd: int, title: str, class_name: Optional[str]) -> bool:
+    if class_name and window_class(hwnd) != class_name:
+        return False
+    return title.lower() in window_title(hwnd).lower()
+
+
+def find_window(title: str = "", class_name: Optional[str] = None) -> Optional[int]:
+    """
+    Visible top-level window whose title contains title (and of the given class).
+
+    The handle is cached; later calls only check that it is still a window
+    that matches, and enumerate the windows again only when it is not.
+    """
+    user32 = _get_user32()
+    if user32 is None or not (title or class_name):
+        return None
+    key = (title, class_name)
+    hwnd = _found.get(key)
+    if hwnd and user32.IsWindow(hwnd) and _matches(hwnd, title, class_name):
+        return hwnd
+
+    found = []
+
+    def check(candidate, _):
+        if user32.IsWindowVisible(candidate) and _matches(candidate, title, class_name):
+            found.append(candidate)
+            return False  # Stop enumerating
+        return True
+
+    user32.EnumWindows(_ENUM_PROC(check), None)
+    if not found:
+        _found.pop(key, None)
+        return None
+    _found[key] = found[0]
+    return found[0]
+
+
+def focus_window(hwnd: int) -> bool:
+    """
+    Bring a window to the foreground so it receives keystrokes.
+
+    Windows only lets the foreground thread change the foreground window,
+    so the calling thread briefly attaches its input to the current
+    foreground window's thread (and the target's) while asking. Returns
+    whether the window is in the foreground afterwards.
+    """
+    user32 = _get_user32()
+    if user32 is None or not hwnd or not user32.IsWindow(hwnd):
+        return False
+    if user32.IsIconic(hwnd):
+        user32.ShowWindow(hwnd, SW_RESTORE)
+    foreground = user32.GetForegroundWindow()
+    if foreground == hwnd:
+        return True
+
+    current = _kernel32.GetCurrentThreadId()
+    threads = {user32.GetWindowThreadProcessId(hwnd, None)}
+    if foreground:
+        threads.add(user32.GetWindowThreadProcessId(foreground, None))
+    attached = [thread for thread in threads
+                if thread and thread != current and user32.AttachThreadInput(current, thread, True)]
+    try:
+        user32.BringWindowToTop(hwnd)
+        user32.SetForegroundWindow(hwnd)
+    finally:
+        for thread in attached:
+            user32.AttachThreadInput(current, thread, False)
+    return user32.GetForegroundWindow() == hwnd
+
+
+@dataclass
+class WindowTarget:
+    """
+    A window to type into: its handle, and how to find it again.
+
+    The handle is trusted while it is still a window of the same class
+    (handles are reused by Windows once a window is destroyed); otherwise
+    the target is looked up again by class and title.
+    """
+    hwnd: Optional[int] = None
+    class_name: Optional[str] = None
+    title: str = ""
+
+    @classmethod
+    def from_point(cls, x: int, y: int, exclude: Optional[int] = None) -> Optional["WindowTarget"]:
+        """Target for the top-level window at a screen position (not exclude)"""
+        hwnd = root_window(window_from_point(x, y))
+        if hwnd is None or hwnd == exclude:
+            return None
+        return cls(hwnd=hwnd, class_name=window_class(hwnd), title=window_title(hwnd))
+
+    def resolve(self) -> Optional[int]:
+        """The target's current handle, found again if the window was replaced"""
+        user32 = _get_user32()
+        if user32 is None:
+            return None
+        if self.hwnd and user32.IsWindow(self.hwnd) and (
+                not self.class_name or window_class(self.hwnd) == self.class_name):
+            return self.hwnd
+        self.hwnd = find_window(self.title, self.class_name)
+        return self.hwnd
+
+    def focus(self) -> bool:
+        """Resolve the target and bring it to the foreground"""
+        hwnd = self.resolve()
+        return hwnd is not None and focus_window(hwnd)
+
+    def describe(self) -> str:
+        """Short text for the UI, e.g. "notes.txt - Notepad" """
+        return self.title or self.class_name or "window"
+
+
+class ReadinessWaits:
+    """
+    Condition waits with a timeout, in place of fixed sleeps.
+
+    Each wait() polls its condition until it holds, the timeout expires or
+    the stop event is set, so a fast machine continues at once and a slow
+    one still gets the full timeout. The measured wait of every phase is
+    kept for reporting (and traced as a "ready <name>" span).
+    """
+
+    def __init__(self, stop_event: threading.Event = None, interval: float = POLL_INTERVAL):
+        self.stop_event = stop_event
+        self.interval = interval
+        self.phases: List[Tuple[str, float, bool]] = []
+
+    def wait(self, name: str, condition: Callable[[], bool], timeout: float) -> bool:
+        """
+        Wait until condition() is true; returns whether it became true.
+
+        Args:
+            name: Phase name for describe(), e.g. "foreground"
+            condition: Cheap check, polled every interval
+            timeout: Longest wait in seconds
+        """
+        began = time.perf_counter()
+        deadline = began + timeout
+        while True:
+            met = bool(condition())
+            if met or time.perf_counter() >= deadline:
+                break
+            if self.stop_event is not None:
+                if self.stop_event.wait(self.interval):
+                    break
+            else:
+                time.sleep(self.interval)
+        ended = time.perf_counter()
+        self.phases.append((name, ended - began, met))
+        tracer = active_tracer()
+        if tracer is not None:
+            tracer.add_span("ready " + name, began, ended, met)
+        return met
+
+    @property
+    def total(self) -> float:
+        """Seconds spent waiting over all phases"""
+        return sum(seconds for _, seconds, _ in self.phases)
+
+    def describe(self) -> str:
+        """Short text, e.g. "minimize 14 ms, foreground 2 ms, caret 500 ms (timed out)" """
+        return ", ".join(
+            f"{name} {seconds * 1000:.0f} ms" + ("" if met else " (timed out)")
+            for name, seconds, met in self.phases
+        )